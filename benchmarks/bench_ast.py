@@ -0,0 +1,79 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+""" The benchmark of the syntax tree file.
+
+Compares getting the scenario of a generated source by parsing the source
+against loading it from its syntax tree file (.adelet), memory-mapped: the
+opening alone (the index only), the scenario alone and every section.
+
+Usage:
+    python benchmarks/bench_ast.py [-t tokens] [-r runs]
+
+Author:
+    Francesco Racciatti
+
+Copyright 2018 Francesco Racciatti
+
+"""
+
+
+import os
+import sys
+sys.path[:0] = [os.path.join(os.path.dirname(__file__), '..', 'src', p) for p in ('', 'model', 'parser', 'shell', 'util')]
+
+import time
+import shutil
+import logging
+import tempfile
+import statistics
+from argparse import ArgumentParser
+from typing import Any, Callable, List
+
+import generator
+from grammar import parser
+from service import emit_ast, open_ast
+from syntaxtree import SECTION_SCENARIO
+
+
+def measure(function: Callable[[], Any], runs: int) -> float:
+    """ Gets the median time of the given function. """
+    samples: List[float] = []
+    for _ in range(runs):
+        begin = time.perf_counter()
+        function()
+        samples.append(time.perf_counter() - begin)
+    return statistics.median(samples)
+
+
+def load(path: str, sections: List[str]) -> None:
+    """ Opens the given syntax tree file and decodes the given sections. """
+    with open_ast(path) as tree:
+        for section in sections:
+            tree.section(section)
+
+
+if __name__ == '__main__':
+    argparser = ArgumentParser(description="Load from the syntax tree file against parse from the source.")
+    argparser.add_argument('-t', '--tokens', type=int, default=500000, help="The size of the scenario.")
+    argparser.add_argument('-r', '--runs', type=int, default=5, help="The number of runs.")
+    arguments = argparser.parse_args()
+    logging.disable(logging.CRITICAL)
+
+    directory = tempfile.mkdtemp()
+    try:
+        source = os.path.join(directory, 'scenario.adele')
+        tree = os.path.join(directory, 'scenario.adelet')
+        with open(source, 'w') as filesource:
+            generator.write(generator.scale(arguments.tokens), filesource)
+        emit_ast(source, tree)
+        with open_ast(tree) as opened:
+            sections = list(opened.index)
+
+        print('source {:.1f} KiB, tree {:.1f} KiB'.format(os.path.getsize(source) / 1024, os.path.getsize(tree) / 1024))
+        parse = measure(lambda: parser.parse_file(source), arguments.runs)
+        print('{:<16} {:10.1f} ms'.format('parse', parse * 1000))
+        for label, loaded in (('open', []), ('load scenario', [SECTION_SCENARIO]), ('load all', sections)):
+            elapsed = measure(lambda: load(tree, loaded), arguments.runs)
+            print('{:<16} {:10.1f} ms {:8.1f}x'.format(label, elapsed * 1000, parse / elapsed))
+    finally:
+        shutil.rmtree(directory, ignore_errors=True)
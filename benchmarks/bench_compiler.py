@@ -0,0 +1,80 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+""" The benchmark of the library API.
+
+Compiles a small generated scenario repeatedly through a reused compiler
+(with and without the cache of the outputs) and through the command line
+interface, i.e. a subprocess and a pair of files per compilation, and
+compares the call rates.
+
+Usage:
+    python benchmarks/bench_compiler.py [-t tokens] [-c calls] [-i interpreter]
+
+Author:
+    Francesco Racciatti
+
+Copyright 2018 Francesco Racciatti
+
+"""
+
+
+import os
+import sys
+sys.path[:0] = [os.path.join(os.path.dirname(__file__), '..', 'src', p) for p in ('', 'model', 'parser', 'shell', 'util')]
+
+import time
+import shutil
+import logging
+import tempfile
+import subprocess
+from argparse import ArgumentParser
+from typing import Callable, List
+
+import generator
+from compiler import Compiler
+
+
+# The root of the repository
+ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+
+
+def rate(function: Callable[[int], None], calls: int) -> float:
+    """ Gets the number of calls per second of the given function. """
+    begin = time.perf_counter()
+    for call in range(calls):
+        function(call)
+    return calls / (time.perf_counter() - begin)
+
+
+if __name__ == '__main__':
+    argparser = ArgumentParser(description="Call rate of the library API against the command line interface.")
+    argparser.add_argument('-t', '--tokens', type=int, default=2000, help="The size of the scenario.")
+    argparser.add_argument('-c', '--calls', type=int, default=200, help="The number of calls.")
+    argparser.add_argument('-i', '--interpreter', default='xml', help="The interpreter.")
+    arguments = argparser.parse_args()
+    logging.disable(logging.CRITICAL)
+
+    sourcecode = generator.generate(generator.scale(arguments.tokens, actions=1.0))
+    # The distinct sources defeat the cache of the outputs
+    sources: List[str] = ['{}\n# {}\n'.format(sourcecode, call) for call in range(arguments.calls)]
+
+    compiler = Compiler(arguments.interpreter, cache_size=0)
+    compiler.compile_string(sourcecode)
+    cached = Compiler(arguments.interpreter)
+    print('{:<12} {:10.1f} calls/s'.format('library', rate(lambda call: compiler.compile_string(sources[call]),
+                                                            arguments.calls)))
+    print('{:<12} {:10.1f} calls/s'.format('cached', rate(lambda call: cached.compile_string(sourcecode),
+                                                           arguments.calls)))
+
+    directory = tempfile.mkdtemp()
+    try:
+        source = os.path.join(directory, 'source.adele')
+        with open(source, 'w') as filesource:
+            filesource.write(sourcecode)
+        command = [sys.executable, os.path.join('src', 'pyadele.py'), '--no-cache', '-f', '-s', source,
+                   '-i', arguments.interpreter, '-o', os.path.join(directory, 'output')]
+        calls = max(1, arguments.calls // 20)
+        print('{:<12} {:10.1f} calls/s'.format('subprocess', rate(lambda call: subprocess.run(
+            command, cwd=ROOT, check=True, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL), calls)))
+    finally:
+        shutil.rmtree(directory, ignore_errors=True)
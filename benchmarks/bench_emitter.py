@@ -0,0 +1,74 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+""" The benchmark of the XML emitter.
+
+Compares the in-memory interpretation (one string written in one shot)
+against the streamed one (chunks written incrementally) on scenarios with
+a large number of statements, in terms of time and peak memory.
+
+Usage:
+    python benchmarks/bench_emitter.py [-n statements [statements ...]]
+
+Author:
+    Francesco Racciatti
+
+Copyright 2018 Francesco Racciatti
+
+"""
+
+
+import os
+import sys
+sys.path[:0] = [os.path.join(os.path.dirname(__file__), '..', 'src', p) for p in ('', 'model', 'parser', 'shell', 'util')]
+
+import time
+import logging
+import tempfile
+import tracemalloc
+from argparse import ArgumentParser
+from typing import Callable, Tuple
+
+from model.oom import Scenario, Configuration, SetUnitTime, SetTimeStart
+from model.interpreter import Interpreter
+
+
+def build_scenario(statements: int) -> Scenario:
+    """ Builds a scenario containing the given number of statements. """
+    actions = [SetUnitTime('_string_s') if i % 2 else SetTimeStart('_integer_{}'.format(i)) for i in range(statements)]
+    return Scenario(Configuration(actions), None)
+
+
+def measure(emit: Callable[[str], None], path: str) -> Tuple[float, int]:
+    """ Measures the elapsed time and the peak memory of the given emitter. """
+    tracemalloc.start()
+    begin = time.perf_counter()
+    emit(path)
+    elapsed = time.perf_counter() - begin
+    peak = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+    return elapsed, peak
+
+
+if __name__ == '__main__':
+    argparser = ArgumentParser(description="In-memory vs streamed XML emission.")
+    argparser.add_argument('-n', '--statements', type=int, nargs='+', default=[10000, 100000, 300000],
+                           help="The number of statements of the scenarios.")
+    arguments = argparser.parse_args()
+    logging.disable(logging.DEBUG)
+
+    def emit_string(path: str) -> None:
+        outputcode = Interpreter.interpret(scenario, 'xml')
+        with open(path, 'w') as fileoutput:
+            fileoutput.write(outputcode)
+
+    def emit_stream(path: str) -> None:
+        with open(path, 'w') as fileoutput:
+            Interpreter.interpret_to(scenario, 'xml', fileoutput)
+
+    print('{:>10} {:>8} {:>12} {:>12}'.format('statements', 'mode', 'time [s]', 'peak [MiB]'))
+    with tempfile.TemporaryDirectory() as directory:
+        for statements in arguments.statements:
+            scenario = build_scenario(statements)
+            for mode, emit in (('string', emit_string), ('stream', emit_stream)):
+                elapsed, peak = measure(emit, os.path.join(directory, mode + '.xml'))
+                print('{:>10} {:>8} {:>12.3f} {:>12.1f}'.format(statements, mode, elapsed, peak / 2 ** 20))
@@ -0,0 +1,97 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+""" The benchmark of the output formats.
+
+Interprets a generated scenario with each interpreter and compares the size
+of the output, the emit time and the time a downstream consumer spends to
+load the output (with the standard library parsers, with the Py-ADeLe's
+reader for the binary format, which reconstructs the whole model).
+
+Usage:
+    python benchmarks/bench_formats.py [-t tokens] [-r runs]
+
+Each format is measured plain and compressed (gzip, xz), the emit throughput
+refers to the uncompressed output.
+
+Author:
+    Francesco Racciatti
+
+Copyright 2018 Francesco Racciatti
+
+"""
+
+
+import os
+import sys
+sys.path[:0] = [os.path.join(os.path.dirname(__file__), '..', 'src', p) for p in ('', 'model', 'parser', 'shell', 'util')]
+
+import gzip
+import lzma
+import json
+import time
+import logging
+import statistics
+from argparse import ArgumentParser
+from xml.etree import ElementTree
+from typing import Any, Callable, Dict, List, Tuple
+
+import generator
+from grammar import parser
+from model.interpreter import Interpreter
+from model import binary
+
+
+# The formats under comparison: the label, the interpreter, the compact dialect and the downstream loader
+FORMATS: List[Tuple[str, str, bool, Callable[[Any], Any]]] = [
+    ('xml', 'xml', False, ElementTree.fromstring),
+    ('xml-c', 'xml', True, ElementTree.fromstring),
+    ('json', 'json', False, json.loads),
+    ('ndjson', 'ndjson', False, lambda output: [json.loads(line) for line in output.splitlines()]),
+    ('adeleb', 'adeleb', False, binary.loads),
+]
+
+# The compressions of the outputs
+CODECS: Dict[str, Any] = {'': None, '.gz': gzip, '.xz': lzma}
+
+
+def encode(output: Any) -> bytes:
+    """ Gets the bytes of the given output. """
+    return output if isinstance(output, bytes) else output.encode('utf-8')
+
+
+def measure(function: Callable[[], Any], runs: int) -> float:
+    """ Gets the median time of the given function. """
+    samples: List[float] = []
+    for _ in range(runs):
+        begin = time.perf_counter()
+        function()
+        samples.append(time.perf_counter() - begin)
+    return statistics.median(samples)
+
+
+if __name__ == '__main__':
+    argparser = ArgumentParser(description="Output size, emit time and load time of each interpreter.")
+    argparser.add_argument('-t', '--tokens', type=int, default=500000, help="The size of the scenario.")
+    argparser.add_argument('-r', '--runs', type=int, default=5, help="The number of runs.")
+    arguments = argparser.parse_args()
+    logging.disable(logging.CRITICAL)
+
+    # The configuration actions are the only statements interpreted so far
+    scenario = parser.parse(generator.generate(generator.scale(arguments.tokens, actions=1.0)))
+    print('{:>10} {:>12} {:>10} {:>10} {:>12}'.format('format', 'size [KiB]', 'emit [ms]', 'load [ms]', 'emit [MB/s]'))
+    for label, interpreter, compact, load in FORMATS:
+        output = Interpreter.interpret(scenario, interpreter, compact)
+        for extension, codec in CODECS.items():
+            if codec is None:
+                data = encode(output)
+                emit = measure(lambda: encode(Interpreter.interpret(scenario, interpreter, compact)), arguments.runs)
+                loaded = measure(lambda: load(output), arguments.runs)
+            else:
+                data = codec.compress(encode(output))
+                emit = measure(lambda: codec.compress(encode(Interpreter.interpret(scenario, interpreter, compact))),
+                               arguments.runs)
+                binary_output = isinstance(output, bytes)
+                loaded = measure(lambda: load(codec.decompress(data) if binary_output else
+                                              codec.decompress(data).decode('utf-8')), arguments.runs)
+            print('{:>10} {:>12.1f} {:>10.1f} {:>10.1f} {:>12.1f}'.format(
+                label + extension, len(data) / 1024, emit * 1000, loaded * 1000, len(encode(output)) / emit / 2 ** 20))
@@ -0,0 +1,85 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+""" The benchmark of the import time (cold start) of Py-ADeLe.
+
+Imports the modules of Py-ADeLe in fresh interpreters with '-X importtime',
+reports the median import time of each module, together with its costliest
+imports, and fails if any exceeds the budget. The parsing tables are built
+on first use, hence they are not accounted.
+
+Usage:
+    python benchmarks/bench_import.py [-m module [module ...]] [-b budget] [-r runs]
+
+Author:
+    Francesco Racciatti
+
+Copyright 2018 Francesco Racciatti
+
+"""
+
+
+import os
+import re
+import sys
+import statistics
+import subprocess
+from argparse import ArgumentParser
+from typing import Dict, List, Tuple
+
+
+# The root of the repository
+ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+
+# The statement that sets the search path of Py-ADeLe's modules
+SEARCH_PATH = "import sys; sys.path[:0] = ['src', 'src/model', 'src/parser', 'src/shell', 'src/util']; "
+
+# The modules that must not be imported at runtime
+FORBIDDEN = ('mypy', 'mypy_extensions')
+
+# A line of the '-X importtime' report: the self and the cumulative time (us), the indented module
+IMPORTTIME = re.compile(r'import time:\s+(\d+) \|\s+(\d+) \| ( *)(\S+)')
+
+
+def import_module(module: str) -> Tuple[int, Dict[str, int], List[str]]:
+    """ Imports the given module in a fresh interpreter, returns its cumulative import
+    time, the self time of each imported module (us) and the imported forbidden modules.
+    """
+    statement = SEARCH_PATH + "import {}; print(*(m for m in {!r} if m in sys.modules))".format(module, FORBIDDEN)
+    process = subprocess.run([sys.executable, '-X', 'importtime', '-c', statement], cwd=ROOT, check=True,
+                             stdout=subprocess.PIPE, stderr=subprocess.PIPE, universal_newlines=True)
+    total = 0
+    selves: Dict[str, int] = {}
+    for line in process.stderr.splitlines():
+        match = IMPORTTIME.match(line)
+        if match is None:
+            continue
+        selves[match.group(4)] = int(match.group(1))
+        if match.group(4) == module and not match.group(3):
+            total = int(match.group(2))
+    return total, selves, process.stdout.split()
+
+
+if __name__ == '__main__':
+    argparser = ArgumentParser(description="Cold start import time of the modules, against a budget.")
+    argparser.add_argument('-m', '--modules', nargs='+', default=['grammar', 'service'],
+                           help="The modules to be imported.")
+    argparser.add_argument('-b', '--budget', type=float, default=150.0, help="The budget per module [ms].")
+    argparser.add_argument('-r', '--runs', type=int, default=5, help="The number of runs.")
+    argparser.add_argument('-n', '--top', type=int, default=8, help="The number of the costliest imports shown.")
+    arguments = argparser.parse_args()
+
+    failed = False
+    for module in arguments.modules:
+        totals: List[int] = []
+        for _ in range(arguments.runs):
+            total, selves, forbidden = import_module(module)
+            totals.append(total)
+        median = statistics.median(totals) / 1000
+        verdict = 'ok' if median <= arguments.budget and not forbidden else 'OVER BUDGET' if not forbidden else 'FORBIDDEN'
+        print('{:<12} {:8.1f} ms (budget {:.1f} ms) {}'.format(module, median, arguments.budget, verdict))
+        for name, elapsed in sorted(selves.items(), key=lambda item: -item[1])[:arguments.top]:
+            print('    {:<36} {:8.1f} ms'.format(name, elapsed / 1000))
+        if forbidden:
+            print('    imports {}'.format(', '.join(forbidden)))
+        failed = failed or verdict != 'ok'
+    sys.exit(1 if failed else 0)
@@ -0,0 +1,68 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+""" The benchmark of the lexers.
+
+Tokenizes a generated scenario with the PLY's lexer, the memory-mapped one
+and the high-throughput one, then reports their throughput in tokens per
+second, both standalone and within a full parse.
+
+Usage:
+    python benchmarks/bench_lexer.py [-t tokens] [-r runs]
+
+Author:
+    Francesco Racciatti
+
+Copyright 2018 Francesco Racciatti
+
+"""
+
+
+import os
+import sys
+sys.path[:0] = [os.path.join(os.path.dirname(__file__), '..', 'src', p) for p in ('', 'model', 'parser', 'shell', 'util')]
+
+import time
+import logging
+import statistics
+from argparse import ArgumentParser
+from typing import Any, Callable, List
+
+import generator
+from grammar import parser
+from lexer import get_scanner
+
+
+def measure(function: Callable[[], Any], runs: int) -> float:
+    """ Gets the median time of the given function. """
+    samples: List[float] = []
+    for _ in range(runs):
+        begin = time.perf_counter()
+        function()
+        samples.append(time.perf_counter() - begin)
+    return statistics.median(samples)
+
+
+def tokenize(sourcecode: Any, fast: bool) -> int:
+    """ Tokenizes the given source code, returns the number of tokens. """
+    scanner = get_scanner(sourcecode, fast)
+    scanner.input(sourcecode)
+    return sum(1 for _ in scanner)
+
+
+if __name__ == '__main__':
+    argparser = ArgumentParser(description="Throughput of the lexers, in tokens per second.")
+    argparser.add_argument('-t', '--tokens', type=int, default=500000, help="The size of the scenario.")
+    argparser.add_argument('-r', '--runs', type=int, default=5, help="The number of runs.")
+    arguments = argparser.parse_args()
+    logging.disable(logging.CRITICAL)
+
+    sourcecode = generator.generate(generator.scale(arguments.tokens))
+    tokens = tokenize(sourcecode, False)
+    print('{:>8} {:>10} {:>12} {:>14} {:>14}'.format('lexer', 'tokens', 'lex [ms]', 'lex [tok/s]', 'parse [tok/s]'))
+    for label, source, fast in (('ply', sourcecode, False),
+                                ('mapped', sourcecode.encode('utf-8'), False),
+                                ('fast', sourcecode, True)):
+        lexed = measure(lambda: tokenize(source, fast), arguments.runs)
+        parsed = measure(lambda: parser.parse(source, lexer=get_scanner(source, fast)), arguments.runs)
+        print('{:>8} {:>10} {:>12.1f} {:>14.0f} {:>14.0f}'.format(
+            label, tokens, lexed * 1000, tokens / lexed, tokens / parsed))
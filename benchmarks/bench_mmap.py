@@ -0,0 +1,102 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+""" The benchmark of the memory-mapped input path.
+
+Compares reading the whole source into a string against memory-mapping it,
+in terms of peak RSS and throughput, on a large generated scenario. Each
+measure runs into a fresh interpreter, so that the peak RSS is not shared.
+
+Usage:
+    python benchmarks/bench_mmap.py [-m megabytes] [--lex-only]
+
+Author:
+    Francesco Racciatti
+
+Copyright 2018 Francesco Racciatti
+
+"""
+
+
+import os
+import sys
+sys.path[:0] = [os.path.join(os.path.dirname(__file__), '..', 'src', p) for p in ('', 'model', 'parser', 'shell', 'util')]
+
+import json
+import time
+import logging
+import resource
+import tempfile
+import subprocess
+from argparse import ArgumentParser
+
+
+# The modes under comparison
+MODES = ('read', 'mmap')
+
+
+def generate(path: str, megabytes: float) -> None:
+    """ Generates a scenario of (about) the given size. """
+    with open(path, 'w') as filesource:
+        filesource.write('scenario\n{\n\tattack\n\t{\n')
+        index = 0
+        while filesource.tell() < megabytes * 2 ** 20:
+            filesource.write('\t\t# Declares a bunch of variables\n')
+            filesource.write('\t\tinteger integer_{0}, other_{0};\n\t\tmessage message_{0};\n'.format(index))
+            index += 1
+        filesource.write('\t}\n}\n')
+
+
+def run(path: str, mode: str, lex_only: bool) -> dict:
+    """ Parses (or lexes) the given source with the given mode, in this interpreter. """
+    logging.disable(logging.CRITICAL)
+    from lexer import get_scanner
+    from grammar import parser
+    from mapped import open_mapped
+    # The number of the tokens, counted by the lexer only
+    tokens = None
+    begin = time.perf_counter()
+    if mode == 'read':
+        with open(path, 'r') as filesource:
+            sourcecode = filesource.read()
+        if lex_only:
+            scanner = get_scanner(sourcecode)
+            scanner.input(sourcecode)
+            tokens = sum(1 for _ in scanner)
+        else:
+            parser.parse(sourcecode)
+    else:
+        with open_mapped(path) as sourcecode:
+            if lex_only:
+                scanner = get_scanner(sourcecode)
+                scanner.input(sourcecode)
+                tokens = sum(1 for _ in scanner)
+            else:
+                parser.parse(sourcecode)
+    elapsed = time.perf_counter() - begin
+    # On Linux ru_maxrss is expressed in KiB
+    return {'elapsed': elapsed, 'rss': resource.getrusage(resource.RUSAGE_SELF).ru_maxrss * 1024, 'tokens': tokens}
+
+
+if __name__ == '__main__':
+    argparser = ArgumentParser(description="Read-all vs memory-mapped input.")
+    argparser.add_argument('-m', '--megabytes', type=float, default=20, help="The size of the scenario.")
+    argparser.add_argument('--lex-only', action='store_true', help="Measures the lexer only.")
+    argparser.add_argument('--run', nargs=2, metavar=('PATH', 'MODE'), help="Runs a single measure (internal).")
+    arguments = argparser.parse_args()
+
+    if arguments.run:
+        print(json.dumps(run(arguments.run[0], arguments.run[1], arguments.lex_only)))
+        sys.exit(0)
+
+    with tempfile.TemporaryDirectory() as directory:
+        path = os.path.join(directory, 'scenario.adele')
+        generate(path, arguments.megabytes)
+        size = os.path.getsize(path)
+        print('source {:.1f} MiB, {}'.format(size / 2 ** 20, 'lexer only' if arguments.lex_only else 'parser'))
+        print('{:>6} {:>10} {:>12} {:>14} {:>12}'.format('mode', 'time [s]', 'MiB/s', 'peak RSS [MiB]', 'tokens'))
+        for mode in MODES:
+            command = [sys.executable, __file__, '--run', path, mode] + (['--lex-only'] if arguments.lex_only else [])
+            result = json.loads(subprocess.run(command, check=True, stdout=subprocess.PIPE).stdout)
+            print('{:>6} {:>10.2f} {:>12.2f} {:>14.1f} {:>12}'.format(
+                mode, result['elapsed'], size / 2 ** 20 / result['elapsed'], result['rss'] / 2 ** 20,
+                '-' if result['tokens'] is None else result['tokens']))
@@ -0,0 +1,84 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+""" The memory benchmark of the Object-Oriented Model.
+
+Builds a scenario made of (about) one million nodes with the slotted model
+and with an equivalent dictionary-based model, then compares their memory
+footprint and the time spent to interpret them.
+
+Usage:
+    python benchmarks/bench_model.py [-n nodes]
+
+Author:
+    Francesco Racciatti
+
+Copyright 2018 Francesco Racciatti
+
+"""
+
+
+import os
+import sys
+sys.path[:0] = [os.path.join(os.path.dirname(__file__), '..', 'src', p) for p in ('', 'model', 'parser', 'shell', 'util')]
+
+import gc
+import time
+import logging
+import tracemalloc
+from argparse import ArgumentParser
+from typing import Any, Callable, List
+
+from model.oom import Literal, Variable, SetUnitTime, Configuration, Scenario
+
+
+class DictNode(object):
+    """ A dictionary-based node, i.e. the former layout of the model. """
+
+    def __init__(self, **fields: Any) -> None:
+        self.__dict__.update(fields)
+
+
+def build_slotted(nodes: int) -> List[Any]:
+    """ Builds the given number of nodes with the slotted model. """
+    third = nodes // 3
+    return ([Literal('integer', i, i) for i in range(third)] +
+            [Variable('v{}'.format(i), 'integer', None, 0) for i in range(third)] +
+            [SetUnitTime('_string_s') for _ in range(nodes - 2 * third)])
+
+
+def build_dict(nodes: int) -> List[Any]:
+    """ Builds the given number of nodes with the dictionary-based model. """
+    third = nodes // 3
+    return ([DictNode(identifier='_{}'.format(i), type='integer', value=i, index=i) for i in range(third)] +
+            [DictNode(identifier='v{}'.format(i), type='integer', reference=None, scope=0) for i in range(third)] +
+            [DictNode(reference='_string_s') for _ in range(nodes - 2 * third)])
+
+
+def footprint(build: Callable[[int], List[Any]], nodes: int) -> int:
+    """ Measures the memory retained by the given number of nodes. """
+    gc.collect()
+    tracemalloc.start()
+    model = build(nodes)
+    size = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+    del model
+    return size
+
+
+if __name__ == '__main__':
+    argparser = ArgumentParser(description="Memory footprint of the Object-Oriented Model.")
+    argparser.add_argument('-n', '--nodes', type=int, default=1000000, help="The number of nodes.")
+    arguments = argparser.parse_args()
+    logging.disable(logging.CRITICAL)
+
+    print('{:>8} {:>14} {:>12}'.format('model', 'memory [MiB]', 'bytes/node'))
+    for label, build in (('dict', build_dict), ('slotted', build_slotted)):
+        size = footprint(build, arguments.nodes)
+        print('{:>8} {:>14.1f} {:>12.1f}'.format(label, size / 2 ** 20, size / arguments.nodes))
+
+    from model.interpreter import Interpreter
+    scenario = Scenario(Configuration([SetUnitTime('_string_s') for _ in range(arguments.nodes // 10)]))
+    begin = time.perf_counter()
+    for _ in Interpreter.generate(scenario, 'xml'):
+        pass
+    print('interpreted {} actions in {:.2f} s'.format(arguments.nodes // 10, time.perf_counter() - begin))
@@ -0,0 +1,81 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+""" The benchmark of the compile daemon.
+
+Compiles the same small scenarios by spawning Py-ADeLe once per scenario and
+by posting them to a compile daemon, then compares the latency per scenario.
+
+Usage:
+    python benchmarks/bench_server.py [-n scenarios] [-j jobs]
+
+Author:
+    Francesco Racciatti
+
+Copyright 2018 Francesco Racciatti
+
+"""
+
+
+import os
+import sys
+sys.path[:0] = [os.path.join(os.path.dirname(__file__), '..', 'src', p) for p in ('', 'model', 'parser', 'shell', 'util')]
+
+import json
+import time
+import logging
+import tempfile
+import threading
+import statistics
+import subprocess
+import http.client
+from argparse import ArgumentParser
+from typing import List
+
+import generator
+from server import Daemon
+
+
+# The root of the repository, the working directory of Py-ADeLe
+ROOT = os.path.join(os.path.dirname(os.path.abspath(__file__)), '..')
+
+
+if __name__ == '__main__':
+    argparser = ArgumentParser(description="Latency per scenario, one process per scenario vs compile daemon.")
+    argparser.add_argument('-n', '--scenarios', type=int, default=20, help="The number of scenarios.")
+    argparser.add_argument('-j', '--jobs', type=int, default=2, help="The worker processes of the daemon.")
+    arguments = argparser.parse_args()
+    logging.disable(logging.CRITICAL)
+
+    # Distinct scenarios, so that the build cache does not help
+    sources = [generator.generate(generator.scale(2000, seed=seed)) for seed in range(arguments.scenarios)]
+    with tempfile.TemporaryDirectory() as directory:
+        spawned: List[float] = []
+        for index, sourcecode in enumerate(sources):
+            path = os.path.join(directory, '{}.adele'.format(index))
+            with open(path, 'w') as filesource:
+                filesource.write(sourcecode)
+            begin = time.perf_counter()
+            subprocess.run([sys.executable, os.path.join('src', 'pyadele.py'), '-s', path, '-i', 'xml', '-f',
+                            '--no-cache'], cwd=ROOT, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL, check=True)
+            spawned.append(time.perf_counter() - begin)
+
+        daemon = Daemon(port=0, jobs=arguments.jobs, no_cache=True)
+        thread = threading.Thread(target=daemon.serve)
+        thread.start()
+        served: List[float] = []
+        try:
+            for sourcecode in sources:
+                connection = http.client.HTTPConnection(*daemon.address)
+                begin = time.perf_counter()
+                connection.request('POST', '/compile', json.dumps({'source': sourcecode, 'interpreter': 'xml'}),
+                                   {'Content-Type': 'application/json'})
+                connection.getresponse().read()
+                served.append(time.perf_counter() - begin)
+                connection.close()
+        finally:
+            daemon.shutdown()
+            thread.join()
+
+    print('{:>10} {:>14} {:>12}'.format('mode', 'median [ms]', 'max [ms]'))
+    for mode, samples in (('spawn', spawned), ('daemon', served)):
+        print('{:>10} {:>14.1f} {:>12.1f}'.format(mode, statistics.median(samples) * 1000, max(samples) * 1000))
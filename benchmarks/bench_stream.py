@@ -0,0 +1,78 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+""" The benchmark of the single-pass compilation.
+
+Compiles generated scenarios of growing size in two passes (the parser builds
+the attack scenario, then the interpreter walks it) and in a single pass (the
+parser pushes its events to the emitter, which writes the output at once),
+then compares the elapsed time and the peak memory: the latter stays flat in
+single pass.
+
+Usage:
+    python benchmarks/bench_stream.py [-t tokens [tokens ...]] [-i interpreter [interpreter ...]]
+
+Author:
+    Francesco Racciatti
+
+Copyright 2018 Francesco Racciatti
+
+"""
+
+
+import os
+import sys
+sys.path[:0] = [os.path.join(os.path.dirname(__file__), '..', 'src', p) for p in ('', 'model', 'parser', 'shell', 'util')]
+
+import time
+import logging
+import tempfile
+import tracemalloc
+from argparse import ArgumentParser
+from typing import Callable, Tuple
+
+import generator
+from grammar import parser, ParseContext
+from model.interpreter import Interpreter
+from model.emitter import get_emitter
+
+
+def measure(compile: Callable[[str], None], path: str) -> Tuple[float, int]:
+    """ Measures the elapsed time and the peak memory of the given compilation. """
+    tracemalloc.start()
+    begin = time.perf_counter()
+    compile(path)
+    elapsed = time.perf_counter() - begin
+    peak = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+    return elapsed, peak
+
+
+if __name__ == '__main__':
+    argparser = ArgumentParser(description="Two-pass vs single-pass compilation.")
+    argparser.add_argument('-t', '--tokens', type=int, nargs='+', default=[100000, 400000, 1600000],
+                           help="The sizes of the scenarios.")
+    argparser.add_argument('-i', '--interpreters', nargs='+', default=['json', 'xml-c'],
+                           help="The interpreters ('-c' selects the compact dialect).")
+    arguments = argparser.parse_args()
+    logging.disable(logging.CRITICAL)
+
+    print('{:>10} {:>8} {:>8} {:>12} {:>12}'.format('tokens', 'format', 'mode', 'time [s]', 'peak [MiB]'))
+    with tempfile.TemporaryDirectory() as directory:
+        for tokens in arguments.tokens:
+            # The configuration actions are the only statements interpreted so far, their literals are distinct
+            sourcecode = generator.generate(generator.scale(tokens, actions=1.0, literals=tokens))
+            for label in arguments.interpreters:
+                interpreter, compact = label.split('-')[0], label.endswith('-c')
+
+                def compile_twice(path: str) -> None:
+                    scenario = parser.parse(sourcecode)
+                    with open(path, 'w') as fileoutput:
+                        Interpreter.interpret_to(scenario, interpreter, fileoutput, compact)
+
+                def compile_once(path: str) -> None:
+                    with open(path, 'w') as fileoutput:
+                        parser.parse(sourcecode, context=ParseContext(get_emitter(interpreter, fileoutput, compact)))
+
+                for mode, compile in (('2-pass', compile_twice), ('1-pass', compile_once)):
+                    elapsed, peak = measure(compile, os.path.join(directory, mode))
+                    print('{:>10} {:>8} {:>8} {:>12.3f} {:>12.1f}'.format(tokens, label, mode, elapsed, peak / 2 ** 20))
@@ -0,0 +1,156 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+""" The benchmark suite of the lexer, the parser and the interpreter.
+
+Measures the lexer, parser.parse and Interpreter.interpret separately over
+synthetic scenarios of increasing size, records the results as JSON and
+compares two result files against a regression threshold.
+
+Usage:
+    python benchmarks/bench_suite.py run [-t tokens [...]] [-r runs] [-o results.json]
+    python benchmarks/bench_suite.py compare baseline.json results.json [--threshold 0.1]
+
+Author:
+    Francesco Racciatti
+
+Copyright 2018 Francesco Racciatti
+
+"""
+
+
+import os
+import sys
+sys.path[:0] = [os.path.join(os.path.dirname(__file__), '..', 'src', p) for p in ('', 'model', 'parser', 'shell', 'util')]
+
+import gc
+import json
+import time
+import logging
+import platform
+import statistics
+from argparse import ArgumentParser
+from typing import Any, Callable, Dict, List
+
+import generator
+
+
+# The stages under measure
+STAGES = ('lex', 'parse', 'interpret')
+
+# The default sizes of the scenarios, in tokens (up to 10M on demand)
+SIZES = (1000, 10000, 100000, 1000000)
+
+
+def measure(function: Callable[[], Any], runs: int) -> List[float]:
+    """ Measures the given function, the garbage collector is disabled during the runs. """
+    samples = []
+    for _ in range(runs):
+        gc.collect()
+        gc.disable()
+        try:
+            begin = time.perf_counter()
+            function()
+            samples.append(time.perf_counter() - begin)
+        finally:
+            gc.enable()
+    return samples
+
+
+def bench(tokens: int, runs: int, interpreter: str) -> Dict[str, Any]:
+    """ Measures the stages over a scenario of (about) the given number of tokens. """
+    from lexer import get_scanner
+    from grammar import parser
+    from model.interpreter import Interpreter
+
+    profile = generator.scale(tokens)
+    sourcecode = generator.generate(profile)
+
+    def lex() -> None:
+        scanner = get_scanner(sourcecode)
+        scanner.input(sourcecode)
+        for _ in scanner:
+            pass
+
+    scenario = parser.parse(sourcecode)
+    functions = {
+        'lex': lex,
+        'parse': lambda: parser.parse(sourcecode),
+        'interpret': lambda: Interpreter.interpret(scenario, interpreter),
+    }
+    result: Dict[str, Any] = {'tokens': profile.tokens, 'bytes': len(sourcecode.encode('utf-8'))}
+    for stage in STAGES:
+        samples = measure(functions[stage], runs)
+        result[stage] = {
+            'median': statistics.median(samples),
+            'min': min(samples),
+            'max': max(samples),
+            'tokens_per_second': profile.tokens / statistics.median(samples),
+        }
+    return result
+
+
+def run(sizes: List[int], runs: int, interpreter: str) -> Dict[str, Any]:
+    """ Runs the suite over the given sizes. """
+    from util.version import VERSION
+    logging.disable(logging.CRITICAL)
+    results: Dict[str, Any] = {
+        'version': VERSION,
+        'python': platform.python_version(),
+        'platform': platform.platform(),
+        'timestamp': time.strftime('%Y-%m-%dT%H:%M:%S%z'),
+        'runs': runs,
+        'sizes': {},
+    }
+    for tokens in sizes:
+        result = bench(tokens, runs, interpreter)
+        results['sizes'][str(tokens)] = result
+        print('{:>10} tokens  '.format(result['tokens']) + '  '.join(
+            '{} {:10.2f} ms'.format(stage, result[stage]['median'] * 1000) for stage in STAGES))
+    return results
+
+
+def compare(baseline: Dict[str, Any], results: Dict[str, Any], threshold: float) -> bool:
+    """ Compares the medians of the given results against the baseline, returns False on regressions. """
+    passed = True
+    print('{:>10} {:>10} {:>12} {:>12} {:>8}'.format('tokens', 'stage', 'baseline ms', 'results ms', 'change'))
+    for size, result in results['sizes'].items():
+        reference = baseline['sizes'].get(size)
+        if reference is None:
+            continue
+        for stage in STAGES:
+            before = reference[stage]['median']
+            after = result[stage]['median']
+            change = after / before - 1
+            regression = change > threshold
+            passed = passed and not regression
+            print('{:>10} {:>10} {:>12.2f} {:>12.2f} {:>+7.1f}%{}'.format(
+                size, stage, before * 1000, after * 1000, change * 100, '  REGRESSION' if regression else ''))
+    return passed
+
+
+if __name__ == '__main__':
+    argparser = ArgumentParser(description="Benchmark suite of the lexer, the parser and the interpreter.")
+    commands = argparser.add_subparsers(dest='command')
+    command = commands.add_parser('run', help="Runs the suite.")
+    command.add_argument('-t', '--tokens', type=int, nargs='+', default=SIZES, help="The sizes of the scenarios.")
+    command.add_argument('-r', '--runs', type=int, default=5, help="The number of runs of each stage.")
+    command.add_argument('-i', '--interpreter', default='xml', help="The interpreter.")
+    command.add_argument('-o', '--output', default=None, help="The JSON results file.")
+    command = commands.add_parser('compare', help="Compares two results files.")
+    command.add_argument('baseline', help="The baseline results file.")
+    command.add_argument('results', help="The results file.")
+    command.add_argument('--threshold', type=float, default=0.1, help="The tolerated slowdown (0.1 = 10%%).")
+    arguments = argparser.parse_args()
+
+    if arguments.command == 'run':
+        results = run(arguments.tokens, arguments.runs, arguments.interpreter)
+        if arguments.output:
+            with open(arguments.output, 'w') as fileoutput:
+                json.dump(results, fileoutput, indent=4)
+    elif arguments.command == 'compare':
+        with open(arguments.baseline, 'r') as filebaseline, open(arguments.results, 'r') as fileresults:
+            passed = compare(json.load(filebaseline), json.load(fileresults), arguments.threshold)
+        sys.exit(0 if passed else 1)
+    else:
+        argparser.print_help()
+        sys.exit(2)
@@ -0,0 +1,56 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+""" The benchmark of the redeclaration checks.
+
+Parses scenarios with tens of thousands of declarations, either one
+identifier per statement or many identifiers per statement, and reports the
+parse time per declared identifier: it stays flat as the scenario grows when
+the checks run in constant time.
+
+Usage:
+    python benchmarks/bench_symbols.py [-d declarations [...]] [-w width] [-r runs]
+
+Author:
+    Francesco Racciatti
+
+Copyright 2018 Francesco Racciatti
+
+"""
+
+
+import os
+import sys
+sys.path[:0] = [os.path.join(os.path.dirname(__file__), '..', 'src', p) for p in ('', 'model', 'parser', 'shell', 'util')]
+
+import time
+import logging
+import statistics
+from argparse import ArgumentParser
+
+import generator
+from grammar import parser
+
+
+if __name__ == '__main__':
+    argparser = ArgumentParser(description="Parse time per declaration as the scenario grows.")
+    argparser.add_argument('-d', '--declarations', type=int, nargs='+', default=[10000, 20000, 40000, 80000],
+                           help="The numbers of declared identifiers.")
+    argparser.add_argument('-w', '--width', type=int, default=1000, help="The identifiers per statement (wide shape).")
+    argparser.add_argument('-r', '--runs', type=int, default=3, help="The number of runs.")
+    arguments = argparser.parse_args()
+    logging.disable(logging.CRITICAL)
+
+    print('{:>12} {:>8} {:>12} {:>16}'.format('declarations', 'width', 'median [ms]', 'per decl. [us]'))
+    for declarations in arguments.declarations:
+        for width in (1, arguments.width):
+            statements = declarations // width
+            profile = generator.Profile({'integer': statements - statements // 2, 'message': statements // 2}, width)
+            sourcecode = generator.generate(profile)
+            samples = []
+            for _ in range(arguments.runs):
+                begin = time.perf_counter()
+                parser.parse(sourcecode)
+                samples.append(time.perf_counter() - begin)
+            median = statistics.median(samples)
+            print('{:>12} {:>8} {:>12.1f} {:>16.2f}'.format(
+                statements * width, width, median * 1000, median / (statements * width) * 1e6))
@@ -0,0 +1,75 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+""" The startup benchmark for the cache of the lexing and parsing tables.
+
+Measures the time spent by a fresh interpreter to build the lexer and the
+parser, with an empty cache directory (cold) and with a populated one (warm).
+
+Usage:
+    python benchmarks/bench_tables.py [-r runs]
+
+Author:
+    Francesco Racciatti
+
+Copyright 2018 Francesco Racciatti
+
+"""
+
+
+import os
+import sys
+import time
+import shutil
+import tempfile
+import statistics
+import subprocess
+from argparse import ArgumentParser
+from typing import List
+
+
+# The root of the repository
+ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+
+# The statement that builds the lexer and the parser
+STARTUP = ("import sys; "
+           "sys.path[:0] = ['src', 'src/model', 'src/parser', 'src/shell', 'src/util']; "
+           "from grammar import parser, get_lexers; get_lexers(); parser.engine")
+
+
+def startup(directory: str) -> float:
+    """ Measures the startup time of a fresh interpreter using the given cache directory. """
+    environment = dict(os.environ)
+    environment['PYADELE_CACHE_DIR'] = directory
+    begin = time.perf_counter()
+    subprocess.run([sys.executable, '-c', STARTUP], cwd=ROOT, env=environment, check=True,
+                   stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+    return time.perf_counter() - begin
+
+
+def report(label: str, samples: List[float]) -> None:
+    """ Prints the statistics of the given samples. """
+    print('{:<6} median {:8.1f} ms   min {:8.1f} ms   max {:8.1f} ms'.format(
+        label,
+        statistics.median(samples) * 1000,
+        min(samples) * 1000,
+        max(samples) * 1000))
+
+
+if __name__ == '__main__':
+    argparser = ArgumentParser(description="Cold vs warm startup of the parsing engine.")
+    argparser.add_argument('-r', '--runs', type=int, default=10, help="The number of runs.")
+    arguments = argparser.parse_args()
+
+    cold: List[float] = []
+    warm: List[float] = []
+    for _ in range(arguments.runs):
+        directory = tempfile.mkdtemp()
+        try:
+            cold.append(startup(directory))
+            warm.append(startup(directory))
+        finally:
+            shutil.rmtree(directory, ignore_errors=True)
+
+    report('cold', cold)
+    report('warm', warm)
+    print('speedup {:.1f}x'.format(statistics.median(cold) / statistics.median(warm)))
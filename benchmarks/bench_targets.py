@@ -0,0 +1,71 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+""" The benchmark of the multi-target compilation.
+
+Compares compiling a generated source into several interpretations by means
+of a compilation per interpreter (a parse each) against a single compilation
+of all the targets (a single parse), both interpreting the scenario and
+streaming the outputs while parsing.
+
+Usage:
+    python benchmarks/bench_targets.py [-t tokens] [-r runs] [-i xml,json,ndjson]
+
+Author:
+    Francesco Racciatti
+
+Copyright 2018 Francesco Racciatti
+
+"""
+
+
+import os
+import sys
+sys.path[:0] = [os.path.join(os.path.dirname(__file__), '..', 'src', p) for p in ('', 'model', 'parser', 'shell', 'util')]
+
+import time
+import shutil
+import logging
+import tempfile
+import statistics
+from argparse import ArgumentParser
+from typing import Any, Callable, List
+
+import generator
+from service import compile_file, compile_targets, plan_targets
+
+
+def measure(function: Callable[[], Any], runs: int) -> float:
+    """ Gets the median time of the given function. """
+    samples: List[float] = []
+    for _ in range(runs):
+        begin = time.perf_counter()
+        function()
+        samples.append(time.perf_counter() - begin)
+    return statistics.median(samples)
+
+
+if __name__ == '__main__':
+    argparser = ArgumentParser(description="Single parse against a parse per interpreter.")
+    argparser.add_argument('-t', '--tokens', type=int, default=200000, help="The size of the scenario.")
+    argparser.add_argument('-r', '--runs', type=int, default=3, help="The number of runs.")
+    argparser.add_argument('-i', '--interpreters', default='xml,json,ndjson', help="The interpreters.")
+    arguments = argparser.parse_args()
+    logging.disable(logging.CRITICAL)
+
+    directory = tempfile.mkdtemp()
+    try:
+        source = os.path.join(directory, 'scenario.adele')
+        with open(source, 'w') as filesource:
+            generator.write(generator.scale(arguments.tokens), filesource)
+        targets = plan_targets(source, arguments.interpreters.split(','))
+
+        print('source {:.1f} KiB, {} targets'.format(os.path.getsize(source) / 1024, len(targets)))
+        for stream in (False, True):
+            separate = measure(lambda: [compile_file(source, output, interpreter, compact=stream, stream=stream)
+                                        for interpreter, output in targets], arguments.runs)
+            single = measure(lambda: compile_targets(source, targets, compact=stream, stream=stream), arguments.runs)
+            mode = 'stream' if stream else 'interpret'
+            print('{:<10} {:<10} {:10.1f} ms'.format(mode, 'separate', separate * 1000))
+            print('{:<10} {:<10} {:10.1f} ms {:8.2f}x'.format(mode, 'single', single * 1000, separate / single))
+    finally:
+        shutil.rmtree(directory, ignore_errors=True)
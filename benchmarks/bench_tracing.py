@@ -0,0 +1,97 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+""" The benchmark of the tracing hook of the parser.
+
+Parses a generated scenario without tracer, with the former eager logging
+of every production (emulated, logging disabled) and with an active tracer.
+
+Usage:
+    python benchmarks/bench_tracing.py [-d declarations] [-r runs]
+
+Author:
+    Francesco Racciatti
+
+Copyright 2018 Francesco Racciatti
+
+"""
+
+
+import os
+import sys
+sys.path[:0] = [os.path.join(os.path.dirname(__file__), '..', 'src', p) for p in ('', 'model', 'parser', 'shell', 'util')]
+
+import copy
+import time
+import logging
+import statistics
+from argparse import ArgumentParser
+from typing import Any, List
+
+from ply.yacc import YaccProduction
+
+from grammar import Parser, parser
+from tracing import Tracer
+
+
+# Creates the logger
+logger = logging.getLogger(__name__)
+
+
+def generate(declarations: int) -> str:
+    """ Generates a scenario declaring the given number of variables. """
+    lines = ['scenario\n{\n\tconfiguration\n\t{\n\t\tsetTimeStart(0.0);\n\t}\n\tattack\n\t{\n']
+    for index in range(declarations):
+        lines.append('\t\tinteger integer_{0};\n\t\tmessage message_{0};\n'.format(index))
+    lines.append('\t}\n}\n')
+    return ''.join(lines)
+
+
+def eager_action(action: Any) -> Any:
+    """ Wraps the given action with the former, eagerly formatted, debug logging. """
+
+    def logged(p: YaccProduction) -> None:
+        logger.debug("Yacc production: {}".format(p[1:]))
+        action(p)
+
+    return logged
+
+
+def eager_parser() -> Parser:
+    """ Gets a parser logging every production, as it used to. """
+    engine = copy.copy(parser.engine)
+    engine.productions = []
+    for production in parser.engine.productions:
+        if production.callable is not None:
+            production = copy.copy(production)
+            production.callable = eager_action(production.callable)
+        engine.productions.append(production)
+    return Parser(engine)
+
+
+def measure(target: Parser, sourcecode: str, runs: int, traced: bool) -> List[float]:
+    """ Measures the parse time of the given source code. """
+    samples = []
+    for _ in range(runs):
+        tracer = Tracer() if traced else None
+        begin = time.perf_counter()
+        target.parse(sourcecode, tracer=tracer)
+        samples.append(time.perf_counter() - begin)
+    return samples
+
+
+if __name__ == '__main__':
+    argparser = ArgumentParser(description="Parse time without tracer, with eager logging and with a tracer.")
+    argparser.add_argument('-d', '--declarations', type=int, default=5000, help="The number of declarations.")
+    argparser.add_argument('-r', '--runs', type=int, default=10, help="The number of runs.")
+    arguments = argparser.parse_args()
+    logging.disable(logging.CRITICAL)
+
+    sourcecode = generate(arguments.declarations)
+    # Warms up the parser
+    parser.parse(sourcecode)
+    medians = [(label, statistics.median(measure(target, sourcecode, arguments.runs, traced)))
+               for label, target, traced in (('off', parser, False), ('eager', eager_parser(), False), ('tracer', parser, True))]
+    baseline = medians[0][1]
+    print('{:>8} {:>12} {:>10}'.format('mode', 'median [ms]', 'overhead'))
+    for label, median in medians:
+        print('{:>8} {:>12.1f} {:>9.1f}%'.format(label, median * 1000, (median / baseline - 1) * 100))
@@ -0,0 +1,143 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+""" The generator of synthetic ADeLe's scenarios.
+
+Generates valid scenarios having a tunable number of declarations for each
+type, of identifiers for each declaration, of configuration actions and of
+distinct literals, either explicitly or scaled to a target number of tokens.
+
+The grammar admits a single scope (the attack block) for the declarations,
+so the nesting of the scopes is not tunable.
+
+Usage:
+    python benchmarks/generator.py -t tokens [-o path/to/output] [options]
+
+Author:
+    Francesco Racciatti
+
+Copyright 2018 Francesco Racciatti
+
+"""
+
+
+import sys
+import random
+from argparse import ArgumentParser
+from typing import Dict, Iterator, Sequence, TextIO
+
+
+# The types of the declarations
+TYPES = ('boolean', 'char', 'integer', 'float', 'string',
+         'uint8', 'uint16', 'uint32', 'uint64',
+         'sint8', 'sint16', 'sint32', 'sint64',
+         'float32', 'float64', 'message')
+
+# The configuration actions taking a string literal
+UNIT_ACTIONS = ('setUnitTime', 'setUnitLength', 'setUnitAngle')
+
+# The tokens of the scenario, configuration and attack blocks
+BLOCK_TOKENS = 3
+# The tokens of a configuration action, e.g. setTimeStart ( 1.0 ) ;
+ACTION_TOKENS = 5
+
+
+class Profile(object):
+    """ Models the shape of a synthetic scenario. """
+
+    def __init__(self,
+                 declarations: Dict[str, int],
+                 identifiers: int = 1,
+                 actions: int = 0,
+                 literals: int = 1,
+                 seed: int = 0) -> None:
+        # Maps each type onto the number of its declarations (statements)
+        self.declarations: Dict[str, int] = declarations
+        # The number of identifiers declared by each statement
+        self.identifiers: int = identifiers
+        # The number of configuration actions
+        self.actions: int = actions
+        # The number of distinct literals used by the configuration actions
+        self.literals: int = literals
+        # The seed of the shuffling of the statements
+        self.seed: int = seed
+
+    @property
+    def tokens(self) -> int:
+        """ The number of tokens of the scenario. """
+        tokens = BLOCK_TOKENS * (1 + bool(self.actions) + 1)
+        tokens += sum(self.declarations.values()) * (1 + 2 * self.identifiers)
+        return tokens + self.actions * ACTION_TOKENS
+
+
+def scale(tokens: int,
+          types: Sequence[str] = TYPES,
+          identifiers: int = 1,
+          actions: float = 0.1,
+          literals: int = 16,
+          seed: int = 0) -> Profile:
+    """ Gets the profile of a scenario of (about) the given number of tokens, spreading
+    the declarations evenly over the given types and devoting the given fraction of
+    the tokens to the configuration actions.
+    """
+    budget = max(tokens - 3 * BLOCK_TOKENS, 0)
+    count = int(budget * actions) // ACTION_TOKENS
+    statements = (budget - count * ACTION_TOKENS) // (1 + 2 * identifiers)
+    declarations = {t: statements // len(types) + (1 if i < statements % len(types) else 0)
+                    for i, t in enumerate(types)}
+    return Profile(declarations, identifiers, count, literals, seed)
+
+
+def generate_chunks(profile: Profile) -> Iterator[str]:
+    """ Generates the chunks of the scenario having the given profile. """
+    yield 'scenario\n{\n'
+    if profile.actions:
+        yield '\tconfiguration\n\t{\n'
+        for index in range(profile.actions):
+            literal = index % profile.literals
+            if index % 4 == 3:
+                yield '\t\tsetTimeStart({}.5);\n'.format(literal)
+            else:
+                yield '\t\t{}("u{}");\n'.format(UNIT_ACTIONS[index % 4], literal)
+        yield '\t}\n'
+    yield '\tattack\n\t{\n'
+    statements = [t for t, count in profile.declarations.items() for _ in range(count)]
+    random.Random(profile.seed).shuffle(statements)
+    counters = dict.fromkeys(profile.declarations, 0)
+    for type in statements:
+        identifiers = []
+        for _ in range(profile.identifiers):
+            counters[type] += 1
+            identifiers.append('{}_{}'.format(type, counters[type]))
+        yield '\t\t{} {};\n'.format(type, ', '.join(identifiers))
+    yield '\t}\n}\n'
+
+
+def generate(profile: Profile) -> str:
+    """ Generates the scenario having the given profile. """
+    return ''.join(generate_chunks(profile))
+
+
+def write(profile: Profile, fp: TextIO) -> None:
+    """ Writes the scenario having the given profile into the given file object. """
+    for chunk in generate_chunks(profile):
+        fp.write(chunk)
+
+
+if __name__ == '__main__':
+    argparser = ArgumentParser(description="Generates a synthetic ADeLe's scenario.")
+    argparser.add_argument('-t', '--tokens', type=int, required=True, help="The (approximate) number of tokens.")
+    argparser.add_argument('-o', '--output', default=None, help="The output file (default: standard output).")
+    argparser.add_argument('--types', nargs='+', choices=TYPES, default=TYPES, help="The types of the declarations.")
+    argparser.add_argument('--identifiers', type=int, default=1, help="The identifiers per declaration.")
+    argparser.add_argument('--actions', type=float, default=0.1, help="The fraction of tokens of the configuration.")
+    argparser.add_argument('--literals', type=int, default=16, help="The number of distinct literals.")
+    argparser.add_argument('--seed', type=int, default=0, help="The seed of the shuffling.")
+    arguments = argparser.parse_args()
+
+    profile = scale(arguments.tokens, arguments.types, arguments.identifiers,
+                    arguments.actions, arguments.literals, arguments.seed)
+    if arguments.output:
+        with open(arguments.output, 'w') as fileoutput:
+            write(profile, fileoutput)
+    else:
+        write(profile, sys.stdout)
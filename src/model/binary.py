@@ -0,0 +1,250 @@
+# -*- coding: utf-8 -*-
+""" This module contains the binary format of Py-ADeLe (.adeleb) and its reader.
+
+The layout of a file (the integers are unsigned LEB128 varints, unless stated):
+
+    magic       4 bytes, b'ADLB'
+    version     1 byte
+    strings     the count, then each string as its length and its UTF-8 bytes
+    classes     the count, then each class as the index of its name, the count
+                and the indexes of the names of its fields (i.e. its schema)
+    value       the scenario, as a tagged value
+
+The tagged values (1 byte tag, then the payload):
+
+    0x00  null
+    0x01  false
+    0x02  true
+    0x03  integer, zigzag encoded
+    0x04  float, IEEE 754 double, little endian
+    0x05  string, the index into the strings
+    0x06  list, the count, then the values
+    0x07  dict, the count, then the keys and the values
+    0x08  object, the index into the classes, then the values of its fields
+
+The scenario refers to the literals by their identifiers, i.e. by strings:
+each of them is encoded once, then referenced by its index into the strings.
+
+Author:
+    Francesco Racciatti
+
+Copyright 2018 Francesco Racciatti
+
+"""
+
+
+import struct
+from typing import Any, BinaryIO, Dict, Iterator, List, Tuple
+
+import oom
+
+
+# The magic number and the version of the format
+MAGIC = b'ADLB'
+VERSION = 1
+
+# The tags of the values
+TAG_NULL = 0x00
+TAG_FALSE = 0x01
+TAG_TRUE = 0x02
+TAG_INTEGER = 0x03
+TAG_FLOAT = 0x04
+TAG_STRING = 0x05
+TAG_LIST = 0x06
+TAG_DICT = 0x07
+TAG_OBJECT = 0x08
+
+# The float codec
+DOUBLE = struct.Struct('<d')
+
+
+class BinaryFormatError(Exception):
+    """ Raised when the data does not conform to the binary format. """
+    pass
+
+
+def encode_varint(value: int, out: bytearray) -> None:
+    """ Appends the given unsigned integer as LEB128 varint. """
+    while value > 0x7F:
+        out.append((value & 0x7F) | 0x80)
+        value >>= 7
+    out.append(value)
+
+
+class Encoder(object):
+    """ Encodes the model, interning the strings and the classes. """
+
+    def __init__(self) -> None:
+        self.strings: Dict[str, int] = {}
+        self.classes: Dict[type, int] = {}
+        self.schemas: List[Tuple[str, Tuple[str, ...]]] = []
+        self.body: bytearray = bytearray()
+
+    def string(self, value: str) -> int:
+        """ Gets the index of the given string, stores it if needed. """
+        index = self.strings.get(value)
+        if index is None:
+            index = self.strings[value] = len(self.strings)
+        return index
+
+    def schema(self, cls: type) -> int:
+        """ Gets the index of the given class, stores its schema if needed. """
+        index = self.classes.get(cls)
+        if index is None:
+            index = self.classes[cls] = len(self.schemas)
+            self.schemas.append((cls.__name__, cls.FIELDS))
+            self.string(cls.__name__)
+            for field in cls.FIELDS:
+                self.string(field)
+        return index
+
+    def encode(self, value: Any) -> None:
+        """ Encodes the given value into the body. """
+        out = self.body
+        if value is None:
+            out.append(TAG_NULL)
+        elif value is True:
+            out.append(TAG_TRUE)
+        elif value is False:
+            out.append(TAG_FALSE)
+        elif isinstance(value, str):
+            out.append(TAG_STRING)
+            encode_varint(self.string(value), out)
+        elif isinstance(value, int):
+            out.append(TAG_INTEGER)
+            encode_varint(value << 1 if value >= 0 else (-value << 1) - 1, out)
+        elif isinstance(value, float):
+            out.append(TAG_FLOAT)
+            out += DOUBLE.pack(value)
+        elif isinstance(value, (list, tuple)):
+            out.append(TAG_LIST)
+            encode_varint(len(value), out)
+            for item in value:
+                self.encode(item)
+        elif isinstance(value, dict):
+            out.append(TAG_DICT)
+            encode_varint(len(value), out)
+            for key, item in value.items():
+                self.encode(key)
+                self.encode(item)
+        else:
+            cls = value.__class__
+            out.append(TAG_OBJECT)
+            encode_varint(self.schema(cls), out)
+            for field in cls.FIELDS:
+                self.encode(getattr(value, field))
+
+    def header(self) -> bytes:
+        """ Gets the header, the string table and the class table. """
+        out = bytearray(MAGIC)
+        out.append(VERSION)
+        encode_varint(len(self.strings), out)
+        for string in self.strings:
+            data = string.encode('utf-8')
+            encode_varint(len(data), out)
+            out += data
+        encode_varint(len(self.schemas), out)
+        for name, fields in self.schemas:
+            encode_varint(self.strings[name], out)
+            encode_varint(len(fields), out)
+            for field in fields:
+                encode_varint(self.strings[field], out)
+        return bytes(out)
+
+
+def generate_adeleb(scenario: Any) -> Iterator[bytes]:
+    """ Generates the chunks of the binary interpretation for the given scenario. """
+    encoder = Encoder()
+    encoder.encode(scenario)
+    yield encoder.header()
+    yield bytes(encoder.body)
+
+
+def loads(data: bytes) -> Any:
+    """ Reconstructs the model from the given binary interpretation. """
+    data = bytes(data)
+    if data[:len(MAGIC)] != MAGIC:
+        raise BinaryFormatError("Not an .adeleb file")
+    if data[len(MAGIC)] != VERSION:
+        raise BinaryFormatError("Unsupported version {}".format(data[len(MAGIC)]))
+    position = len(MAGIC) + 1
+    unpack_double = DOUBLE.unpack_from
+
+    def varint() -> int:
+        nonlocal position
+        byte = data[position]
+        position += 1
+        if byte < 0x80:
+            return byte
+        value = byte & 0x7F
+        shift = 7
+        while True:
+            byte = data[position]
+            position += 1
+            value |= (byte & 0x7F) << shift
+            if byte < 0x80:
+                return value
+            shift += 7
+
+    strings: List[str] = []
+    for _ in range(varint()):
+        length = varint()
+        strings.append(data[position:position + length].decode('utf-8'))
+        position += length
+
+    classes: List[Tuple[type, Tuple[str, ...]]] = []
+    for _ in range(varint()):
+        name = strings[varint()]
+        fields = tuple(strings[varint()] for _ in range(varint()))
+        cls = getattr(oom, name, None)
+        if cls is None or getattr(cls, 'FIELDS', None) != fields:
+            raise BinaryFormatError("The class '{}' does not match the model".format(name))
+        classes.append((cls, fields))
+
+    # Sets the fields of the slotted (even frozen) objects
+    assign = object.__setattr__
+
+    def value() -> Any:
+        nonlocal position
+        tag = data[position]
+        position += 1
+        if tag == TAG_STRING:
+            return strings[varint()]
+        if tag == TAG_OBJECT:
+            cls, fields = classes[varint()]
+            instance = cls.__new__(cls)
+            for field in fields:
+                assign(instance, field, value())
+            return instance
+        if tag == TAG_LIST:
+            return [value() for _ in range(varint())]
+        if tag == TAG_INTEGER:
+            encoded = varint()
+            return encoded >> 1 if not encoded & 1 else -((encoded + 1) >> 1)
+        if tag == TAG_NULL:
+            return None
+        if tag == TAG_FALSE:
+            return False
+        if tag == TAG_TRUE:
+            return True
+        if tag == TAG_FLOAT:
+            position += DOUBLE.size
+            return unpack_double(data, position - DOUBLE.size)[0]
+        if tag == TAG_DICT:
+            # The key is decoded ahead of its item, whatever the evaluation order of the comprehensions
+            result = {}
+            for _ in range(varint()):
+                key = value()
+                result[key] = value()
+            return result
+        raise BinaryFormatError("Unknown tag 0x{:02X} at offset {}".format(tag, position - 1))
+
+    try:
+        return value()
+    except IndexError:
+        raise BinaryFormatError("Truncated data at offset {}".format(position))
+
+
+def load(fp: BinaryIO) -> Any:
+    """ Reconstructs the model from the binary interpretation read from the given file object. """
+    return loads(fp.read())
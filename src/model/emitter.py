@@ -0,0 +1,240 @@
+# -*- coding: utf-8 -*-
+""" This module contains the emitters of Py-ADeLe, i.e. the single-pass interpreters.
+
+An emitter is the sink of the events the parser pushes while reducing the
+source (start of a block, declaration, action, end of a block): it writes the
+interpretation as soon as each event occurs, instead of building the attack
+scenario and walking it afterwards. The memory stays proportional to the depth
+of the blocks, rather than to the size of the scenario.
+
+The emitted output is the same of the related interpreter. The interpreters
+stating the length of the containers ahead of their items (XML) or indexing
+the whole model (adeleb) cannot be streamed, the compact XML dialect can.
+
+Author:
+    Francesco Racciatti
+
+Copyright 2018 Francesco Racciatti
+
+"""
+
+
+import logging
+from json.encoder import encode_basestring
+from typing import Any, List
+
+from oom import *
+from interpreter import (Interpreter, UnknownInterpreterError, CHUNK_SIZE, COMPACT_TAGS, MEMBER_CLASS,
+                         MEMBER_SECTION, generate_json, generate_compact_xml)
+
+
+logger = logging.getLogger(__name__)
+
+
+# The blocks of a scenario
+BLOCK_SCENARIO = 'scenario'
+BLOCK_CONFIGURATION = 'configuration'
+BLOCK_ATTACK = 'attack'
+
+
+class Emitter(object):
+    """ The sink of the parsing events, it discards them.
+
+    Buffers the emitted chunks into writes of (about) the given size.
+    """
+
+    def __init__(self, fp: Any = None, size: int = CHUNK_SIZE) -> None:
+        self.fp: Any = fp
+        self.size: int = size
+        self.buffer: List[str] = []
+        self.buffered: int = 0
+        # The open blocks, the innermost last
+        self.blocks: List[str] = []
+        # The scopes of the blocks, in order of opening
+        self.scopes: List[Scope] = []
+
+    def start_block(self, block: str, scope: Scope) -> None:
+        """ Handles the opening of the given block, having the given scope. """
+        self.blocks.append(block)
+        self.scopes.append(scope)
+
+    def declaration(self, symbol: Any) -> None:
+        """ Handles the declaration of the given symbol (a variable or a message). """
+        pass
+
+    def action(self, action: Any) -> None:
+        """ Handles the given action, within the innermost open block. """
+        pass
+
+    def end_block(self) -> None:
+        """ Handles the closing of the innermost open block. """
+        self.blocks.pop()
+        if not self.blocks:
+            self.flush()
+
+    def finish(self) -> None:
+        """ Handles the end of the parse, the scenario is missing if no block was opened (e.g. an empty source). """
+        self.flush()
+
+    def write(self, chunk: str) -> None:
+        """ Writes the given chunk to the output. """
+        self.buffer.append(chunk)
+        self.buffered += len(chunk)
+        if self.buffered >= self.size:
+            self.flush()
+
+    def flush(self) -> None:
+        """ Writes the buffered chunks to the output. """
+        if self.buffer:
+            self.fp.write(''.join(self.buffer))
+            self.buffer = []
+            self.buffered = 0
+
+
+class JsonEmitter(Emitter):
+    """ Emits the (compact) JSON interpretation, see generate_json_document. """
+
+    def __init__(self, fp: Any, size: int = CHUNK_SIZE) -> None:
+        Emitter.__init__(self, fp, size)
+        self.configured: bool = False
+        self.actions: int = 0
+
+    def start_block(self, block: str, scope: Scope) -> None:
+        Emitter.start_block(self, block, scope)
+        if block == BLOCK_SCENARIO:
+            self.write('{{"{}":{}'.format(MEMBER_CLASS, encode_basestring(Scenario.__name__)))
+        elif block == BLOCK_CONFIGURATION:
+            self.configured = True
+            self.write(',"{}":{{"{}":{},"{}":['.format(
+                BLOCK_CONFIGURATION, MEMBER_CLASS, encode_basestring(Configuration.__name__), 'actions'))
+
+    def action(self, action: Any) -> None:
+        if self.actions:
+            self.write(',')
+        self.actions += 1
+        for chunk in generate_json(action):
+            self.write(chunk)
+
+    def end_block(self) -> None:
+        block = self.blocks[-1]
+        if block == BLOCK_CONFIGURATION:
+            self.write(']}')
+        elif block == BLOCK_SCENARIO:
+            if not self.configured:
+                self.write(',"{}":null'.format(BLOCK_CONFIGURATION))
+            # The attack is not interpreted yet
+            self.write(',"{}":null,"scopes":['.format(BLOCK_ATTACK))
+            for index, scope in enumerate(self.scopes):
+                if index:
+                    self.write(',')
+                for chunk in generate_json(scope):
+                    self.write(chunk)
+            self.write(']}\n')
+        Emitter.end_block(self)
+
+    def finish(self) -> None:
+        if not self.scopes:
+            self.write('null\n')
+        Emitter.finish(self)
+
+
+class NdjsonEmitter(Emitter):
+    """ Emits the newline-delimited JSON interpretation, see generate_ndjson. """
+
+    def record(self, section: str, item: Any) -> None:
+        """ Emits the given item as a record of the given section. """
+        chunks = generate_json(item)
+        # Merges the section into the record
+        self.write('{{"{}":"{}",'.format(MEMBER_SECTION, section) + next(chunks)[1:])
+        for chunk in chunks:
+            self.write(chunk)
+        self.write('\n')
+
+    def action(self, action: Any) -> None:
+        self.record(self.blocks[-1], action)
+
+    def end_block(self) -> None:
+        if self.blocks[-1] == BLOCK_SCENARIO:
+            for scope in self.scopes:
+                self.record('scopes', scope)
+        Emitter.end_block(self)
+
+
+class CompactXmlEmitter(Emitter):
+    """ Emits the compact XML interpretation, see generate_compact_xml. """
+
+    def start_block(self, block: str, scope: Scope) -> None:
+        Emitter.start_block(self, block, scope)
+        if block == BLOCK_SCENARIO:
+            self.write('<?xml version="1.0"?>\n<{}>'.format(COMPACT_TAGS[Scenario.__name__]))
+        elif block == BLOCK_CONFIGURATION:
+            self.write('<{}><{}><actions>'.format(BLOCK_CONFIGURATION, COMPACT_TAGS[Configuration.__name__]))
+
+    def action(self, action: Any) -> None:
+        for chunk in generate_compact_xml(action, False):
+            self.write(chunk)
+
+    def end_block(self) -> None:
+        block = self.blocks[-1]
+        if block == BLOCK_CONFIGURATION:
+            self.write('</actions></{}></{}>'.format(COMPACT_TAGS[Configuration.__name__], BLOCK_CONFIGURATION))
+        elif block == BLOCK_SCENARIO:
+            # The attack is not interpreted yet
+            self.write('<scopes>')
+            for scope in self.scopes:
+                for chunk in generate_compact_xml(scope, False):
+                    self.write(chunk)
+            self.write('</scopes></{}>\n'.format(COMPACT_TAGS[Scenario.__name__]))
+        Emitter.end_block(self)
+
+
+class TeeEmitter(Emitter):
+    """ Forwards the parsing events to each of the given emitters, i.e. emits
+    several interpretations from a single parse.
+    """
+
+    def __init__(self, emitters: List[Emitter]) -> None:
+        Emitter.__init__(self)
+        self.emitters: List[Emitter] = emitters
+
+    def start_block(self, block: str, scope: Scope) -> None:
+        for emitter in self.emitters:
+            emitter.start_block(block, scope)
+
+    def declaration(self, symbol: Any) -> None:
+        for emitter in self.emitters:
+            emitter.declaration(symbol)
+
+    def action(self, action: Any) -> None:
+        for emitter in self.emitters:
+            emitter.action(action)
+
+    def end_block(self) -> None:
+        for emitter in self.emitters:
+            emitter.end_block()
+
+    def finish(self) -> None:
+        for emitter in self.emitters:
+            emitter.finish()
+
+    def flush(self) -> None:
+        for emitter in self.emitters:
+            emitter.flush()
+
+
+def get_emitter(interpreter: str, fp: Any, compact: bool = False) -> Emitter:
+    """ Gets the emitter of the given interpreter, writing to the given (text) file object. """
+    if interpreter.lower() == Interpreter.Type.JSON.value.lower():
+        return JsonEmitter(fp)
+    if interpreter.lower() == Interpreter.Type.NDJSON.value.lower():
+        return NdjsonEmitter(fp)
+    if interpreter.lower() == Interpreter.Type.XML.value.lower() and compact:
+        return CompactXmlEmitter(fp)
+    raise UnknownInterpreterError("The interpreter '{}' cannot be streamed{}".format(
+        interpreter, ", but in the compact dialect" if interpreter.lower() == Interpreter.Type.XML.value.lower() else ""))
+
+
+def can_emit(interpreter: str, compact: bool = False) -> bool:
+    """ Checks if the given interpreter can be streamed. """
+    return (interpreter.lower() in (Interpreter.Type.JSON.value.lower(), Interpreter.Type.NDJSON.value.lower()) or
+            (interpreter.lower() == Interpreter.Type.XML.value.lower() and compact))
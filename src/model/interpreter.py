@@ -10,10 +10,12 @@ Copyright 2018 Francesco Racciatti
 
 import logging
 from enum import unique, IntEnum
-from typing import Any
+from json.encoder import encode_basestring
+from typing import Any, Iterator, Iterable, TextIO, List, Union
 
 from util.utils import baserepr, basestr
 from oom import *
+from binary import generate_adeleb
 
 
 logger = logging.getLogger(__name__)
@@ -22,19 +24,38 @@ logger = logging.getLogger(__name__)
 # The column width
 INDENT_SPACE = ' ' * 4
 
-# Prefix for the reserved attributes
-ATTRIBUTE_RESERVED_PREFIX = '_'
-
 # Tags' properties
 PROPERTY_ENTITY = 'entity'
 PROPERTY_LENGTH = 'length'
 PROPERTY_INDEX = 'index'
 PROPERTY_TYPE = 'type'
 
+# The size of the chunks written to the output
+CHUNK_SIZE = 64 * 1024
+
 # Properties's values
 PROPERTY_VALUE_OBJECT = 'object'
 PROPERTY_VALUE_ATTRIBUTE = 'attribute'
 
+# The short tag names of the classes, in the compact XML dialect
+COMPACT_TAGS = {
+    'Scenario': 'S',
+    'Configuration': 'C',
+    'Attack': 'A',
+    'Scope': 'sc',
+    'Literal': 'l',
+    'Variable': 'v',
+    'Message': 'm',
+    'SetUnitTime': 'ut',
+    'SetUnitLength': 'ul',
+    'SetUnitAngle': 'ua',
+    'SetTimeStart': 'ts',
+}
+
+# The JSON members naming the class of the objects and the section of the records
+MEMBER_CLASS = 'class'
+MEMBER_SECTION = 'section'
+
 
 class UnknownInterpreterError(Exception):
     """ Raised when it is requested an unknown interpreter. """
@@ -52,7 +73,9 @@ class Interpreter(object):
     @unique
     class Type(Enum):
         XML: str = 'xml'
-#       JSON: str = 'json'
+        JSON: str = 'json'
+        NDJSON: str = 'ndjson'
+        ADELEB: str = 'adeleb'
 #       YAML: str = 'yaml'
 
     @classmethod
@@ -63,110 +86,295 @@ class Interpreter(object):
         return False
 
     @classmethod
-    def interpret(cls, scenario: Scenario, interpreter: str) -> str:
-        """ Interprets the given scenario by using the requested interpreter. """
+    def is_binary(cls, interpreter: str) -> bool:
+        """ Checks if the given interpreter produces bytes instead of text. """
+        return interpreter.lower() == cls.Type.ADELEB.value.lower()
+
+    @classmethod
+    def generate(cls, scenario: Scenario, interpreter: str, compact: bool = False) -> Iterator[Union[str, bytes]]:
+        """ Generates the chunks of the interpretation of the given scenario,
+        in the compact dialect if requested (XML only, the others are compact already).
+        """
         if interpreter.lower() == cls.Type.XML.value.lower():
-            return interpret_xml(scenario)
-#        if interpreter.lower() == cls.Type.JSON.value.lower():
-#            return interpret_json(scenario)
+            return generate_compact_xml(scenario) if compact else generate_xml(scenario)
+        if interpreter.lower() == cls.Type.JSON.value.lower():
+            return generate_json_document(scenario)
+        if interpreter.lower() == cls.Type.NDJSON.value.lower():
+            return generate_ndjson(scenario)
+        if interpreter.lower() == cls.Type.ADELEB.value.lower():
+            return generate_adeleb(scenario)
 #        if interpreter.lower() == cls.Type.YAML.value.lower():
-#            return interpret_yaml(scenario)
+#            return generate_yaml(scenario)
         else:
             raise UnknownInterpreterError("The interpreter '{}' is unknown".format(interpreter))
 
+    @classmethod
+    def interpret(cls, scenario: Scenario, interpreter: str, compact: bool = False) -> Union[str, bytes]:
+        """ Interprets the given scenario by using the requested interpreter. """
+        empty = b'' if cls.is_binary(interpreter) else ''
+        return empty.join(cls.generate(scenario, interpreter, compact))
+
+    @classmethod
+    def interpret_to(cls, scenario: Scenario, interpreter: str, fp: TextIO, compact: bool = False) -> None:
+        """ Interprets the given scenario by using the requested interpreter,
+        writes the interpretation incrementally to the given file object
+        (a binary one for the binary interpreters).
+        """
+        write_chunks(cls.generate(scenario, interpreter, compact), fp)
+
+
+def write_chunks(chunks: Iterable[Union[str, bytes]], fp: Any, size: int = CHUNK_SIZE) -> None:
+    """ Writes the given chunks (either text or bytes) to the given file object,
+    by coalescing them into writes of (about) the given size.
+    """
+    buffer: List[Union[str, bytes]] = []
+    buffered = 0
+    for chunk in chunks:
+        buffer.append(chunk)
+        buffered += len(chunk)
+        if buffered >= size:
+            # Joins with the empty string of the same type of the chunks
+            fp.write(chunk[:0].join(buffer))
+            buffer = []
+            buffered = 0
+    if buffer:
+        fp.write(buffer[0][:0].join(buffer))
+
 
 def interpret_xml(statement: Any, indentation: int = 0, index: int = None) -> str:
     """ Provides the XML interpretation for the given scenario. """
-    logger.debug("interpret_xml: statement [{}], indentation [{}]".format(
-        statement.__class__.__name__,
-        indentation))
+    return ''.join(generate_xml(statement, indentation, index))
+
 
+def generate_xml(statement: Any, indentation: int = 0, index: int = None) -> Iterator[str]:
+    """ Generates the chunks of the XML interpretation for the given scenario. """
     if statement is None:
-        return ''
+        return
 
-    xml = ''
     if indentation == 0:
-        xml += '<?xml version="1.0"?>\n'
+        yield '<?xml version="1.0"?>\n'
 
     if index is None:
-        xml += '{}<{} {}="{}">\n'.format(
+        yield '{}<{} {}="{}">\n'.format(
             INDENT_SPACE * indentation,
             statement.__class__.__name__,
             PROPERTY_ENTITY,
             PROPERTY_VALUE_OBJECT)
     else:
-        xml += '{}<{} {}="{}" {}="{}">\n'.format(
+        yield '{}<{} {}="{}" {}="{}">\n'.format(
             INDENT_SPACE * indentation,
             statement.__class__.__name__,
             PROPERTY_ENTITY,
             PROPERTY_VALUE_OBJECT,
             PROPERTY_INDEX,
             index)
-    # Inspects the object's variables (discarding the reserved ones)
-    for key in statement.__dict__.keys():
-        if not key.startswith(ATTRIBUTE_RESERVED_PREFIX):
-            logger.debug("attribute: {}".format(key))
-            if isinstance(statement.__dict__[key], (int, float, bool, str)):
-                logger.debug("type: int, float, bool, str")
-                xml += '{}<{} {}="{}" {}="{}">\n'.format(
-                    INDENT_SPACE * (indentation + 1),
-                    key,
-                    PROPERTY_ENTITY,
-                    PROPERTY_VALUE_ATTRIBUTE,
-                    PROPERTY_TYPE,
-                    statement.__dict__[key].__class__.__name__)
-                xml += '{}{}\n'.format(
-                    INDENT_SPACE * (indentation + 2),
-                    statement.__dict__[key])
-            elif isinstance(statement.__dict__[key], (list, tuple)):
-                logger.debug("type: list, tuple")
-                xml += '{}<{} {}="{}" {}="{}" {}="{}">\n'.format(
-                    INDENT_SPACE * (indentation + 1),
-                    key,
-                    PROPERTY_ENTITY,
-                    PROPERTY_VALUE_ATTRIBUTE,
-                    PROPERTY_TYPE,
-                    statement.__dict__[key].__class__.__name__,
-                    PROPERTY_LENGTH,
-                    len(statement.__dict__[key]))
-                for index, item in enumerate(statement.__dict__[key]):
-                    xml += interpret_xml(item, indentation + 2, index)
-            elif isinstance(statement.__dict__[key], dict):
-                logger.debug("type: dict")
-                xml += '{}<{} {}="{}" {}="{}" {}="{}">\n'.format(
-                    INDENT_SPACE * (indentation + 1),
-                    key,
-                    PROPERTY_ENTITY,
-                    PROPERTY_VALUE_ATTRIBUTE,
-                    PROPERTY_TYPE,
-                    statement.__dict__[key].__class__.__name__,
-                    PROPERTY_LENGTH,
-                    len(statement.__dict__[key]))
-                for index, subkey in enumerate(statement.__dict__[key].keys()):
-                    xml += interpret_xml(statement.__dict__[key][subkey], indentation + 2, index)
-            else: # Anything else
-                logger.debug("type: not built-in")
-                xml += '{}<{} {}="{}" {}="{}">\n'.format(
-                    INDENT_SPACE * (indentation + 1),
-                    key,
-                    PROPERTY_ENTITY,
-                    PROPERTY_VALUE_ATTRIBUTE,
-                    PROPERTY_TYPE,
-                    statement.__dict__[key].__class__.__name__)
-                xml += interpret_xml(statement.__dict__[key], indentation + 2)
-            xml += '{}</{}>\n'.format(
+    # Inspects the object's fields, as declared by its schema
+    for key in statement.FIELDS:
+        value = getattr(statement, key)
+        if isinstance(value, (int, float, bool, str)):
+            yield '{}<{} {}="{}" {}="{}">\n'.format(
+                INDENT_SPACE * (indentation + 1),
+                key,
+                PROPERTY_ENTITY,
+                PROPERTY_VALUE_ATTRIBUTE,
+                PROPERTY_TYPE,
+                value.__class__.__name__)
+            yield '{}{}\n'.format(
+                INDENT_SPACE * (indentation + 2),
+                value)
+        elif isinstance(value, (list, tuple)):
+            yield '{}<{} {}="{}" {}="{}" {}="{}">\n'.format(
+                INDENT_SPACE * (indentation + 1),
+                key,
+                PROPERTY_ENTITY,
+                PROPERTY_VALUE_ATTRIBUTE,
+                PROPERTY_TYPE,
+                value.__class__.__name__,
+                PROPERTY_LENGTH,
+                len(value))
+            for index, item in enumerate(value):
+                yield from generate_xml(item, indentation + 2, index)
+        elif isinstance(value, dict):
+            yield '{}<{} {}="{}" {}="{}" {}="{}">\n'.format(
+                INDENT_SPACE * (indentation + 1),
+                key,
+                PROPERTY_ENTITY,
+                PROPERTY_VALUE_ATTRIBUTE,
+                PROPERTY_TYPE,
+                value.__class__.__name__,
+                PROPERTY_LENGTH,
+                len(value))
+            for index, subkey in enumerate(value.keys()):
+                yield from generate_xml(value[subkey], indentation + 2, index)
+        else: # Anything else
+            yield '{}<{} {}="{}" {}="{}">\n'.format(
                 INDENT_SPACE * (indentation + 1),
-                key)
-    logger.debug("closing class name {}".format(statement.__class__.__name__))
-    xml += '{}</{}>\n'.format(
+                key,
+                PROPERTY_ENTITY,
+                PROPERTY_VALUE_ATTRIBUTE,
+                PROPERTY_TYPE,
+                value.__class__.__name__)
+            yield from generate_xml(value, indentation + 2)
+        yield '{}</{}>\n'.format(
+            INDENT_SPACE * (indentation + 1),
+            key)
+    yield '{}</{}>\n'.format(
         INDENT_SPACE * indentation,
         statement.__class__.__name__)
-    return xml
 
 
-#def interpret_json(scenario: Scenario) -> str:
-#    """ Provides the YAML interpretation for the given scenario. """
-#    return ''
+def escape(data: str) -> str:
+    """ Escapes the given character data (as xml.sax.saxutils, which imports urllib at startup). """
+    return data.replace('&', '&amp;').replace('>', '&gt;').replace('<', '&lt;')
+
+
+def quoteattr(data: str) -> str:
+    """ Escapes and quotes the given attribute value (as xml.sax.saxutils). """
+    data = escape(data).replace('\n', '&#10;').replace('\r', '&#13;').replace('\t', '&#9;')
+    if '"' not in data:
+        return '"{}"'.format(data)
+    if "'" not in data:
+        return "'{}'".format(data)
+    return '"{}"'.format(data.replace('"', '&quot;'))
+
+
+def interpret_compact_xml(statement: Any) -> str:
+    """ Provides the compact XML interpretation for the given scenario. """
+    return ''.join(generate_compact_xml(statement))
+
+
+def generate_compact_xml(statement: Any, root: bool = True) -> Iterator[str]:
+    """ Generates the chunks of the compact XML interpretation for the given scenario.
+
+    Objects become elements with short tag names, their scalar fields become attributes
+    (omitted when null) and their other fields become child elements named as the fields.
+    There is neither indentation nor type information, the schema of the model rules.
+    As the XML interpretation, there is no document if there is no scenario (e.g. an empty source).
+    """
+    if statement is None:
+        return
+    if root:
+        yield '<?xml version="1.0"?>\n'
+    tag = COMPACT_TAGS.get(statement.__class__.__name__, statement.__class__.__name__)
+    attributes = []
+    children = []
+    for key in statement.FIELDS:
+        value = getattr(statement, key)
+        if value is None:
+            continue
+        if isinstance(value, (int, float, bool, str)):
+            attributes.append(' {}={}'.format(key, quoteattr(str(value))))
+        else:
+            children.append((key, value))
+    if not children:
+        yield '<{}{}/>'.format(tag, ''.join(attributes))
+    else:
+        yield '<{}{}>'.format(tag, ''.join(attributes))
+        for key, value in children:
+            yield '<{}>'.format(key)
+            if isinstance(value, (list, tuple)):
+                for item in value:
+                    yield from generate_compact_xml_value(item)
+            elif isinstance(value, dict):
+                for item in value.values():
+                    yield from generate_compact_xml_value(item)
+            else:
+                yield from generate_compact_xml(value, False)
+            yield '</{}>'.format(key)
+        yield '</{}>'.format(tag)
+    if root:
+        yield '\n'
+
+
+def generate_compact_xml_value(value: Any) -> Iterator[str]:
+    """ Generates the chunks of the compact XML interpretation for the given item of a container. """
+    if value is None:
+        yield '<null/>'
+    elif isinstance(value, (int, float, bool, str)):
+        yield '<{0}>{1}</{0}>'.format(value.__class__.__name__, escape(str(value)))
+    else:
+        yield from generate_compact_xml(value, False)
+
+
+def interpret_json(statement: Any) -> str:
+    """ Provides the (compact) JSON interpretation for the given scenario. """
+    return ''.join(generate_json(statement))
+
+
+def generate_json_document(scenario: Scenario) -> Iterator[str]:
+    """ Generates the chunks of the JSON document for the given scenario (null if none, e.g. an empty source). """
+    yield from generate_json_value(scenario)
+    yield '\n'
+
+
+def generate_json(statement: Any) -> Iterator[str]:
+    """ Generates the chunks of the (compact) JSON interpretation for the given object.
+
+    Objects become JSON objects naming their class, followed by their fields as declared by their schema.
+    """
+    yield '{{"{}":{}'.format(MEMBER_CLASS, encode_basestring(statement.__class__.__name__))
+    for key in statement.FIELDS:
+        yield ',"{}":'.format(key)
+        yield from generate_json_value(getattr(statement, key))
+    yield '}'
+
+
+def generate_json_value(value: Any) -> Iterator[str]:
+    """ Generates the chunks of the (compact) JSON interpretation for the given value. """
+    if value is None:
+        yield 'null'
+    elif value is True:
+        yield 'true'
+    elif value is False:
+        yield 'false'
+    elif isinstance(value, str):
+        yield encode_basestring(value)
+    elif isinstance(value, (int, float)):
+        yield repr(value)
+    elif isinstance(value, (list, tuple)):
+        yield '['
+        for index, item in enumerate(value):
+            if index:
+                yield ','
+            yield from generate_json_value(item)
+        yield ']'
+    elif isinstance(value, dict):
+        yield '{'
+        for index, (key, item) in enumerate(value.items()):
+            if index:
+                yield ','
+            yield '{}:'.format(encode_basestring(str(key)))
+            yield from generate_json_value(item)
+        yield '}'
+    else: # Anything else
+        yield from generate_json(value)
+
+
+def generate_ndjson(scenario: Scenario) -> Iterator[str]:
+    """ Generates the newline-delimited JSON interpretation for the given scenario.
+
+    Each line is a top-level record: an item of a list field of the scenario, or of
+    a list field of its compound statements (e.g. an action of the configuration).
+    Each record names the field of the scenario it belongs to. There is no record if there is
+    no scenario (e.g. an empty source).
+    """
+    if scenario is None:
+        return
+    for key in scenario.FIELDS:
+        value = getattr(scenario, key)
+        if value is None:
+            continue
+        if isinstance(value, (list, tuple)):
+            items = value
+        else:
+            items = [item for field in value.FIELDS for item in getattr(value, field)]
+        prefix = '{{"{}":"{}",'.format(MEMBER_SECTION, key)
+        for item in items:
+            chunks = generate_json(item)
+            # Merges the section into the record
+            yield prefix + next(chunks)[1:]
+            yield from chunks
+            yield '\n'
 
 
 #def interpret_yaml(scenario: Scenario) -> str:
@@ -1,6 +1,9 @@
 # -*- coding: utf-8 -*-
 """ This module contains the Object-Oriented Model of ADeLe.
 
+The classes of the model are slotted: each of them declares its fields into
+the FIELDS schema, which is the one the interpreters rely on.
+
 Author:
     Francesco Racciatti
 
@@ -11,39 +14,84 @@ Copyright 2018 Francesco Racciatti
 
 from enum import unique, Enum
 from types import DynamicClassAttribute
-from typing import List, Any
+from typing import List, Any, Tuple
 
 from util.utils import baserepr, basestr
 
 
 class Container(object):
     """ The base class to build containers. """
-    pass
+
+    # The schema, i.e. the fields of the class
+    FIELDS: Tuple[str, ...] = ()
+    __slots__ = FIELDS
 
 
 class SimpleStatement(object):
     """ The base class to model compound statements. """
-    pass
+
+    # The schema, i.e. the fields of the class
+    FIELDS: Tuple[str, ...] = ()
+    __slots__ = FIELDS
 
 
 class CompoundStatement(object):
     """ The base class to model compound statements. """
-    pass
+
+    # The schema, i.e. the fields of the class
+    FIELDS: Tuple[str, ...] = ()
+    __slots__ = FIELDS
 
 
 class Literal(Container):
     """ Models a literal.
 
-    Literals contain literal values.
+    Literals contain literal values. Literals are immutable, so that a single
+    literal can be shared among all the occurrences of the same constant.
     """
 
-    # The prefix to build the identifier of literals
+    # The prefix to build the identifier of literals, it also separates their type from their value
     PREFIX: str = '_'
 
-    def __init__(self, type: str, value: str) -> None:
-        self.identifier: str = '{}{}'.format(self.PREFIX, value)
-        self.type: str = type
-        self.value: str = value
+    FIELDS: Tuple[str, ...] = ('identifier', 'type', 'value', 'index')
+    __slots__ = FIELDS
+
+    def __init__(self, type: str, value: str, index: int = None) -> None:
+        # The constants of different types differ, e.g. the integer 1 and the string "1"
+        object.__setattr__(self, 'identifier', '{0}{1}{0}{2}'.format(self.PREFIX, type, value))
+        object.__setattr__(self, 'type', type)
+        object.__setattr__(self, 'value', value)
+        object.__setattr__(self, 'index', index)
+
+    def __setattr__(self, name: str, value: Any) -> None:
+        raise AttributeError("Literals are immutable, cannot set '{}'".format(name))
+
+    def __delattr__(self, name: str) -> None:
+        raise AttributeError("Literals are immutable, cannot delete '{}'".format(name))
+
+    def __reduce__(self):
+        return (self.__class__, (self.type, self.value, self.index))
+
+    def __str__(self):
+        return basestr(self)
+
+    def __repr__(self):
+        return baserepr(self)
+
+
+class Scope(Container):
+    """ Models a scope, i.e. a node of the tree of the scopes.
+
+    Scopes are identified by compact integers, the parent is referenced through its identifier.
+    """
+
+    FIELDS: Tuple[str, ...] = ('identifier', 'parent', 'depth')
+    __slots__ = FIELDS
+
+    def __init__(self, identifier: int, parent: int, depth: int) -> None:
+        self.identifier: int = identifier
+        self.parent: int = parent
+        self.depth: int = depth
 
     def __str__(self):
         return basestr(self)
@@ -59,11 +107,14 @@ class Variable(Container):
     does not contain literal values.
     """
 
-    def __init__(self, identifier: str, type: str, reference: str, scope: str) -> None:
+    FIELDS: Tuple[str, ...] = ('identifier', 'type', 'reference', 'scope')
+    __slots__ = FIELDS
+
+    def __init__(self, identifier: str, type: str, reference: str, scope: int) -> None:
         self.identifier: str = identifier
         self.type: str = type
         self.reference: str = reference
-        self.scope: str = scope
+        self.scope: int = scope
 
     def __str__(self):
         return basestr(self)
@@ -75,9 +126,12 @@ class Variable(Container):
 class Message(Container):
     """ Models a message. """
 
-    def __init__(self, identifier: str, scope: str):
+    FIELDS: Tuple[str, ...] = ('identifier', 'scope')
+    __slots__ = FIELDS
+
+    def __init__(self, identifier: str, scope: int):
         self.identifier: str = identifier
-        self.scope: str= scope
+        self.scope: int = scope
 
     def __str__(self):
         return basestr(self)
@@ -102,6 +156,9 @@ class ISO(Enum):
 class Configuration(CompoundStatement):
     """ Models the configuration compound statement. """
 
+    FIELDS: Tuple[str, ...] = ('actions',)
+    __slots__ = FIELDS
+
     def __init__(self, actions: List[Any]) -> None:
         self.actions: List[Any] = actions
 
@@ -115,6 +172,9 @@ class Configuration(CompoundStatement):
 class SetUnitTime(SimpleStatement):
     """ Models the action 'setUnitTime'. """
 
+    FIELDS: Tuple[str, ...] = ('reference',)
+    __slots__ = FIELDS
+
     def __init__(self, reference: str) -> None:
         self.reference: str = reference
 
@@ -128,6 +188,9 @@ class SetUnitTime(SimpleStatement):
 class SetUnitLength(SimpleStatement):
     """ Models the action 'setUnitLength'. """
 
+    FIELDS: Tuple[str, ...] = ('reference',)
+    __slots__ = FIELDS
+
     def __init__(self, reference: str) -> None:
         self.reference: str = reference
 
@@ -141,6 +204,9 @@ class SetUnitLength(SimpleStatement):
 class SetUnitAngle(SimpleStatement):
     """ Models the action 'setUnitAngle'. """
 
+    FIELDS: Tuple[str, ...] = ('reference',)
+    __slots__ = FIELDS
+
     def __init__(self, reference: str) -> None:
         self.reference: str = reference
 
@@ -154,6 +220,9 @@ class SetUnitAngle(SimpleStatement):
 class SetTimeStart(SimpleStatement):
     """ Models the action 'setTimeStart'. """
 
+    FIELDS: Tuple[str, ...] = ('reference',)
+    __slots__ = FIELDS
+
     def __init__(self, reference: str) -> None:
         self.reference: str = reference
 
@@ -169,6 +238,9 @@ class Attack(CompoundStatement):
 
     # TODO To be implemented, this is a stub
 
+    FIELDS: Tuple[str, ...] = ()
+    __slots__ = FIELDS
+
     def __str__(self):
         return basestr(self)
 
@@ -184,11 +256,16 @@ class Scenario(CompoundStatement):
 
     # TODO To be developed, this is a stub
 
+    FIELDS: Tuple[str, ...] = ('configuration', 'attack', 'scopes')
+    __slots__ = FIELDS
+
     def __init__(self,
                  configuration: Configuration = None,
-                 attack: Attack = None) -> None:
+                 attack: Attack = None,
+                 scopes: List[Scope] = None) -> None:
         self.configuration: Configuration = configuration
         self.attack: Attack = attack
+        self.scopes: List[Scope] = scopes if scopes is not None else []
 
     def __str__(self):
         return basestr(self)
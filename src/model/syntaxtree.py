@@ -0,0 +1,157 @@
+# -*- coding: utf-8 -*-
+""" This module contains the syntax tree file of Py-ADeLe (.adelet).
+
+The syntax tree file stores a parsed scenario, together with its symbol table
+and its literal pool, so that it can be interpreted again (e.g. into another
+format) without lexing and parsing the source. Each section is an independent
+.adeleb payload (see the binary module), located by the index of the file:
+opening a tree file reads the index only, each section is decoded on first
+access, straight from the (memory-mapped) data.
+
+The layout of a file (the integers are unsigned LEB128 varints):
+
+    magic       4 bytes, b'ADLT'
+    version     1 byte
+    producer    the length and the UTF-8 bytes of the version of Py-ADeLe
+    index       the count, then each section as the length and the UTF-8
+                bytes of its name, its offset and its length
+    sections    the payloads, the offsets refer the end of the index
+
+The sections:
+
+    scenario    the attack scenario, i.e. the configuration, the attack and
+                the tree of the scopes
+    symbols     the declared variables and messages, by scope, in order of
+                declaration
+    literals    the literal pool, in order of interning
+
+The trees produced by another version of Py-ADeLe are refused, the model may
+differ.
+
+Author:
+    Francesco Racciatti
+
+Copyright 2018 Francesco Racciatti
+
+"""
+
+
+from typing import Any, Dict, Iterator, List, Tuple
+
+from oom import Scenario, Literal
+from binary import BinaryFormatError, encode_varint, generate_adeleb, loads
+from util.version import VERSION
+
+
+# The magic number and the version of the format
+MAGIC = b'ADLT'
+FORMAT_VERSION = 1
+
+# The extension of the syntax tree files
+TREE_EXTENSION = '.adelet'
+
+# The sections of a tree file
+SECTION_SCENARIO = 'scenario'
+SECTION_SYMBOLS = 'symbols'
+SECTION_LITERALS = 'literals'
+
+
+def generate_tree(scenario: Scenario, symbols: List[Any] = None, literals: List[Literal] = None) -> Iterator[bytes]:
+    """ Generates the chunks of the syntax tree file of the given scenario, symbols and literals. """
+    sections: List[Tuple[str, bytes]] = [
+        (SECTION_SCENARIO, b''.join(generate_adeleb(scenario))),
+        (SECTION_SYMBOLS, b''.join(generate_adeleb(symbols or []))),
+        (SECTION_LITERALS, b''.join(generate_adeleb(literals or []))),
+    ]
+    header = bytearray(MAGIC)
+    header.append(FORMAT_VERSION)
+    producer = VERSION.encode('utf-8')
+    encode_varint(len(producer), header)
+    header += producer
+    encode_varint(len(sections), header)
+    offset = 0
+    for name, payload in sections:
+        data = name.encode('utf-8')
+        encode_varint(len(data), header)
+        header += data
+        encode_varint(offset, header)
+        encode_varint(len(payload), header)
+        offset += len(payload)
+    yield bytes(header)
+    for _, payload in sections:
+        yield payload
+
+
+class SyntaxTree(object):
+    """ The syntax tree file, decoding its sections on first access.
+
+    The data is any bytes-like object (e.g. memory-mapped), it must outlive the
+    tree until the sections of interest are decoded.
+    """
+
+    def __init__(self, data: Any) -> None:
+        if len(data) <= len(MAGIC) or data[:len(MAGIC)] != MAGIC:
+            raise BinaryFormatError("Not an {} file".format(TREE_EXTENSION))
+        if data[len(MAGIC)] != FORMAT_VERSION:
+            raise BinaryFormatError("Unsupported version {}".format(data[len(MAGIC)]))
+        self.data: Any = data
+        self.position: int = len(MAGIC) + 1
+        try:
+            producer = self.string()
+            if producer != VERSION:
+                raise BinaryFormatError("The tree was produced by Py-ADeLe {}, this is {}".format(producer, VERSION))
+            # The offset and the length of each section, by name
+            self.index: Dict[str, Tuple[int, int]] = {}
+            for _ in range(self.varint()):
+                name = self.string()
+                self.index[name] = (self.varint(), self.varint())
+            # The sections follow the index
+            self.index = {name: (self.position + offset, length) for name, (offset, length) in self.index.items()}
+        except IndexError:
+            raise BinaryFormatError("Truncated index at offset {}".format(self.position))
+        # The decoded sections, by name
+        self.sections: Dict[str, Any] = {}
+
+    def varint(self) -> int:
+        """ Reads an unsigned LEB128 varint of the index. """
+        value = 0
+        shift = 0
+        while True:
+            byte = self.data[self.position]
+            self.position += 1
+            value |= (byte & 0x7F) << shift
+            if byte < 0x80:
+                return value
+            shift += 7
+
+    def string(self) -> str:
+        """ Reads a string of the index. """
+        length = self.varint()
+        self.position += length
+        return bytes(self.data[self.position - length:self.position]).decode('utf-8')
+
+    def section(self, name: str) -> Any:
+        """ Gets the given section, decoding it on first access. """
+        if name not in self.sections:
+            if name not in self.index:
+                raise BinaryFormatError("Missing section '{}'".format(name))
+            offset, length = self.index[name]
+            if offset + length > len(self.data):
+                raise BinaryFormatError("Truncated section '{}'".format(name))
+            self.sections[name] = loads(self.data[offset:offset + length])
+        return self.sections[name]
+
+    @property
+    def scenario(self) -> Scenario:
+        """ The attack scenario. """
+        return self.section(SECTION_SCENARIO)
+
+    @property
+    def symbols(self) -> List[Any]:
+        """ The declared variables and messages. """
+        return self.section(SECTION_SYMBOLS)
+
+    @property
+    def literals(self) -> List[Literal]:
+        """ The literal pool. """
+        return self.section(SECTION_LITERALS)
@@ -0,0 +1,87 @@
+# -*- coding: utf-8 -*-
+""" This module contains the error report of the parses.
+
+A parse given an error report does not stop at the first error: the lexer
+skips the illegal characters, the parser resynchronizes at the statement and
+block boundaries, the declarations and the actions in error are discarded,
+and each error is collected into the report, up to its limit.
+
+Author:
+    Francesco Racciatti
+
+Copyright 2018 Francesco Racciatti
+
+"""
+
+
+from enum import unique, Enum
+from typing import Any, Dict, List
+
+from util.utils import baserepr, basestr
+
+
+# The default maximum number of errors collected by a parse
+ERROR_LIMIT_DEFAULT = 100
+
+
+class TooManyErrorsError(Exception):
+    """ Exception raised when the error report reaches its limit, it stops the parse. """
+    pass
+
+
+@unique
+class Stage(Enum):
+    """ The stage of the compilation detecting an error. """
+    SOURCE: str = 'source'
+    LEXICAL: str = 'lexical'
+    SYNTAX: str = 'syntax'
+    SEMANTIC: str = 'semantic'
+
+
+class Diagnostic(object):
+    """ Models an error of the source. """
+
+    def __init__(self, stage: Stage, message: str, lineno: int) -> None:
+        self.stage: Stage = stage
+        self.message: str = message
+        self.lineno: int = lineno
+
+    def to_dict(self) -> Dict[str, Any]:
+        """ Gets the error as a dictionary. """
+        return {'stage': self.stage.value, 'line': self.lineno, 'message': self.message}
+
+    def __eq__(self, other: Any) -> bool:
+        return isinstance(other, Diagnostic) and self.to_dict() == other.to_dict()
+
+    def __str__(self):
+        return basestr(self)
+
+    def __repr__(self):
+        return baserepr(self)
+
+
+class ErrorReport(object):
+    """ Collects the errors of a parse, up to the given limit. """
+
+    def __init__(self, limit: int = ERROR_LIMIT_DEFAULT) -> None:
+        self.limit: int = limit
+        self.errors: List[Diagnostic] = []
+        # Whether the parse stopped at the limit
+        self.truncated: bool = False
+
+    def add(self, stage: Stage, message: str, lineno: int) -> None:
+        """ Collects the given error, stops the parse once the limit is exceeded. """
+        if len(self.errors) >= self.limit:
+            self.truncated = True
+            raise TooManyErrorsError("Too many errors, stopped at line {}".format(lineno))
+        self.errors.append(Diagnostic(stage, message, lineno))
+
+    def to_dict(self) -> Dict[str, Any]:
+        """ Gets the report as a dictionary. """
+        return {'errors': [error.to_dict() for error in self.errors], 'truncated': self.truncated}
+
+    def __str__(self):
+        return basestr(self)
+
+    def __repr__(self):
+        return baserepr(self)
@@ -8,17 +8,22 @@ Copyright (C) 2018
 
 """
 
+import sys
+import copy
 import logging
+import threading
 from enum import unique, Enum
-from mypy_extensions import NoReturn
-from typing import List, Any
+from typing import List, Any, Tuple, Dict, Set, Callable
 
-from ply import yacc
-from ply.yacc import YaccProduction
+from ply.yacc import YaccProduction, LRParser
 
 from lexer import *
+from tables import build_parser
+from mapped import open_mapped
+from tracing import Tracer, trace_productions
 from model.oom import *
-from mypy import scope
+from model.emitter import Emitter
+from diagnostics import ErrorReport, TooManyErrorsError, ERROR_LIMIT_DEFAULT
 
 
 logger = logging.getLogger(__name__)
@@ -39,6 +44,11 @@ class RuntimeAssertError(Exception):
     pass
 
 
+class UnexpectedEndError(RuntimeError):
+    """ Exception caused by the source ending before the scenario. """
+    pass
+
+
 class Associativity(object):
     """ Operator associativity. """
     LEFT: str = 'left'
@@ -53,76 +63,63 @@ class ProductionType(Enum):
 
 
 class ScopeHandler(object):
-    """ Handles the variables' scopes. """
+    """ Handles the variables' scopes.
 
-    # Codes the actual scope
-    scopes: List[int] = list()
+    The scopes form a tree: each scope gets a compact integer identifier, i.e.
+    its position in order of opening, and points to its parent scope.
+    """
 
-    # The current scope
-    current_scope: int = -1;
+    def __init__(self) -> None:
+        # The scopes, indexed by their identifiers
+        self.scopes: List[Scope] = list()
+        # The current scope
+        self.current_scope: Scope = None
 
-    @classmethod
-    def open_scope(cls) -> None:
-        """ Opens a new scope. """
-        # Enlarges the list
-        if ( cls.current_scope + 1 == len(cls.scopes) ):
-            cls.scopes.append(-1)
-        # Points-to the actual scope just opened
-        cls.current_scope += 1
-        # Update its identifier
-        cls.scopes[cls.current_scope] += 1
+    def open_scope(self) -> None:
+        """ Opens a new scope, nested into the current one. """
+        if self.current_scope is None:
+            scope = Scope(len(self.scopes), None, 0)
+        else:
+            scope = Scope(len(self.scopes), self.current_scope.identifier, self.current_scope.depth + 1)
+        self.scopes.append(scope)
+        self.current_scope = scope
 
-    @classmethod
-    def close_scope(cls) -> None:
+    def close_scope(self) -> None:
         """ Closes a previous opened scope. """
-        # Points to the actual scope (outer) 
-        cls.current_scope -= 1
+        # Points to the actual scope (outer)
+        parent = self.current_scope.parent
+        self.current_scope = None if parent is None else self.scopes[parent]
 
-    @classmethod
-    def get_current_scope_identifier(cls) -> str:
+    def get_current_scope_identifier(self) -> int:
         """ Gets the identifier of the current scope. """
-        if len(cls.scopes) == 0 or cls.current_scope < 0:
+        if self.current_scope is None:
             return None
-        scope_identifier = ''
-        for i in range(0, cls.current_scope + 1):
-            scope_identifier += str(cls.scopes[i]) 
-        return scope_identifier
+        return self.current_scope.identifier
 
-    @classmethod
-    def get_scope_identifier(cls, scope: int) -> str:
-        """ Gets the identifier of the current scope. """
-        if len(cls.scopes) == 0 or cls.current_scope < 0:
-            return None
-        scope_identifier = ''
-        for i in range (0, scope + 1):
-            scope_identifier += str(cls.scopes[i])
-        return scope_identifier
+    def get_scope(self, identifier: int) -> Scope:
+        """ Gets the scope having the given identifier. """
+        return self.scopes[identifier]
 
     @classmethod
-    def get_global_scope_identifier(cls) -> str:
-        """ Gets the global scope coded as string. """
-        return '0'
+    def get_global_scope_identifier(cls) -> int:
+        """ Gets the identifier of the global scope. """
+        return 0
 
 
 class SymbolTable(object):
     """ Models a symbol table for a single scope. """
 
-    # The symbol table, maps the identifier onto the related object
-    symbol_table: Dict[str, Any] = dict()
-
-    def store_literal(self, type: Keyword, value: str) -> Literal:
-        """ Stores the given literal and returns the literal itself. """
-        symbol = Literal(type.lexeme, value)
-        self.symbol_table[symbol.identifier] = symbol
-        return symbol
+    def __init__(self) -> None:
+        # The symbol table, maps the identifier onto the related object
+        self.symbol_table: Dict[str, Any] = dict()
 
-    def store_variable(self, scope: str, identifier: str, type: Keyword, value: str) -> Variable:
+    def store_variable(self, scope: int, identifier: str, type: Keyword, value: str) -> Variable:
         """ Stores the given variable and returns the variable itself. """
-        symbol = Variable(scope, identifier, type.lexeme, value)
+        symbol = Variable(identifier, type.lexeme, value, scope)
         self.symbol_table[identifier] = symbol
         return symbol
 
-    def store_message(self, scope: str, identifier: str) -> Message:
+    def store_message(self, scope: int, identifier: str) -> Message:
         """ Stores the given message and returns the message itself. """
         symbol = Message(identifier, scope)
         self.symbol_table[identifier] = symbol
@@ -133,94 +130,294 @@ class SymbolTable(object):
         return self.symbol_table.get(identifier, None)
 
  
+class LiteralPool(object):
+    """ Models the pool of the interned literals.
+
+    Each distinct constant, identified by its type and its value, is stored
+    once and gets a stable compact identifier, i.e. its position in the pool.
+    """
+
+    def __init__(self) -> None:
+        # Maps the type and the value of the constants onto the related literal
+        self.literals: Dict[Tuple[str, Any], Literal] = dict()
+        # The literals, indexed by their identifiers
+        self.indexes: List[Literal] = list()
+
+    def intern(self, type: Keyword, value: Any) -> Literal:
+        """ Gets the literal of the given constant, stores it if needed. """
+        key = (type.lexeme, value)
+        literal = self.literals.get(key, None)
+        if literal is None:
+            literal = Literal(type.lexeme, value, len(self.indexes))
+            self.literals[key] = literal
+            self.indexes.append(literal)
+        return literal
+
+    def retrieve(self, index: int) -> Literal:
+        """ Retrieves the literal having the given identifier. """
+        return self.indexes[index]
+
+    def __len__(self) -> int:
+        return len(self.indexes)
+
+ 
 class GlobalSymbolTable(object):
     """ Models a multi scope symbol table to support scoped variables.
         
     Shadowing is not admitted.
     """
-    
-    # The multi scoped symbol table, maps a scope onto the related symbol table
-    global_symbol_table: Dict[str, SymbolTable] = dict()
-
-    @classmethod
-    def store_literal(cls, type: Keyword, value: str) -> Literal:
-        """ Stores the given literal into the global scope' symbol table. """
-        scope = ScopeHandler.get_global_scope_identifier()
-        if cls.global_symbol_table.get(scope, None) is None:
-            cls.global_symbol_table[scope] = SymbolTable()
-        symbol_table = cls.global_symbol_table[scope]
-        return symbol_table.store_literal(type, value)
 
-    @classmethod
-    def store_variable(cls, scope: str, identifier: str, type: Keyword, value: str) -> Variable:
+    def __init__(self, emitter: Emitter = None) -> None:
+        # The multi scoped symbol table, maps a scope onto the related symbol table
+        self.global_symbol_table: Dict[int, SymbolTable] = dict()
+        # The literals, shared by all the scopes (none if emitted, the emitted literals are not retained)
+        self.literal_pool: LiteralPool = LiteralPool() if emitter is None else None
+        # Maps the visible identifiers onto the stack of the open scopes declaring them
+        self.visible: Dict[str, List[int]] = dict()
+        # The sink of the declarations, if any
+        self.emitter: Emitter = emitter
+        # The number of the symbols declared in each scope, and the number of the stored literals
+        self.declared: Dict[int, int] = dict()
+        self.literals: int = 0
+
+    def store_literal(self, type: Keyword, value: Any) -> Literal:
+        """ Stores the given literal into the literal pool, returns the interned literal
+        (a literal of its own, if emitted).
+        """
+        if self.literal_pool is None:
+            self.literals += 1
+            return Literal(type.lexeme, value)
+        literal = self.literal_pool.intern(type, value)
+        self.literals = len(self.literal_pool)
+        return literal
+
+    def store_variable(self, scope: int, identifier: str, type: Keyword, value: str) -> Variable:
         """ Stores the given variable into the related symbol table. """
-        if cls.global_symbol_table.get(scope, None) is None:
-            cls.global_symbol_table[scope] = SymbolTable()
-        symbol_table = cls.global_symbol_table[scope]
-        return symbol_table.store_variable(scope, identifier, type, value)
+        if self.global_symbol_table.get(scope, None) is None:
+            self.global_symbol_table[scope] = SymbolTable()
+        symbol_table = self.global_symbol_table[scope]
+        self.visible.setdefault(identifier, []).append(scope)
+        symbol = symbol_table.store_variable(scope, identifier, type, value)
+        self.declared[scope] = self.declared.get(scope, 0) + 1
+        if self.emitter is not None:
+            self.emitter.declaration(symbol)
+        return symbol
 
-    @classmethod
-    def store_message(cls, scope: str, identifier: str) -> Message:
+    def store_message(self, scope: int, identifier: str) -> Message:
         """ Stores the given message into the related symbol table. """
-        if cls.global_symbol_table.get(scope, None) is None:
-            cls.global_symbol_table[scope] = SymbolTable()
-        symbol_table = cls.global_symbol_table[scope]
-        return symbol_table.store_message(scope, identifier)
+        if self.global_symbol_table.get(scope, None) is None:
+            self.global_symbol_table[scope] = SymbolTable()
+        symbol_table = self.global_symbol_table[scope]
+        self.visible.setdefault(identifier, []).append(scope)
+        symbol = symbol_table.store_message(scope, identifier)
+        self.declared[scope] = self.declared.get(scope, 0) + 1
+        if self.emitter is not None:
+            self.emitter.declaration(symbol)
+        return symbol
 
-    @classmethod
-    def retrieve(cls, scope: str, identifier: str) -> Any:
+    def retrieve(self, scope: int, identifier: str) -> Any:
         """ Retrieves the symbol having the given identifier. """
-        symbol_table = cls.global_symbol_table.get(scope, None)
+        symbol_table = self.global_symbol_table.get(scope, None)
         if symbol_table is None:
             return None
         return symbol_table.retrieve(identifier)
 
+    def is_visible(self, identifier: str) -> bool:
+        """ Checks if the given identifier is declared in the open scopes. """
+        return identifier in self.visible
+
+    def lookup(self, identifier: str) -> Any:
+        """ Retrieves the symbol having the given identifier from the innermost open scope declaring it. """
+        scopes = self.visible.get(identifier, None)
+        if not scopes:
+            return None
+        return self.retrieve(scopes[-1], identifier)
+
+    def symbols(self) -> List[Any]:
+        """ Gets the declared symbols, by scope, in order of declaration. """
+        return [symbol for scope in sorted(self.global_symbol_table)
+                for symbol in self.global_symbol_table[scope].symbol_table.values()]
+
+    def release(self, scope: int) -> None:
+        """ Hides the symbols of the given scope, being closed (i.e. the innermost open scope).
+        The symbols are dropped as well if emitted, so that only the open scopes are retained.
+        """
+        symbol_table = self.global_symbol_table.get(scope, None)
+        if symbol_table is None:
+            return
+        for identifier in symbol_table.symbol_table:
+            scopes = self.visible[identifier]
+            scopes.pop()
+            if not scopes:
+                del self.visible[identifier]
+        if self.emitter is not None:
+            del self.global_symbol_table[scope]
+            # The dictionaries keep their capacity once shrunk
+            self.visible = dict(self.visible)
+
 
 class CurrentScope(object):
     """ Supports the parsing engine by containing the current entities. """
-        
-    # The list of the actions contained in the current scope
-    actions: List[Any] = list()
-    
-    # The list of the literals contained in the current scope
-    identifiers: List[Any] = list()
-    
-    @classmethod
-    def append(cls, entity: Any, type: ProductionType) -> None:
+
+    def __init__(self) -> None:
+        # The list of the actions contained in the current scope
+        self.actions: List[Any] = list()
+        # The list of the literals contained in the current scope
+        self.identifiers: List[Any] = list()
+        # The literals contained in the current scope, for the membership tests
+        self.pending: Set[Any] = set()
+
+    def append(self, entity: Any, type: ProductionType) -> None:
         """ Appends the given entity of the given type to the related data structure. """
         if type == ProductionType.ACTION:
-            cls.actions.append(entity)
+            self.actions.append(entity)
         elif type == ProductionType.IDENTIFIER:
-            cls.identifiers.append(entity)
+            self.identifiers.append(entity)
+            self.pending.add(entity)
         else:
             raise UnrecognizedError("Cannot append the entity {}, unrecognized type {}".format(entity, type))
 
-    @classmethod
-    def get(cls, type: ProductionType) -> List[Any]:
+    def get(self, type: ProductionType) -> List[Any]:
         """ Gets the given production type related list. """
         if type == ProductionType.ACTION:
-            return cls.actions
+            return self.actions
         elif type == ProductionType.IDENTIFIER:
-            return cls.identifiers
+            return self.identifiers
         else:
             raise UnrecognizedError("Cannot get the data for the type {}".format(type))
 
-    @classmethod
-    def clean(cls, type: ProductionType = None) -> None:
+    def clean(self, type: ProductionType = None) -> None:
         """ Cleans the data structures of the current scope. """
         if type == ProductionType.ACTION:
-            cls.actions = list()
+            self.actions = list()
         elif type == ProductionType.IDENTIFIER:
-            cls.identifiers = list()
+            self.identifiers = list()
+            self.pending = set()
         else:
-            cls.actions = list()
-            cls.identifiers = list()
+            self.actions = list()
+            self.identifiers = list()
+            self.pending = set()
+
+    def is_pending(self, identifier: Any) -> bool:
+        """ Checks if the given literal is contained in the current scope. """
+        return identifier in self.pending
+
+
+class ParseContext(object):
+    """ Contains the state of a single parse.
+
+    Each parse owns its context, so that parses are isolated from each other,
+    can run concurrently and release their state as soon as they end.
+    The parse pushes its events to the given emitter, if any, instead of
+    building the attack scenario (single-pass mode). The parse collects the
+    errors into the given report, if any, instead of stopping at the first one.
+    """
+
+    def __init__(self, emitter: Emitter = None, report: ErrorReport = None) -> None:
+        self.scope_handler: ScopeHandler = ScopeHandler()
+        self.symbol_table: GlobalSymbolTable = GlobalSymbolTable(emitter)
+        self.current_scope: CurrentScope = CurrentScope()
+        self.emitter: Emitter = emitter
+        self.report: ErrorReport = report
+
+    def error(self, stage: Stage, exception: Exception, lineno: int) -> None:
+        """ Collects the given error into the report, raises it if there is no report. """
+        if self.report is None:
+            raise exception
+        self.report.add(stage, str(exception), lineno)
+
+
+class Parser(object):
+    """ The re-entrant parser of ADeLe.
+
+    Shares the lexing and parsing tables among the parses, while each parse
+    runs on its own lexer, parsing engine and context. The parsing engine is
+    either given or built on first use.
+    """
+
+    def __init__(self, engine: LRParser = None, build: Callable[[], LRParser] = None) -> None:
+        if engine is not None:
+            self.engine: LRParser = engine
+        self.build: Callable[[], LRParser] = build
+        self.lock: threading.Lock = threading.Lock()
+
+    def __getattr__(self, name: str) -> Any:
+        # Builds the parsing engine once, the next accesses do not get here
+        if name != 'engine' or self.__dict__.get('build') is None:
+            raise AttributeError(name)
+        with self.lock:
+            if 'engine' not in self.__dict__:
+                self.engine = self.build()
+        return self.__dict__['engine']
+
+    def parse(self,
+              sourcecode: Any,
+              lexer: Lexer = None,
+              tracer: Tracer = None,
+              context: ParseContext = None,
+              **kwargs: Any) -> Scenario:
+        """ Parses the given source code, either text or bytes-like (e.g. memory-mapped),
+        and returns the attack scenario. The reductions are reported to the tracer, if any.
+        The given context, if any, is left to the caller for inspection.
+        """
+        if lexer is None:
+            lexer = get_scanner(sourcecode)
+        # The parsing engine keeps the parse state into its attributes
+        engine = copy.copy(self.engine)
+        engine.context = context if context is not None else ParseContext()
+        lexer.report = engine.context.report
+        # Only the traced parses run the wrapped actions
+        if tracer is not None:
+            engine.productions = trace_productions(self.engine.productions, tracer)
+            kwargs.setdefault('tracking', tracer.lines)
+        try:
+            scenario = engine.parse(sourcecode, lexer=lexer, **kwargs)
+        except UnexpectedEndError as e:
+            # The error handler cannot reach the report at the end of the source
+            report = engine.context.report
+            if report is None:
+                raise
+            report.add(Stage.SYNTAX, "{} - line {}".format(e, lexer.lineno), lexer.lineno)
+            return None
+        finally:
+            emitter = engine.context.emitter
+            engine.context = None
+        # Completes the output, e.g. with the document of the missing scenario
+        if emitter is not None:
+            emitter.finish()
+        return scenario
+
+    def parse_file(self, path: str, **kwargs: Any) -> Scenario:
+        """ Parses the given source file by memory-mapping it. """
+        with open_mapped(path) as sourcecode:
+            return self.parse(sourcecode, **kwargs)
+
+    def check(self, sourcecode: Any, limit: int = ERROR_LIMIT_DEFAULT, **kwargs: Any) -> ErrorReport:
+        """ Parses the given source code in a single pass and returns the report of its
+        lexical, syntax and semantic errors, up to the given number of errors.
+        """
+        report = ErrorReport(limit)
+        try:
+            self.parse(sourcecode, context=ParseContext(report=report), **kwargs)
+        except TooManyErrorsError:
+            pass
+        return report
+
+
+# The syntax errors are collected by the rules catching the 'error' token, which
+# resynchronize the parser at the end of the statement (the semicolons) or of the
+# block (the closing bracket)
 
 
 # Handles syntax errors
-def p_error(p: YaccProduction) -> NoReturn:
-    raise RuntimeError("Wrong syntax for the token '{}' - line {}".format(
-        str(p.value), p.lineno))
+def p_error(p: YaccProduction) -> None:
+    if p is None:
+        raise UnexpectedEndError("Unexpected end of the source")
+    msg = "Wrong syntax for the token '{}' - line {}".format(str(p.value), p.lineno)
+    report = getattr(p.lexer, 'report', None)
+    if report is None:
+        raise RuntimeError(msg)
+    report.add(Stage.SYNTAX, msg, p.lineno)
 
 
 # Handles empty productions
@@ -228,7 +425,7 @@ def p_empty(p: YaccProduction) -> None:
     '''
     empty :
     '''
-    logger.debug("Yacc production: {}".format(p[1:]))
+    pass
 
 
 # Catches a number of semicolons 
@@ -237,7 +434,7 @@ def p_semicolons(p: YaccProduction) -> None:
     semicolons : SEMICOLON
                | SEMICOLON semicolons
     '''
-    logger.debug("Yacc production: {}".format(p[1:]))
+    pass
 
 
 # Catches a curvy left bracket
@@ -245,7 +442,11 @@ def p_curvy_left(p: YaccProduction) -> None:
     '''
     curvy_left : CURVY_L
     '''
-    ScopeHandler.open_scope()
+    context = p.parser.context
+    context.scope_handler.open_scope()
+    if context.emitter is not None:
+        # The keyword opening the block precedes the bracket on the stack
+        context.emitter.start_block(p.stack[-1].value, context.scope_handler.current_scope)
 
 
 # Catches a curvy right bracket
@@ -253,7 +454,12 @@ def p_curvy_right(p: YaccProduction) -> None:
     '''
     curvy_right : CURVY_R
     '''
-    ScopeHandler.close_scope()
+    context = p.parser.context
+    # The symbols of the closed scope are no more visible
+    context.symbol_table.release(context.scope_handler.get_current_scope_identifier())
+    context.scope_handler.close_scope()
+    if context.emitter is not None:
+        context.emitter.end_block()
 
 
 # Catches a literal boolean
@@ -262,8 +468,7 @@ def p_literal_boolean(p: YaccProduction) -> Literal:
     literal_boolean : TRUE
                     | FALSE
     '''
-    logger.debug("Yacc production: {}".format(p[1:]))
-    p[0] = GlobalSymbolTable.store_literal(Keyword.BOOLEAN, p[1])
+    p[0] = p.parser.context.symbol_table.store_literal(Keyword.BOOLEAN, p[1])
 
 
 # Catches a literal char
@@ -271,8 +476,7 @@ def p_literal_char(p: YaccProduction) -> Literal:
     '''
     literal_char : LITERAL_CHAR
     '''
-    logger.debug("Yacc production: {}".format(p[1:]))
-    p[0] = GlobalSymbolTable.store_literal(Keyword.CHAR, p[1])
+    p[0] = p.parser.context.symbol_table.store_literal(Keyword.CHAR, p[1])
 
 
 # Catches a literal integer
@@ -280,8 +484,7 @@ def p_literal_integer(p: YaccProduction) -> Literal:
     '''
     literal_integer : LITERAL_INTEGER
     '''
-    logger.debug("Yacc production: {}".format(p[1:]))
-    p[0] = GlobalSymbolTable.store_literal(Keyword.INTEGER, p[1])
+    p[0] = p.parser.context.symbol_table.store_literal(Keyword.INTEGER, p[1])
 
 
 # Catches a literal float
@@ -289,8 +492,7 @@ def p_literal_float(p: YaccProduction) -> Literal:
     '''
     literal_float : LITERAL_FLOAT
     '''
-    logger.debug("Yacc production: {}".format(p[1:]))
-    p[0] = GlobalSymbolTable.store_literal(Keyword.FLOAT, p[1])
+    p[0] = p.parser.context.symbol_table.store_literal(Keyword.FLOAT, p[1])
 
 
 # Catches a literal string
@@ -298,8 +500,7 @@ def p_literal_string(p: YaccProduction) -> Literal:
     '''
     literal_string : LITERAL_STRING
     '''
-    logger.debug("Yacc production: {}".format(p[1:]))
-    p[0] = GlobalSymbolTable.store_literal(Keyword.STRING, p[1])
+    p[0] = p.parser.context.symbol_table.store_literal(Keyword.STRING, p[1])
 
 
 # Catches an 8 bit unsigned integer
@@ -307,8 +508,7 @@ def p_literal_uint8(p: YaccProduction) -> Literal:
     '''
     literal_uint8 : UINT8
     '''
-    logger.debug("Yacc production: {}".format(p[1:]))
-    p[0] = GlobalSymbolTable.store_literal(Keyword.UINT8, p[1])
+    p[0] = p.parser.context.symbol_table.store_literal(Keyword.UINT8, p[1])
 
 
 # Catches a 16 bit unsigned integer
@@ -316,8 +516,7 @@ def p_literal_uint16(p: YaccProduction) -> Literal:
     '''
     literal_uint16 : UINT16
     '''
-    logger.debug("Yacc production: {}".format(p[1:]))
-    p[0] = GlobalSymbolTable.store_literal(Keyword.UINT16, p[1])
+    p[0] = p.parser.context.symbol_table.store_literal(Keyword.UINT16, p[1])
 
 
 # Catches a 32 bit unsigned integer
@@ -325,8 +524,7 @@ def p_literal_uint32(p: YaccProduction) -> Literal:
     '''
     literal_uint32 : UINT32
     '''
-    logger.debug("Yacc production: {}".format(p[1:]))
-    p[0] = GlobalSymbolTable.store_literal(Keyword.UINT32, p[1])
+    p[0] = p.parser.context.symbol_table.store_literal(Keyword.UINT32, p[1])
 
 
 # Catches a 64 bit unsigned integer
@@ -334,8 +532,7 @@ def p_literal_uint64(p: YaccProduction) -> Literal:
     '''
     literal_uint64 : UINT64
     '''
-    logger.debug("Yacc production: {}".format(p[1:]))
-    p[0] = GlobalSymbolTable.store_literal(Keyword.UINT64, p[1])
+    p[0] = p.parser.context.symbol_table.store_literal(Keyword.UINT64, p[1])
 
 
 # Catches an 8 bit signed integer
@@ -343,8 +540,7 @@ def p_literal_sint8(p: YaccProduction) -> Literal:
     '''
     literal_sint8 : SINT8
     '''
-    logger.debug("Yacc production: {}".format(p[1:]))
-    p[0] = GlobalSymbolTable.store_literal(Keyword.SINT8, p[1])
+    p[0] = p.parser.context.symbol_table.store_literal(Keyword.SINT8, p[1])
 
 
 # Catches a 16 bit signed integer
@@ -352,8 +548,7 @@ def p_literal_sint16(p: YaccProduction) -> Literal:
     '''
     literal_sint16 : SINT16
     '''
-    logger.debug("Yacc production: {}".format(p[1:]))
-    p[0] = GlobalSymbolTable.store_literal(Keyword.SINT16, p[1])
+    p[0] = p.parser.context.symbol_table.store_literal(Keyword.SINT16, p[1])
 
 
 # Catches a 32 bit signed integer
@@ -361,8 +556,7 @@ def p_literal_sint32(p: YaccProduction) -> Literal:
     '''
     literal_sint32 : SINT32
     '''
-    logger.debug("Yacc production: {}".format(p[1:]))
-    p[0] = GlobalSymbolTable.store_literal(Keyword.SINT32, p[1])
+    p[0] = p.parser.context.symbol_table.store_literal(Keyword.SINT32, p[1])
 
 
 # Catches a 64 bit unsigned integer
@@ -370,8 +564,7 @@ def p_literal_sint64(p: YaccProduction) -> Literal:
     '''
     literal_sint64 : SINT64
     '''
-    logger.debug("Yacc production: {}".format(p[1:]))
-    p[0] = GlobalSymbolTable.store_literal(Keyword.SINT64, p[1])
+    p[0] = p.parser.context.symbol_table.store_literal(Keyword.SINT64, p[1])
 
 
 # Catches a 32 bit floating point
@@ -379,8 +572,7 @@ def p_literal_float32(p: YaccProduction) -> Literal:
     '''
     literal_float32 : FLOAT32
     '''
-    logger.debug("Yacc production: {}".format(p[1:]))
-    p[0] = GlobalSymbolTable.store_literal(Keyword.FLOAT32, p[1])
+    p[0] = p.parser.context.symbol_table.store_literal(Keyword.FLOAT32, p[1])
 
 
 # Catches a 64 bit floating point
@@ -388,8 +580,7 @@ def p_literal_float64(p: YaccProduction) -> Literal:
     '''
     literal_float64 : FLOAT64
     '''
-    logger.debug("Yacc production: {}".format(p[1:]))
-    p[0] = GlobalSymbolTable.store_literal(Keyword.FLOAT64, p[1])
+    p[0] = p.parser.context.symbol_table.store_literal(Keyword.FLOAT64, p[1])
 
 
 # The parsing entry point
@@ -398,7 +589,6 @@ def p_entry_point(p: YaccProduction) -> Scenario:
     entry_point : empty
                 | scenario_compound_statement
     '''
-    logger.debug("Yacc production: {}".format(p[1:]))
     p[0] = p[1]
 
 
@@ -407,7 +597,8 @@ def p_scenario_compound_statement(p: YaccProduction) -> Scenario:
     '''
     scenario_compound_statement : SCENARIO curvy_left scenario_block_content curvy_right
     '''
-    logger.debug("Yacc production: {}".format(p[1:]))
+    # Exports the tree of the scopes
+    p[3].scopes = p.parser.context.scope_handler.scopes
     p[0] = p[3]
 
 # >>>
@@ -420,13 +611,12 @@ def p_scenario_block_content(p: YaccProduction) -> Scenario:
                            | configuration_compound_statement attack_compound_statement
                            | attack_compound_statement configuration_compound_statement
     '''
-    logger.debug("Yacc production: {}".format(p[1:]))
     # TODO add the symbol table
     # TODO add the expression table
-    # Builds the scenario
+    # Builds the scenario (the attack is a stub, i.e. None)
     if isinstance(p[1], Configuration):
         p[0] = Scenario(p[1], p[2])
-    elif isinstance(p[1], Attack):
+    elif isinstance(p[2], Configuration):
         p[0] = Scenario(p[2], p[1])
     else: # Empty block content
         p[0] = Scenario(None, None)
@@ -439,9 +629,9 @@ def p_configuration_compound_statement(p: YaccProduction) -> Configuration:
     configuration_compound_statement : CONFIGURATION curvy_left configuration_block_content curvy_right
     '''
     # Scans the current scope's list to build the configuration
-    logger.debug("Yacc production: {}".format(p[1:]))
-    configuration = Configuration(CurrentScope.get(ProductionType.ACTION))
-    CurrentScope.clean()
+    current_scope = p.parser.context.current_scope
+    configuration = Configuration(current_scope.get(ProductionType.ACTION))
+    current_scope.clean()
     p[0] = configuration
 
 
@@ -449,20 +639,29 @@ def p_configuration_compound_statement(p: YaccProduction) -> Configuration:
 def p_configuration_block_content(p: YaccProduction) -> None:
     '''
     configuration_block_content : configuration_action_set
+                                | configuration_action_set error
+                                | error
     '''
     # Supports the looping of the parser inside the configuration block
-    logger.debug("Yacc production: {}".format(p[1:]))
 
 
 # Catches the set of actions contained inside the configuration's block 
 def p_configuration_action_set(p: YaccProduction) -> None:
     '''
     configuration_action_set : configuration_action
-                             | configuration_action configuration_action_set
+                             | configuration_action_set configuration_action
     '''
-    # Fills the current scope with the configuration's actions
-    logger.debug("Yacc production: {}".format(p[1:]))
-    CurrentScope.append(p[1], ProductionType.ACTION)
+    # Fills the current scope with the configuration's actions, in order (the left
+    # recursion reduces each action as soon as it is read), or emits them
+    context = p.parser.context
+    action = p[len(p) - 1]
+    # The actions in error are discarded
+    if action is None:
+        return
+    if context.emitter is None:
+        context.current_scope.append(action, ProductionType.ACTION)
+    else:
+        context.emitter.action(action)
 
 
 # Catches the configuration actions
@@ -473,16 +672,22 @@ def p_configuration_action(p: YaccProduction) -> Any:
                          | action_set_unit_angle
                          | action_set_time_start
     '''
-    logger.debug("Yacc production: {}".format(p[1:]))
     p[0] = p[1]
 
 
+# Catches a wrong configuration action, up to its end
+def p_configuration_action_error(p: YaccProduction) -> None:
+    '''
+    configuration_action : error semicolons
+    '''
+    p[0] = None
+
+
 # Catches the action 'setUnitTime'
 def p_action_set_unit_time(p: YaccProduction) -> SetUnitTime:
     '''
     action_set_unit_time : SET_UNIT_TIME ROUND_L literal_string ROUND_R semicolons
     '''
-    logger.debug("Yacc production: {}".format(p[1:]))
     p[0] = SetUnitTime(p[3].identifier)
 
 
@@ -491,7 +696,6 @@ def p_action_set_unit_length(p: YaccProduction) -> SetUnitLength:
     '''
     action_set_unit_length : SET_UNIT_LENGTH ROUND_L literal_string ROUND_R semicolons
     '''
-    logger.debug("Yacc production: {}".format(p[1:]))
     p[0] = SetUnitLength(p[3].identifier)
 
 
@@ -500,7 +704,6 @@ def p_action_set_unit_angle(p: YaccProduction) -> SetUnitAngle:
     '''
     action_set_unit_angle : SET_UNIT_ANGLE ROUND_L literal_string ROUND_R semicolons
     '''
-    logger.debug("Yacc production: {}".format(p[1:]))
     p[0] = SetUnitAngle(p[3].identifier)
 
 
@@ -510,25 +713,26 @@ def p_action_set_time_start(p: YaccProduction) -> SetTimeStart:
     action_set_time_start : SET_TIME_START ROUND_L literal_float ROUND_R semicolons
                           | SET_TIME_START ROUND_L literal_integer ROUND_R semicolons
     '''
-    logger.debug("Yacc production: {}".format(p[1:]))
     # Time cannot be negative
     if p[3].value < 0.0:
-        raise InvalidArgumentError("Time cannot be negative, line {}".format(p.lineno(1)))
+        p.parser.context.error(Stage.SEMANTIC, InvalidArgumentError(
+            "Time cannot be negative, line {}".format(p.lineno(1))), p.lineno(1))
+        p[0] = None
+        return
     p[0] = SetTimeStart(p[3].identifier)
 
 
-def assert_not_already_declared(identifier: str, lineno: int) -> None:
-    """ Raises a runtime error if the identifier was already declared. """
-    # Checks the given identifier in the support data structure for the current scope
-    if identifier in CurrentScope.get(ProductionType.IDENTIFIER):
-        raise RuntimeAssertError("The identifier '{}' was already declared - line {}".format(
-                identifier, lineno))
-    # Checks the given identifier in the current scope and the outer ones 
-    for scope in range(0, ScopeHandler.current_scope + 1):
-        scope_identifier = ScopeHandler.get_scope_identifier(scope)
-        if GlobalSymbolTable.retrieve(scope_identifier, identifier) is not None:
-            raise RuntimeAssertError("The identifier '{}' was already declared - line {}".format(
-                identifier, lineno))
+def assert_not_already_declared(context: ParseContext, identifier: str, lineno: int) -> bool:
+    """ Raises a runtime error if the identifier was already declared (returns False
+    if the errors are collected).
+    """
+    # Checks the given identifier in the support data structure for the current scope,
+    # then in the current scope and the outer ones
+    if context.current_scope.is_pending(identifier) or context.symbol_table.is_visible(identifier):
+        context.error(Stage.SEMANTIC, RuntimeAssertError("The identifier '{}' was already declared - line {}".format(
+                identifier, lineno)), lineno)
+        return False
+    return True
 
 
 # Catches an identifier used in declarations
@@ -536,9 +740,10 @@ def p_declaration_identifier(p: YaccProduction) -> None:
     '''
     declaration_identifier : LITERAL_IDENTIFIER
     '''
-    logger.debug("Yacc production: {}".format(p[1:]))
-    assert_not_already_declared(p[1], p.lineno(1))
-    CurrentScope.append(p[1], ProductionType.IDENTIFIER)
+    context = p.parser.context
+    # The redeclared identifiers are discarded
+    if assert_not_already_declared(context, p[1], p.lineno(1)):
+        context.current_scope.append(p[1], ProductionType.IDENTIFIER)
 
 
 # Catches a set of identifiers used in declarations
@@ -547,7 +752,7 @@ def p_declaration_identifier_set(p: YaccProduction) -> None:
     declaration_identifier_set : declaration_identifier
                                | declaration_identifier COMMA declaration_identifier_set
     '''
-    logger.debug("Yacc production: {}".format(p[1:]))
+    pass
 
 
 # Catches the declaration of boolean variables
@@ -555,12 +760,12 @@ def p_declaration_boolean_set(p: YaccProduction) -> None:
     '''
     declaration_boolean_set : BOOLEAN declaration_identifier_set semicolons
     '''
-    logger.debug("Yacc production: {}".format(p[1:]))
     # Stores the declared variables into the symbol table
-    scope_identifier = ScopeHandler.get_current_scope_identifier()
-    for identifier in CurrentScope.get(ProductionType.IDENTIFIER):
-        GlobalSymbolTable.store_variable(scope_identifier, identifier, Keyword.BOOLEAN, None)
-    CurrentScope.clean(ProductionType.IDENTIFIER)
+    context = p.parser.context
+    scope_identifier = context.scope_handler.get_current_scope_identifier()
+    for identifier in context.current_scope.get(ProductionType.IDENTIFIER):
+        context.symbol_table.store_variable(scope_identifier, identifier, Keyword.BOOLEAN, None)
+    context.current_scope.clean(ProductionType.IDENTIFIER)
 
 
 # Catches the declaration of char variables
@@ -568,12 +773,12 @@ def p_declaration_char_set(p: YaccProduction) -> None:
     '''
     declaration_char_set : CHAR declaration_identifier_set semicolons
     '''
-    logger.debug("Yacc production: {}".format(p[1:]))
     # Stores the declared variables into the symbol table
-    scope_identifier = ScopeHandler.get_current_scope_identifier()
-    for identifier in CurrentScope.get(ProductionType.IDENTIFIER):
-        GlobalSymbolTable.store_variable(scope_identifier, identifier, Keyword.CHAR, None)
-    CurrentScope.clean(ProductionType.IDENTIFIER)
+    context = p.parser.context
+    scope_identifier = context.scope_handler.get_current_scope_identifier()
+    for identifier in context.current_scope.get(ProductionType.IDENTIFIER):
+        context.symbol_table.store_variable(scope_identifier, identifier, Keyword.CHAR, None)
+    context.current_scope.clean(ProductionType.IDENTIFIER)
 
 
 # Catches the declaration of integer variables
@@ -581,12 +786,12 @@ def p_declaration_integer_set(p: YaccProduction) -> None:
     '''
     declaration_integer_set : INTEGER declaration_identifier_set semicolons
     '''
-    logger.debug("Yacc production: {}".format(p[1:]))
     # Stores the declared variables into the symbol table
-    scope_identifier = ScopeHandler.get_current_scope_identifier()
-    for identifier in CurrentScope.get(ProductionType.IDENTIFIER):
-        GlobalSymbolTable.store_variable(scope_identifier, identifier, Keyword.INTEGER, None)
-    CurrentScope.clean(ProductionType.IDENTIFIER)
+    context = p.parser.context
+    scope_identifier = context.scope_handler.get_current_scope_identifier()
+    for identifier in context.current_scope.get(ProductionType.IDENTIFIER):
+        context.symbol_table.store_variable(scope_identifier, identifier, Keyword.INTEGER, None)
+    context.current_scope.clean(ProductionType.IDENTIFIER)
 
 
 # Catches the declaration of float variables
@@ -594,12 +799,12 @@ def p_declaration_float_set(p: YaccProduction) -> None:
     '''
     declaration_float_set : FLOAT declaration_identifier_set semicolons
     '''
-    logger.debug("Yacc production: {}".format(p[1:]))
     # Stores the declared variables into the symbol table
-    scope_identifier = ScopeHandler.get_current_scope_identifier()
-    for identifier in CurrentScope.get(ProductionType.IDENTIFIER):
-        GlobalSymbolTable.store_variable(scope_identifier, identifier, Keyword.FLOAT, None)
-    CurrentScope.clean(ProductionType.IDENTIFIER)
+    context = p.parser.context
+    scope_identifier = context.scope_handler.get_current_scope_identifier()
+    for identifier in context.current_scope.get(ProductionType.IDENTIFIER):
+        context.symbol_table.store_variable(scope_identifier, identifier, Keyword.FLOAT, None)
+    context.current_scope.clean(ProductionType.IDENTIFIER)
 
 
 # Catches the declaration of string variables
@@ -607,12 +812,12 @@ def p_declaration_string_set(p: YaccProduction) -> None:
     '''
     declaration_string_set : STRING declaration_identifier_set semicolons
     '''
-    logger.debug("Yacc production: {}".format(p[1:]))
     # Stores the declared variables into the symbol table
-    scope_identifier = ScopeHandler.get_current_scope_identifier()
-    for identifier in CurrentScope.get(ProductionType.IDENTIFIER):
-        GlobalSymbolTable.store_variable(scope_identifier, identifier, Keyword.STRING, None)
-    CurrentScope.clean(ProductionType.IDENTIFIER)
+    context = p.parser.context
+    scope_identifier = context.scope_handler.get_current_scope_identifier()
+    for identifier in context.current_scope.get(ProductionType.IDENTIFIER):
+        context.symbol_table.store_variable(scope_identifier, identifier, Keyword.STRING, None)
+    context.current_scope.clean(ProductionType.IDENTIFIER)
 
 
 # Catches the declaration of uint8 variables
@@ -620,12 +825,12 @@ def p_declaration_uint8_set(p: YaccProduction) -> None:
     '''
     declaration_uint8_set : UINT8 declaration_identifier_set semicolons
     '''
-    logger.debug("Yacc production: {}".format(p[1:]))
     # Stores the declared variables into the symbol table
-    scope_identifier = ScopeHandler.get_current_scope_identifier()
-    for identifier in CurrentScope.get(ProductionType.IDENTIFIER):
-        GlobalSymbolTable.store_variable(scope_identifier, identifier, Keyword.UINT8, None)
-    CurrentScope.clean(ProductionType.IDENTIFIER)
+    context = p.parser.context
+    scope_identifier = context.scope_handler.get_current_scope_identifier()
+    for identifier in context.current_scope.get(ProductionType.IDENTIFIER):
+        context.symbol_table.store_variable(scope_identifier, identifier, Keyword.UINT8, None)
+    context.current_scope.clean(ProductionType.IDENTIFIER)
 
 
 # Catches the declaration of uint16 variables
@@ -633,12 +838,12 @@ def p_declaration_uint16_set(p: YaccProduction) -> None:
     '''
     declaration_uint16_set : UINT16 declaration_identifier_set semicolons
     '''
-    logger.debug("Yacc production: {}".format(p[1:]))
     # Stores the declared variables into the symbol table
-    scope_identifier = ScopeHandler.get_current_scope_identifier()
-    for identifier in CurrentScope.get(ProductionType.IDENTIFIER):
-        GlobalSymbolTable.store_variable(scope_identifier, identifier, Keyword.UINT16, None)
-    CurrentScope.clean(ProductionType.IDENTIFIER)
+    context = p.parser.context
+    scope_identifier = context.scope_handler.get_current_scope_identifier()
+    for identifier in context.current_scope.get(ProductionType.IDENTIFIER):
+        context.symbol_table.store_variable(scope_identifier, identifier, Keyword.UINT16, None)
+    context.current_scope.clean(ProductionType.IDENTIFIER)
 
 
 # Catches the declaration of uint32 variables
@@ -646,12 +851,12 @@ def p_declaration_uint32_set(p: YaccProduction) -> None:
     '''
     declaration_uint32_set : UINT32 declaration_identifier_set semicolons
     '''
-    logger.debug("Yacc production: {}".format(p[1:]))
     # Stores the declared variables into the symbol table
-    scope_identifier = ScopeHandler.get_current_scope_identifier()
-    for identifier in CurrentScope.get(ProductionType.IDENTIFIER):
-        GlobalSymbolTable.store_variable(scope_identifier, identifier, Keyword.UINT32, None)
-    CurrentScope.clean(ProductionType.IDENTIFIER)
+    context = p.parser.context
+    scope_identifier = context.scope_handler.get_current_scope_identifier()
+    for identifier in context.current_scope.get(ProductionType.IDENTIFIER):
+        context.symbol_table.store_variable(scope_identifier, identifier, Keyword.UINT32, None)
+    context.current_scope.clean(ProductionType.IDENTIFIER)
 
 
 # Catches the declaration of uint64 variables
@@ -659,12 +864,12 @@ def p_declaration_uint64_set(p: YaccProduction) -> None:
     '''
     declaration_uint64_set : UINT64 declaration_identifier_set semicolons
     '''
-    logger.debug("Yacc production: {}".format(p[1:]))
     # Stores the declared variables into the symbol table
-    scope_identifier = ScopeHandler.get_current_scope_identifier()
-    for identifier in CurrentScope.get(ProductionType.IDENTIFIER):
-        GlobalSymbolTable.store_variable(scope_identifier, identifier, Keyword.UINT64, None)
-    CurrentScope.clean(ProductionType.IDENTIFIER)
+    context = p.parser.context
+    scope_identifier = context.scope_handler.get_current_scope_identifier()
+    for identifier in context.current_scope.get(ProductionType.IDENTIFIER):
+        context.symbol_table.store_variable(scope_identifier, identifier, Keyword.UINT64, None)
+    context.current_scope.clean(ProductionType.IDENTIFIER)
 
 
 # Catches the declaration of sint8 variables
@@ -672,12 +877,12 @@ def p_declaration_sint8_set(p: YaccProduction) -> None:
     '''
     declaration_sint8_set : SINT8 declaration_identifier_set semicolons
     '''
-    logger.debug("Yacc production: {}".format(p[1:]))
     # Stores the declared variables into the symbol table
-    scope_identifier = ScopeHandler.get_current_scope_identifier()
-    for identifier in CurrentScope.get(ProductionType.IDENTIFIER):
-        GlobalSymbolTable.store_variable(scope_identifier, identifier, Keyword.SINT8, None)
-    CurrentScope.clean(ProductionType.IDENTIFIER)
+    context = p.parser.context
+    scope_identifier = context.scope_handler.get_current_scope_identifier()
+    for identifier in context.current_scope.get(ProductionType.IDENTIFIER):
+        context.symbol_table.store_variable(scope_identifier, identifier, Keyword.SINT8, None)
+    context.current_scope.clean(ProductionType.IDENTIFIER)
 
 
 # Catches the declaration of sint16 variables
@@ -685,12 +890,12 @@ def p_declaration_sint16_set(p: YaccProduction) -> None:
     '''
     declaration_sint16_set : SINT16 declaration_identifier_set semicolons
     '''
-    logger.debug("Yacc production: {}".format(p[1:]))
     # Stores the declared variables into the symbol table
-    scope_identifier = ScopeHandler.get_current_scope_identifier()
-    for identifier in CurrentScope.get(ProductionType.IDENTIFIER):
-        GlobalSymbolTable.store_variable(scope_identifier, identifier, Keyword.SINT16, None)
-    CurrentScope.clean(ProductionType.IDENTIFIER)
+    context = p.parser.context
+    scope_identifier = context.scope_handler.get_current_scope_identifier()
+    for identifier in context.current_scope.get(ProductionType.IDENTIFIER):
+        context.symbol_table.store_variable(scope_identifier, identifier, Keyword.SINT16, None)
+    context.current_scope.clean(ProductionType.IDENTIFIER)
 
 
 # Catches the declaration of sint32 variables
@@ -698,12 +903,12 @@ def p_declaration_sint32_set(p: YaccProduction) -> None:
     '''
     declaration_sint32_set : SINT32 declaration_identifier_set semicolons
     '''
-    logger.debug("Yacc production: {}".format(p[1:]))
     # Stores the declared variables into the symbol table
-    scope_identifier = ScopeHandler.get_current_scope_identifier()
-    for identifier in CurrentScope.get(ProductionType.IDENTIFIER):
-        GlobalSymbolTable.store_variable(scope_identifier, identifier, Keyword.SINT32, None)
-    CurrentScope.clean(ProductionType.IDENTIFIER)
+    context = p.parser.context
+    scope_identifier = context.scope_handler.get_current_scope_identifier()
+    for identifier in context.current_scope.get(ProductionType.IDENTIFIER):
+        context.symbol_table.store_variable(scope_identifier, identifier, Keyword.SINT32, None)
+    context.current_scope.clean(ProductionType.IDENTIFIER)
 
 
 # Catches the declaration of sint64 variables
@@ -711,12 +916,12 @@ def p_declaration_sint64_set(p: YaccProduction) -> None:
     '''
     declaration_sint64_set : SINT64 declaration_identifier_set semicolons
     '''
-    logger.debug("Yacc production: {}".format(p[1:]))
     # Stores the declared variables into the symbol table
-    scope_identifier = ScopeHandler.get_current_scope_identifier()
-    for identifier in CurrentScope.get(ProductionType.IDENTIFIER):
-        GlobalSymbolTable.store_variable(scope_identifier, identifier, Keyword.SINT64, None)
-    CurrentScope.clean(ProductionType.IDENTIFIER)
+    context = p.parser.context
+    scope_identifier = context.scope_handler.get_current_scope_identifier()
+    for identifier in context.current_scope.get(ProductionType.IDENTIFIER):
+        context.symbol_table.store_variable(scope_identifier, identifier, Keyword.SINT64, None)
+    context.current_scope.clean(ProductionType.IDENTIFIER)
 
 
 # Catches the declaration of float32 variables
@@ -724,12 +929,12 @@ def p_declaration_float32_set(p: YaccProduction) -> None:
     '''
     declaration_float32_set : FLOAT32 declaration_identifier_set semicolons
     '''
-    logger.debug("Yacc production: {}".format(p[1:]))
     # Stores the declared variables into the symbol table
-    scope_identifier = ScopeHandler.get_current_scope_identifier()
-    for identifier in CurrentScope.get(ProductionType.IDENTIFIER):
-        GlobalSymbolTable.store_variable(scope_identifier, identifier, Keyword.FLOAT32, None)
-    CurrentScope.clean(ProductionType.IDENTIFIER)
+    context = p.parser.context
+    scope_identifier = context.scope_handler.get_current_scope_identifier()
+    for identifier in context.current_scope.get(ProductionType.IDENTIFIER):
+        context.symbol_table.store_variable(scope_identifier, identifier, Keyword.FLOAT32, None)
+    context.current_scope.clean(ProductionType.IDENTIFIER)
 
 
 # Catches the declaration of float64 variables
@@ -737,12 +942,12 @@ def p_declaration_float64_set(p: YaccProduction) -> None:
     '''
     declaration_float64_set : FLOAT64 declaration_identifier_set semicolons
     '''
-    logger.debug("Yacc production: {}".format(p[1:]))
     # Stores the declared variables into the symbol table
-    scope_identifier = ScopeHandler.get_current_scope_identifier()
-    for identifier in CurrentScope.get(ProductionType.IDENTIFIER):
-        GlobalSymbolTable.store_variable(scope_identifier, identifier, Keyword.FLOAT64, None)
-    CurrentScope.clean(ProductionType.IDENTIFIER)
+    context = p.parser.context
+    scope_identifier = context.scope_handler.get_current_scope_identifier()
+    for identifier in context.current_scope.get(ProductionType.IDENTIFIER):
+        context.symbol_table.store_variable(scope_identifier, identifier, Keyword.FLOAT64, None)
+    context.current_scope.clean(ProductionType.IDENTIFIER)
 
 
 # Catches the declaration of generic messages
@@ -750,12 +955,12 @@ def p_declaration_message_set(p: YaccProduction) -> None:
     '''
     declaration_message_set : MESSAGE declaration_identifier_set semicolons
     '''
-    logger.debug("Yacc production: {}".format(p[1:]))
     # Stores the declared message into the symbol table
-    scope_identifier = ScopeHandler.get_current_scope_identifier()
-    for identifier in CurrentScope.get(ProductionType.IDENTIFIER):
-        GlobalSymbolTable.store_message(scope_identifier, identifier)
-    CurrentScope.clean(ProductionType.IDENTIFIER)
+    context = p.parser.context
+    scope_identifier = context.scope_handler.get_current_scope_identifier()
+    for identifier in context.current_scope.get(ProductionType.IDENTIFIER):
+        context.symbol_table.store_message(scope_identifier, identifier)
+    context.current_scope.clean(ProductionType.IDENTIFIER)
 
 
 # Catches the declaration of a set of variables
@@ -777,7 +982,7 @@ def p_declaration_variable_set(p: YaccProduction) -> None:
                              | declaration_float32_set
                              | declaration_float64_set
     '''
-    logger.debug("Yacc production: {}".format(p[1:]))
+    pass
 
 
 # Catches the declaration of a set of heterogeneous variables
@@ -786,18 +991,27 @@ def p_declaration_variable_set(p: YaccProduction) -> None:
 #    declaration_heterogeneous_variable_set : declaration_homogeneous_variable_set
 #                                           | declaration_homogeneous_variable_set declaration_heterogeneous_variable_set
 #    '''
-#    logger.debug("Yacc production: {}".format(p[1:]))
-
 
 # Catches the declaration of a number of entities
 def p_declaration_entities(p: YaccProduction) -> None:
     '''
     declaration_entities : declaration_variable_set
                          | declaration_message_set
-                         | declaration_variable_set declaration_entities
-                         | declaration_message_set declaration_entities
+                         | declaration_entities declaration_variable_set
+                         | declaration_entities declaration_message_set
+                         | declaration_error
+                         | declaration_entities declaration_error
+    '''
+    pass
+
+
+# Catches a wrong declaration, up to its end
+def p_declaration_error(p: YaccProduction) -> None:
+    '''
+    declaration_error : error semicolons
     '''
-    logger.debug("Yacc production: {}".format(p[1:]))
+    # Discards the identifiers declared so far
+    p.parser.context.current_scope.clean(ProductionType.IDENTIFIER)
 
 
 # >>>
@@ -806,11 +1020,13 @@ def p_attack_compound_statement(p: YaccProduction) -> None:
     '''
     attack_compound_statement : ATTACK curvy_left empty curvy_right
                               | ATTACK curvy_left declaration_entities curvy_right
+                              | ATTACK curvy_left declaration_entities error curvy_right
+                              | ATTACK curvy_left error curvy_right
     '''
     # TODO this is a stub, to be implemented
     pass
 #<<<
 
-# Builds the parser end define the entry point
-parser = yacc.yacc(start='entry_point')
+# Defines the parser and its entry point, built on first use (the parsing tables are cached)
+parser: Parser = Parser(build=lambda: build_parser(sys.modules[__name__], start='entry_point'))
 
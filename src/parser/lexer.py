@@ -9,14 +9,19 @@ Copyright 2018 Francesco Racciatti
 """
 
 
+import sys
+import hashlib
 import logging
-from typing import Tuple, Dict
-from mypy_extensions import NoReturn
+from functools import lru_cache
+from typing import Tuple, Dict, Any
 
-from ply import lex
 from ply.lex import LexToken, Lexer
 
 from lexeme import Lexeme
+from tables import build_lexer
+from mapped import MappedLexer
+from scanner import FastLexer
+from diagnostics import Stage
 
 
 logger = logging.getLogger(__name__)
@@ -247,12 +252,50 @@ def t_newline(t: LexToken) -> None:
 
 
 # Token parsing rule for wrong statement or characters
-def t_error(t: LexToken) -> NoReturn:
+def t_error(t: LexToken) -> None:
     msg = "Illegal character '{}' - line {}".format(t.value[0], t.lexer.lineno)
-    logger.critical(msg)
-    raise RuntimeError(msg)
-
-
-# Builds the lexer
-lexer: Lexer = lex.lex()
-
+    # Skips the illegal character if the errors are collected, raises otherwise
+    report = getattr(t.lexer, 'report', None)
+    if report is None:
+        logger.critical(msg)
+        raise RuntimeError(msg)
+    report.add(Stage.LEXICAL, msg, t.lexer.lineno)
+    # The bytes-like sources skip the whole (well-formed) multi-byte character
+    if isinstance(t.lexer.lexdata, str) or t.value[0] == '\ufffd':
+        t.lexer.skip(1)
+    else:
+        t.lexer.skip(len(t.value[0].encode('utf-8')))
+
+
+@lru_cache(maxsize=None)
+def get_lexers() -> Tuple[Lexer, MappedLexer, FastLexer]:
+    """ Builds the lexer, the one for memory-mapped sources and the high-throughput one
+    on first use (the lexing tables are cached).
+    """
+    lexer = build_lexer(sys.modules[__name__])
+    return lexer, MappedLexer(lexer), FastLexer(lexer, reserved)
+
+
+def get_scanner(sourcecode: Any, fast: bool = False) -> Any:
+    """ Gets a fresh lexer for the given source code, either text or bytes-like (e.g. memory-mapped),
+    the high-throughput one if fast.
+    """
+    lexer, mapped_lexer, fast_lexer = get_lexers()
+    if fast:
+        return fast_lexer.clone()
+    if isinstance(sourcecode, str):
+        return lexer.clone()
+    return mapped_lexer.clone()
+
+
+def fingerprint(sourcecode: Any) -> str:
+    """ Gets the hash of the normalized token stream of the given source code.
+
+    Whitespaces, comments and line numbers do not contribute to the hash.
+    """
+    digest = hashlib.sha256()
+    scanner = get_scanner(sourcecode)
+    scanner.input(sourcecode)
+    for token in scanner:
+        digest.update('{}\0{!r}\0'.format(token.type, token.value).encode('utf-8'))
+    return digest.hexdigest()
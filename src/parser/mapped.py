@@ -0,0 +1,126 @@
+# -*- coding: utf-8 -*-
+""" This module contains the lexer for memory-mapped sources.
+
+The lexer scans the raw bytes of the source by means of the bytes-level
+versions of the ADeLe's lexing rules, so that the source is never loaded
+into memory as a whole: only the values of the tokens are decoded.
+
+Author:
+    Francesco Racciatti
+
+Copyright 2018 Francesco Racciatti
+
+"""
+
+
+import re
+import mmap
+import logging
+from contextlib import contextmanager
+from typing import Any, Iterator, Optional
+
+from ply.lex import LexToken, Lexer, LexError
+
+
+logger = logging.getLogger(__name__)
+
+
+# The encoding of the sources
+ENCODING = 'utf-8'
+
+# The number of bytes reported to the error rule
+ERROR_CONTEXT = 64
+
+
+class MappedLexer(Lexer):
+    """ The lexer for memory-mapped (or any bytes-like) sources.
+
+    Shares the lexing rules with the given lexer, compiled as bytes-level regexes.
+    Multi-byte characters are supported within strings and comments only.
+    """
+
+    def __init__(self, lexer: Lexer) -> None:
+        Lexer.__init__(self)
+        self.__dict__.update(lexer.clone().__dict__)
+        # The bytes-level rules, the groups of the master regexes map onto the same rules
+        self.lexre = [(re.compile(regex.pattern.encode(ENCODING), regex.flags & ~re.UNICODE), rules)
+                      for regex, rules in lexer.lexre]
+        self.lexignore = lexer.lexignore.encode(ENCODING)
+        self.lexdata = b''
+
+    def input(self, data: Any) -> None:
+        """ Pushes the given bytes-like source into the lexer. """
+        self.lexdata = data
+        self.lexpos = 0
+        self.lexlen = len(data)
+
+    def token(self) -> Optional[LexToken]:
+        """ Gets the next token, None at the end of the source. """
+        lexpos = self.lexpos
+        lexlen = self.lexlen
+        lexignore = self.lexignore
+        lexdata = self.lexdata
+
+        while lexpos < lexlen:
+            # Skips the ignored characters
+            if lexdata[lexpos] in lexignore:
+                lexpos += 1
+                continue
+
+            for regex, rules in self.lexre:
+                match = regex.match(lexdata, lexpos)
+                if not match:
+                    continue
+                tok = LexToken()
+                tok.value = match.group().decode(ENCODING)
+                tok.lineno = self.lineno
+                tok.lexpos = lexpos
+                rule, tok.type = rules[match.lastindex]
+                lexpos = match.end()
+                if not rule:
+                    if tok.type:
+                        self.lexpos = lexpos
+                        return tok
+                    break
+                tok.lexer = self
+                self.lexmatch = match
+                self.lexpos = lexpos
+                tok = rule(tok)
+                # Rules returning nothing discard the token (comments, newlines)
+                if not tok:
+                    lexpos = self.lexpos
+                    break
+                return tok
+            else:
+                # No rule matches, reports the error by decoding the bytes at hand only
+                tok = LexToken()
+                tok.value = bytes(lexdata[lexpos:lexpos + ERROR_CONTEXT]).decode(ENCODING, errors='replace')
+                tok.lineno = self.lineno
+                tok.type = 'error'
+                tok.lexer = self
+                tok.lexpos = lexpos
+                self.lexpos = lexpos
+                if self.lexerrorf:
+                    self.lexerrorf(tok)
+                if self.lexpos == lexpos:
+                    raise LexError("Scanning error. Illegal character '{}'".format(tok.value[0]), tok.value)
+                lexpos = self.lexpos
+
+        self.lexpos = lexpos + 1
+        return None
+
+
+@contextmanager
+def open_mapped(path: str) -> Iterator[Any]:
+    """ Memory-maps the given source file (read only). """
+    with open(path, 'rb') as filesource:
+        # Empty files cannot be mapped
+        try:
+            mapped = mmap.mmap(filesource.fileno(), 0, access=mmap.ACCESS_READ)
+        except ValueError:
+            yield b''
+            return
+        try:
+            yield mapped
+        finally:
+            mapped.close()
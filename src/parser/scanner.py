@@ -0,0 +1,168 @@
+# -*- coding: utf-8 -*-
+""" This module contains the high-throughput lexer of ADeLe.
+
+The lexer runs the ADeLe's lexing rules as a single compiled scanner: the
+master regex of the PLY's lexer, prefixed by the ignored characters, is
+iterated by means of finditer, the token type is dispatched on the name of
+the matched group, the keywords are resolved by a single lookup on the
+identifier match and the tokens are slotted objects. The rule functions are
+never called, hence the rules must stay in sync with their inline
+counterparts below (see the differential test against the PLY's lexer).
+
+Author:
+    Francesco Racciatti
+
+Copyright 2018 Francesco Racciatti
+
+"""
+
+
+import re
+import logging
+from typing import Any, Dict, Iterator, Optional
+
+from ply.lex import Lexer
+
+from diagnostics import Stage
+
+
+logger = logging.getLogger(__name__)
+
+
+# The encoding of the bytes-like sources
+ENCODING = 'utf-8'
+
+# The group of the ignored characters
+IGNORE = 'ignore'
+
+# The rules handled inline, by group name
+CHAR = 't_LITERAL_CHAR'
+FLOAT = 't_LITERAL_FLOAT'
+INTEGER = 't_LITERAL_INTEGER'
+STRING = 't_LITERAL_STRING'
+IDENTIFIER = 't_LITERAL_IDENTIFIER'
+COMMENT = 't_comment'
+NEWLINE = 't_newline'
+
+
+class Token(object):
+    """ The token, i.e. the slotted counterpart of the PLY's LexToken. """
+
+    __slots__ = ('type', 'value', 'lineno', 'lexpos', 'lexer')
+
+    def __init__(self, type: str, value: Any, lineno: int, lexpos: int) -> None:
+        self.type = type
+        self.value = value
+        self.lineno = lineno
+        self.lexpos = lexpos
+
+    def __str__(self):
+        return 'LexToken({},{!r},{},{})'.format(self.type, self.value, self.lineno, self.lexpos)
+
+    def __repr__(self):
+        return str(self)
+
+
+class FastLexer(object):
+    """ The high-throughput lexer, for text or bytes-like sources.
+
+    Shares the lexing rules and the keywords with the given PLY's lexer, it
+    produces the same tokens and reports the same errors.
+    """
+
+    def __init__(self, lexer: Lexer, keywords: Dict[str, str]) -> None:
+        ignore = ''.join('\\x{:02x}'.format(ord(c)) for c in lexer.lexignore)
+        pattern = '(?P<{}>[{}]+)|{}'.format(IGNORE, ignore, '|'.join(regex.pattern for regex, _ in lexer.lexre))
+        self.master: Any = re.compile(pattern, lexer.lexreflags)
+        self.mapped_master: Any = re.compile(pattern.encode(ENCODING), lexer.lexreflags & ~re.UNICODE)
+        # The token types of the punctuation, by group name
+        self.types: Dict[str, str] = {name: name[2:] for name in self.master.groupindex
+                                      if name not in (IGNORE, CHAR, FLOAT, INTEGER, STRING, IDENTIFIER,
+                                                      COMMENT, NEWLINE)}
+        self.keywords: Dict[str, str] = keywords
+        self.lexdata: Any = ''
+        self.lexpos: int = 0
+        self.lineno: int = 1
+        self.tokens: Iterator[Token] = iter(())
+        # The report collecting the lexical errors, if any
+        self.report: Any = None
+
+    def clone(self) -> 'FastLexer':
+        """ Gets a fresh copy of the lexer, sharing the compiled scanner. """
+        clone = FastLexer.__new__(FastLexer)
+        clone.__dict__.update(self.__dict__)
+        clone.input('')
+        return clone
+
+    def input(self, data: Any) -> None:
+        """ Pushes the given source, either text or bytes-like, into the lexer. """
+        self.lexdata = data
+        self.lexpos = 0
+        self.tokens = self.scan(data)
+
+    def token(self) -> Optional[Token]:
+        """ Gets the next token, None at the end of the source. """
+        return next(self.tokens, None)
+
+    def __iter__(self) -> Iterator[Token]:
+        return self.tokens
+
+    def __next__(self) -> Token:
+        return next(self.tokens)
+
+    def scan(self, data: Any) -> Iterator[Token]:
+        """ Generates the tokens of the given source. """
+        decode = not isinstance(data, str)
+        master = self.mapped_master if decode else self.master
+        types = self.types
+        keywords = self.keywords
+        lineno = self.lineno
+        position = 0
+
+        for match in master.finditer(data):
+            start = match.start()
+            # The scanner skips the characters no rule matches
+            if start != position:
+                self.error(data, position, start, lineno)
+            position = match.end()
+            rule = match.lastgroup
+            if rule == IGNORE or rule == COMMENT:
+                continue
+            if rule == NEWLINE:
+                lineno += position - start
+                self.lineno = lineno
+                continue
+            value = match.group()
+            if decode:
+                value = value.decode(ENCODING)
+            if rule == IDENTIFIER:
+                yield Token(keywords.get(value, 'LITERAL_IDENTIFIER'), value, lineno, start)
+            elif rule in types:
+                yield Token(types[rule], value, lineno, start)
+            elif rule == INTEGER:
+                yield Token('LITERAL_INTEGER', int(value), lineno, start)
+            elif rule == FLOAT:
+                yield Token('LITERAL_FLOAT', float(value), lineno, start)
+            elif rule == STRING:
+                yield Token('LITERAL_STRING', value.replace('"', ''), lineno, start)
+            else:
+                yield Token('LITERAL_CHAR', value.replace("'", ''), lineno, start)
+
+        if position != len(data):
+            self.error(data, position, len(data), lineno)
+        self.lexpos = len(data)
+
+    def error(self, data: Any, position: int, end: int, lineno: int) -> None:
+        """ Reports the illegal characters between the given positions, raises unless
+        the errors are collected into the report.
+        """
+        characters = data[position:end]
+        if not isinstance(characters, str):
+            characters = bytes(characters).decode(ENCODING, errors='replace')
+        self.lexpos = position
+        if self.report is None:
+            msg = "Illegal character '{}' - line {}".format(characters[0], lineno)
+            logger.critical(msg)
+            raise RuntimeError(msg)
+        for character in characters:
+            self.report.add(Stage.LEXICAL, "Illegal character '{}' - line {}".format(character, lineno), lineno)
@@ -0,0 +1,163 @@
+# -*- coding: utf-8 -*-
+""" This module contains the facilities to cache the lexing and parsing tables.
+
+The tables are stored into a cache directory and are keyed by the signature
+of the rules they are generated from, so that a change of the tokens, of the
+lexing rules or of the grammar productions invalidates them automatically.
+
+Author:
+    Francesco Racciatti
+
+Copyright 2018 Francesco Racciatti
+
+"""
+
+
+import os
+import shutil
+import hashlib
+import logging
+import tempfile
+import importlib.util
+from types import ModuleType
+from typing import Tuple, Optional
+
+import ply
+from ply import lex, yacc
+from ply.lex import Lexer
+from ply.yacc import LRParser
+
+
+logger = logging.getLogger(__name__)
+
+
+# The environment variable that overrides the default cache directory
+CACHE_DIRECTORY_VARIABLE = 'PYADELE_CACHE_DIR'
+
+# The default cache directory
+CACHE_DIRECTORY_DEFAULT = os.path.join(os.path.expanduser('~'), '.cache', 'pyadele')
+
+# The sub directory containing the tables
+TABLES_DIRECTORY = 'tables'
+
+# The prefix of the cached lexing tables
+LEXTAB_PREFIX = 'lextab_'
+
+# The prefix of the cached parsing tables
+PARSETAB_PREFIX = 'parsetab_'
+
+# The prefix of the lexing rules
+LEXING_RULE_PREFIX = 't_'
+
+# The prefix of the parsing rules
+PARSING_RULE_PREFIX = 'p_'
+
+# The module attributes (other than the rules) the tables depend on
+SIGNATURE_ATTRIBUTES: Tuple[str, ...] = ('tokens', 'reserved', 'literals', 'precedence', 'start')
+
+
+def get_cache_directory(directory: Optional[str] = None) -> str:
+    """ Gets the directory containing the cached tables. """
+    if directory is None:
+        directory = os.environ.get(CACHE_DIRECTORY_VARIABLE) or CACHE_DIRECTORY_DEFAULT
+    return os.path.join(directory, TABLES_DIRECTORY)
+
+
+def get_rules_signature(module: ModuleType, prefix: str) -> str:
+    """ Gets the signature of the rules (having the given prefix) defined in the given module. """
+    digest = hashlib.sha1()
+    digest.update(ply.__version__.encode('utf-8'))
+    for name in sorted(dir(module)):
+        if not name.startswith(prefix) and name not in SIGNATURE_ATTRIBUTES:
+            continue
+        rule = getattr(module, name)
+        # Functions contribute by means of their docstrings (regexes or productions)
+        text = rule.__doc__ if callable(rule) else repr(rule)
+        digest.update(name.encode('utf-8'))
+        digest.update(str(text).encode('utf-8'))
+    return digest.hexdigest()[:16]
+
+
+def prepare_cache_directory(directory: str) -> bool:
+    """ Creates the cache directory, returns False if it cannot be used. """
+    try:
+        os.makedirs(directory, exist_ok=True)
+    except OSError as e:
+        logger.warning("Cannot use the cache directory '{}': {}".format(directory, e))
+        return False
+    return os.access(directory, os.W_OK)
+
+
+def load_table_module(path: str) -> Optional[ModuleType]:
+    """ Loads the table module stored at the given path, if any. """
+    if not os.path.isfile(path):
+        return None
+    name = os.path.splitext(os.path.basename(path))[0]
+    try:
+        spec = importlib.util.spec_from_file_location(name, path)
+        module = importlib.util.module_from_spec(spec)
+        spec.loader.exec_module(module)
+    except Exception as e:
+        logger.warning("Cannot load the table module '{}': {}".format(path, e))
+        return None
+    return module
+
+
+def build_lexer(module: ModuleType, directory: Optional[str] = None) -> Lexer:
+    """ Builds the lexer defined in the given module, by using the cached tables if any. """
+    directory = get_cache_directory(directory)
+    if not prepare_cache_directory(directory):
+        return lex.lex(module=module)
+
+    lextab = LEXTAB_PREFIX + get_rules_signature(module, LEXING_RULE_PREFIX)
+    path = os.path.join(directory, lextab + '.py')
+
+    # Warm start, reads the cached tables
+    table = load_table_module(path)
+    if table is not None:
+        try:
+            return lex.lex(module=module, optimize=True, lextab=table)
+        except Exception as e:
+            logger.warning("Discarding the lexing tables '{}': {}".format(path, e))
+
+    # Cold start, builds the tables into a private directory then publishes them atomically
+    workdir = tempfile.mkdtemp(dir=directory)
+    try:
+        lexer = lex.lex(module=module, optimize=True, lextab=lextab, outputdir=workdir)
+        os.replace(os.path.join(workdir, lextab + '.py'), path)
+        logger.debug("Lexing tables stored into '{}'".format(path))
+    except OSError as e:
+        logger.warning("Cannot store the lexing tables '{}': {}".format(path, e))
+    finally:
+        shutil.rmtree(workdir, ignore_errors=True)
+    return lexer
+
+
+def build_parser(module: ModuleType, start: str, directory: Optional[str] = None) -> LRParser:
+    """ Builds the parser defined in the given module, by using the cached tables if any. """
+    directory = get_cache_directory(directory)
+    if not prepare_cache_directory(directory):
+        return yacc.yacc(module=module, start=start, debug=False, write_tables=False)
+
+    parsetab = PARSETAB_PREFIX + get_rules_signature(module, PARSING_RULE_PREFIX)
+    path = os.path.join(directory, parsetab + '.pickle')
+
+    # Warm start, reads the cached tables
+    if os.path.isfile(path):
+        try:
+            return yacc.yacc(module=module, start=start, debug=False, optimize=True, picklefile=path)
+        except Exception as e:
+            logger.warning("Discarding the parsing tables '{}': {}".format(path, e))
+
+    # Cold start, builds the tables into a private directory then publishes them atomically
+    workdir = tempfile.mkdtemp(dir=directory)
+    try:
+        workfile = os.path.join(workdir, parsetab + '.pickle')
+        parser = yacc.yacc(module=module, start=start, debug=False, optimize=True, picklefile=workfile)
+        os.replace(workfile, path)
+        logger.debug("Parsing tables stored into '{}'".format(path))
+    except OSError as e:
+        logger.warning("Cannot store the parsing tables '{}': {}".format(path, e))
+    finally:
+        shutil.rmtree(workdir, ignore_errors=True)
+    return parser
@@ -0,0 +1,76 @@
+# -*- coding: utf-8 -*-
+""" This module contains the tracing hook of the parser.
+
+The actions of the productions are wrapped only for the parses that request
+a tracer, the others run the bare actions and pay nothing for the tracing.
+
+Author:
+    Francesco Racciatti
+
+Copyright 2018 Francesco Racciatti
+
+"""
+
+
+import copy
+import time
+from typing import Any, Callable, Dict, List, Tuple, TextIO
+
+from ply.yacc import YaccProduction
+
+
+class Tracer(object):
+    """ Records the productions reduced by the parser, with their line and their timing.
+
+    Subclasses may override trace() to forward the records elsewhere.
+    """
+
+    # Whether the parser tracks the lines of the productions (the tracking slows the parse down)
+    lines: bool = True
+
+    def __init__(self) -> None:
+        # The records (production, line, elapsed seconds), in order of reduction
+        self.records: List[Tuple[str, int, float]] = []
+
+    def trace(self, production: str, lineno: int, elapsed: float) -> None:
+        """ Records the reduction of the given production. """
+        self.records.append((production, lineno, elapsed))
+
+    def summary(self) -> Dict[str, Tuple[int, float]]:
+        """ Gets the number of reductions and the overall time of each production. """
+        summary: Dict[str, Tuple[int, float]] = {}
+        for production, _, elapsed in self.records:
+            count, total = summary.get(production, (0, 0.0))
+            summary[production] = (count + 1, total + elapsed)
+        return summary
+
+    def dump(self, fp: TextIO) -> None:
+        """ Writes the records to the given file object, one per line (tab separated). """
+        for production, lineno, elapsed in self.records:
+            fp.write('{}\t{}\t{:.9f}\n'.format(lineno, production, elapsed))
+
+
+def trace_action(action: Callable[[YaccProduction], None],
+                 production: str,
+                 tracer: Tracer) -> Callable[[YaccProduction], None]:
+    """ Wraps the given action so that each call is reported to the given tracer. """
+    clock = time.perf_counter
+
+    def traced(p: YaccProduction) -> None:
+        begin = clock()
+        action(p)
+        # The line of the first symbol of the production, not the one of the lookahead
+        tracer.trace(production, p.lineno(0), clock() - begin)
+
+    return traced
+
+
+def trace_productions(productions: List[Any], tracer: Tracer) -> List[Any]:
+    """ Gets a copy of the given productions whose actions report to the given tracer. """
+    traced = []
+    for production in productions:
+        if production.callable is not None:
+            production = copy.copy(production)
+            production.callable = trace_action(production.callable, production.str, tracer)
+        traced.append(production)
+    return traced
@@ -12,20 +12,22 @@ Copyright 2018 Francesco Racciatti
 
 import os
 import sys
-sys.path.append('./src/')
-sys.path.append('./src/model/')
-sys.path.append('./src/parser/')
-sys.path.append('./src/shell/')
-sys.path.append('./src/util/')
+# The modules import each other by name, from the directories of their packages
+sys.path += [os.path.join(os.path.dirname(os.path.abspath(__file__)), p) for p in ('', 'model', 'parser', 'shell', 'util')]
 import logging
 import logging.config
+import cProfile
 
 import json
 
-from parser.grammar import parser
-from shell.options import get_command_line_arguments
-from shell.service import validate_argument
-from model.interpreter import Interpreter
+from shell.options import SERVE_COMMAND, get_command_line_arguments
+from shell.service import validate_argument, validate_targets, compile_file, compile_targets, emit_ast
+from shell.cache import BuildCache
+from shell.metrics import Metrics
+from tracing import Tracer
+from shell.batch import Status, is_batch, compile_batch, print_summary
+from shell.watch import watch
+from shell.check import check_sources, print_reports, dump_reports
 
 # Logger configuration file
 loggerconfig = 'src/log/logger.json'
@@ -46,30 +48,88 @@ if __name__ == '__main__':
     logger.info("Py-ADeLe is running")
 
     try:
+        # Runs the compile daemon, if requested
+        if sys.argv[1:2] == [SERVE_COMMAND]:
+            # The daemon is imported on demand, the HTTP server is costly to import
+            from shell.server import serve
+            serve(sys.argv[2:])
+            sys.exit(0)
+
         # Retrieves the command line arguments
         argument = get_command_line_arguments(sys.argv[1:])
         logger.info(argument)
 
-        # Validates the arguments
-        source, output, interpreter = validate_argument(argument)
-
-        # Opens the source file
-        with open(source, 'r') as filesource:
-            sourcecode = filesource.read()
-
-        # Parses the source file and builds the attack scenario
-        logger.info("Parsing ...")
-        scenario = parser.parse(sourcecode)
-        logger.info("Done")
-
-        # Interprets and writes the attack scenario
-        logger.info("Interpreting ...")
-        outputcode = Interpreter.interpret(scenario, interpreter)
-        logger.info("Done")
-
-        # Writes the output file
-        with open(output, 'w') as fileoutput:
-            fileoutput.write(outputcode)
+        # Profiles the run, if requested
+        profile = cProfile.Profile() if argument.cprofile else None
+        if profile is not None:
+            profile.enable()
+        try:
+            # Checks the sources, reporting all their errors
+            if argument.check:
+                reports = check_sources(argument)
+                print_reports(reports)
+                if argument.output:
+                    dump_reports(reports, argument.output)
+                    logger.info("Report written into '{}'".format(argument.output))
+                sys.exit(1 if any(report.errors for _, report in reports) else 0)
+
+            # Watches the sources, recompiling them as they change
+            if argument.watch:
+                if argument.trace or argument.metrics or argument.jobs is not None:
+                    logger.warning("The trace, the metrics and the jobs are not supported in watch mode, ignoring them")
+                watch(argument)
+                sys.exit(0)
+
+            # Compiles a batch of sources, the failures do not abort the batch
+            if is_batch(argument):
+                if argument.trace or argument.metrics:
+                    logger.warning("The trace and the metrics are not supported in batch mode, ignoring them")
+                results = compile_batch(argument)
+                print_summary(results)
+                sys.exit(1 if any(r.status == Status.FAILED for r in results) else 0)
+
+            # Validates the arguments, each interpreter gets its output file
+            if len(argument.interpreters) > 1:
+                source, targets = validate_targets(argument)
+            else:
+                source, output, interpreter = validate_argument(argument)
+                targets = [(interpreter, output)]
+
+            # Writes the syntax tree of the source, to be interpreted later
+            if argument.emit_ast:
+                emit_ast(source, output, argument.mmap)
+                logger.info("Syntax tree written into '{}'".format(output))
+                sys.exit(0)
+
+            # Compiles the source file, unless the output is in the build cache (not when tracing)
+            cache = None if argument.no_cache or argument.trace else BuildCache(argument.cache_dir)
+            tracer = Tracer() if argument.trace else None
+            metrics = Metrics() if argument.metrics else None
+            if len(targets) > 1:
+                # Parses once, then interprets into the targets concurrently
+                if all(compile_targets(source, targets, cache, argument.mmap, tracer, metrics, argument.compact,
+                                       argument.stream, argument.from_ast)):
+                    logger.info("The outputs are up to date (build cache)")
+            elif compile_file(source, output, interpreter, cache, argument.mmap, tracer, metrics, argument.compact,
+                              argument.stream, argument.from_ast):
+                logger.info("The output is up to date (build cache)")
+
+            # Writes the trace of the parser
+            if tracer is not None:
+                with open(argument.trace, 'w') as filetrace:
+                    tracer.dump(filetrace)
+                logger.info("Traced {} reductions into '{}'".format(len(tracer.records), argument.trace))
+
+            # Writes the metrics of the compilation
+            if metrics is not None:
+                metrics.sample_memory()
+                metrics.dump(argument.metrics)
+                logger.info("Metrics written into '{}'".format(argument.metrics))
+        finally:
+            if profile is not None:
+                profile.disable()
+                profile.dump_stats(argument.cprofile)
+                logger.info("Profile written into '{}'".format(argument.cprofile))
 
         logger.info("Done")
     except Exception as e:
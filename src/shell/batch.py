@@ -0,0 +1,212 @@
+# -*- coding: utf-8 -*-
+""" The batch compilation of Py-ADeLe.
+
+Compiles a number of scenarios by distributing them over a pool of worker
+processes, each of them loading the parser tables once.
+
+Author:
+    Francesco Racciatti
+
+Copyright 2018 Francesco Racciatti
+
+"""
+
+
+import os
+import glob
+import time
+import logging
+from enum import unique, Enum
+from typing import List, Tuple
+from concurrent.futures import ProcessPoolExecutor
+
+from options import Argument
+from service import NotAFileError, UnrecognizedInterpreterError, compile_file
+from cache import BuildCache
+from model.interpreter import Interpreter
+from util.utils import baserepr, basestr
+
+
+# Creates the logger
+logger = logging.getLogger(__name__)
+
+
+# The extension of the ADeLe's source files
+SOURCE_EXTENSION = '.adele'
+
+# The characters that make a path a glob pattern
+GLOB_CHARACTERS = '*?['
+
+
+@unique
+class Status(Enum):
+    """ The outcome of the compilation of a single source. """
+    COMPILED = 'ok'
+    CACHED = 'hit'
+    SKIPPED = 'skip'
+    FAILED = 'fail'
+
+
+class Result(object):
+    """ Wraps the outcome of the compilation of a single source. """
+
+    def __init__(self,
+                 source: str,
+                 output: str,
+                 status: Status,
+                 elapsed: float = 0.0,
+                 error: str = None) -> None:
+        self.source: str = source
+        self.output: str = output
+        self.status: Status = status
+        self.elapsed: float = elapsed
+        self.error: str = error
+
+    def __str__(self):
+        return basestr(self)
+
+    def __repr__(self):
+        return baserepr(self)
+
+
+def is_glob(path: str) -> bool:
+    """ Checks if the given path is a glob pattern. """
+    return any(character in path for character in GLOB_CHARACTERS)
+
+
+def is_batch(argument: Argument) -> bool:
+    """ Checks if the given arguments request the batch mode. """
+    if len(argument.sources) > 1 or argument.jobs is not None:
+        return True
+    return is_glob(argument.source) or os.path.isdir(argument.source)
+
+
+def expand_sources(paths: List[str]) -> List[str]:
+    """ Expands the given files, glob patterns and directories into the list of source files. """
+    sources: List[str] = []
+    for path in paths:
+        if os.path.isdir(path):
+            for directory, _, files in sorted(os.walk(path)):
+                sources += [os.path.join(directory, f) for f in sorted(files) if f.endswith(SOURCE_EXTENSION)]
+        elif is_glob(path):
+            sources += [f for f in sorted(glob.glob(path, recursive=True)) if os.path.isfile(f)]
+        else:
+            sources.append(path)
+    # Discards the duplicates, preserving the order
+    return list(dict.fromkeys(sources))
+
+
+def input_root(path: str) -> str:
+    """ Gets the directory the given input (a file, a glob pattern or a directory) is rooted at. """
+    if os.path.isdir(path):
+        return os.path.abspath(path)
+    if is_glob(path):
+        # The directories ahead of the first pattern
+        parts: List[str] = []
+        for part in path.replace('/', os.sep).split(os.sep):
+            if is_glob(part):
+                break
+            parts.append(part)
+        return os.path.abspath(os.sep.join(parts) or os.curdir)
+    return os.path.dirname(os.path.abspath(path))
+
+
+def plan_outputs(sources: List[str],
+                 interpreter: str,
+                 directory: str = None,
+                 paths: List[str] = None) -> List[Tuple[str, str]]:
+    """ Pairs each source with its output, placed side by side with the source
+    or, if given, into the output directory, preserving the paths relative to the
+    given inputs the sources are expanded from (the sources themselves, if none).
+    """
+    extension = '.{}'.format(interpreter.lower())
+    if not directory:
+        return [(source, os.path.splitext(source)[0] + extension) for source in sources]
+    root = os.path.commonpath([input_root(path) for path in (paths or sources)])
+    return [(source, os.path.join(directory, os.path.splitext(os.path.relpath(os.path.abspath(source), root))[0] + extension))
+            for source in sources]
+
+
+def compile_source(source: str,
+                   output: str,
+                   interpreter: str,
+                   cache: BuildCache = None,
+                   mapped: bool = False,
+                   compact: bool = False,
+                   stream: bool = False) -> Result:
+    """ Compiles the given source into the given output, never raises. """
+    begin = time.perf_counter()
+    try:
+        directory = os.path.dirname(output)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        cached = compile_file(source, output, interpreter, cache, mapped, compact=compact, stream=stream)
+    except Exception as e:
+        logger.debug("Cannot compile '{}'".format(source), exc_info=True)
+        return Result(source, output, Status.FAILED, time.perf_counter() - begin, '{}: {}'.format(type(e).__name__, e))
+    return Result(source, output, Status.CACHED if cached else Status.COMPILED, time.perf_counter() - begin)
+
+
+def check_output(source: str, output: str, force: bool) -> Result:
+    """ Applies the (non interactive) overwrite policy, returns None if the output can be written. """
+    if not os.path.exists(output):
+        return None
+    if not os.path.isfile(output):
+        return Result(source, output, Status.FAILED, error=str(NotAFileError(
+            "The (output) path '{}' does not refer a file".format(output))))
+    if not force:
+        return Result(source, output, Status.SKIPPED, error="The output file already exists")
+    return None
+
+
+def compile_batch(argument: Argument) -> List[Result]:
+    """ Compiles the sources of the given arguments, the failures do not abort the batch. """
+    if not Interpreter.exist(argument.interpreter):
+        raise UnrecognizedInterpreterError("Cannot recognize the interpreter '{}'".format(argument.interpreter))
+
+    cache = None if argument.no_cache else BuildCache(argument.cache_dir)
+    sources = expand_sources(argument.sources)
+    plan = plan_outputs(sources, argument.interpreter, argument.output, argument.sources)
+    logger.info("Compiling {} source(s) with {} job(s)".format(len(plan), argument.jobs or os.cpu_count()))
+
+    results: List[Result] = [None] * len(plan)
+    pending: List[int] = []
+    for index, (source, output) in enumerate(plan):
+        if not os.path.isfile(source):
+            results[index] = Result(source, output, Status.FAILED, error="Source file not found")
+        else:
+            results[index] = check_output(source, output, argument.force)
+        if results[index] is None:
+            pending.append(index)
+
+    if argument.jobs == 1:
+        for index in pending:
+            results[index] = compile_source(*plan[index], argument.interpreter, cache, argument.mmap, argument.compact,
+                                            argument.stream)
+        return results
+
+    with ProcessPoolExecutor(max_workers=argument.jobs) as executor:
+        futures = [(index, executor.submit(compile_source, *plan[index], argument.interpreter, cache, argument.mmap,
+                                           argument.compact, argument.stream)) for index in pending]
+        for index, future in futures:
+            try:
+                results[index] = future.result()
+            except Exception as e:
+                # The worker died, e.g. killed by the system
+                results[index] = Result(*plan[index], Status.FAILED, error='{}: {}'.format(type(e).__name__, e))
+    return results
+
+
+def print_summary(results: List[Result]) -> None:
+    """ Prints the per-file summary of the batch. """
+    for result in results:
+        line = '[{:^4}] {} -> {} ({:.1f} ms)'.format(
+            result.status.value, result.source, result.output, result.elapsed * 1000)
+        if result.error:
+            line += ': {}'.format(result.error)
+        print(line)
+    counters = {status: 0 for status in Status}
+    for result in results:
+        counters[result.status] += 1
+    print('{} compiled, {} cached, {} skipped, {} failed'.format(
+        counters[Status.COMPILED], counters[Status.CACHED], counters[Status.SKIPPED], counters[Status.FAILED]))
@@ -0,0 +1,109 @@
+# -*- coding: utf-8 -*-
+""" The build cache of Py-ADeLe.
+
+Stores the outputs of the compilations keyed by the hash of the normalized
+token stream of the source, of the interpreter and of the version of Py-ADeLe,
+so that unchanged scenarios are never compiled again.
+
+Author:
+    Francesco Racciatti
+
+Copyright 2018 Francesco Racciatti
+
+"""
+
+
+import os
+import shutil
+import hashlib
+import logging
+import tempfile
+
+from lexer import fingerprint
+from tables import CACHE_DIRECTORY_VARIABLE, CACHE_DIRECTORY_DEFAULT
+from util.version import VERSION
+from util.utils import baserepr, basestr
+
+
+# Creates the logger
+logger = logging.getLogger(__name__)
+
+
+# The sub directory containing the outputs
+BUILDS_DIRECTORY = 'builds'
+
+# The default maximum size of the build cache, in bytes
+BUILD_CACHE_SIZE_DEFAULT = 256 * 2 ** 20
+
+# The revision of the outputs, to be bumped whenever the same source gets a different output
+OUTPUT_REVISION = 4
+
+
+class BuildCache(object):
+    """ Models a size bounded build cache, evicting the least recently used outputs. """
+
+    def __init__(self, directory: str = None, size: int = BUILD_CACHE_SIZE_DEFAULT) -> None:
+        if not directory:
+            directory = os.environ.get(CACHE_DIRECTORY_VARIABLE) or CACHE_DIRECTORY_DEFAULT
+        self.directory: str = os.path.join(directory, BUILDS_DIRECTORY)
+        self.size: int = size
+
+    def key(self, sourcecode: str, interpreter: str, *options: str, source_fingerprint: str = None) -> str:
+        """ Gets the key of the output of the given source code for the given interpreter
+        and the given output options (e.g. the dialect, the compression). The fingerprint
+        of the source code, if given, spares its computation.
+        """
+        digest = hashlib.sha256()
+        digest.update('{}\0{}\0{}\0'.format(VERSION, OUTPUT_REVISION, interpreter.lower()).encode('utf-8'))
+        for option in options:
+            digest.update('{}\0'.format(option).encode('utf-8'))
+        digest.update((source_fingerprint or fingerprint(sourcecode)).encode('utf-8'))
+        return digest.hexdigest()
+
+    def fetch(self, key: str, output: str) -> bool:
+        """ Copies the cached output having the given key, returns False on cache miss. """
+        entry = os.path.join(self.directory, key)
+        try:
+            shutil.copyfile(entry, output)
+            # Marks the entry as the most recently used one
+            os.utime(entry)
+        except FileNotFoundError:
+            return False
+        logger.debug("Build cache hit '{}'".format(key))
+        return True
+
+    def store(self, key: str, output: str) -> None:
+        """ Stores the given output with the given key, then evicts the least recently used outputs. """
+        try:
+            os.makedirs(self.directory, exist_ok=True)
+            descriptor, workfile = tempfile.mkstemp(dir=self.directory, suffix='.tmp')
+            os.close(descriptor)
+            shutil.copyfile(output, workfile)
+            os.replace(workfile, os.path.join(self.directory, key))
+            self.evict()
+        except OSError as e:
+            logger.warning("Cannot store the output '{}' into the build cache: {}".format(output, e))
+
+    def evict(self) -> None:
+        """ Evicts the least recently used outputs until the cache fits its size. """
+        entries = []
+        for entry in os.scandir(self.directory):
+            if entry.is_file() and not entry.name.endswith('.tmp'):
+                stat = entry.stat()
+                entries.append((stat.st_mtime, stat.st_size, entry.path))
+        total = sum(size for _, size, _ in entries)
+        for _, size, path in sorted(entries):
+            if total <= self.size:
+                break
+            try:
+                os.remove(path)
+            except FileNotFoundError:
+                pass
+            total -= size
+            logger.debug("Build cache evicted '{}'".format(path))
+
+    def __str__(self):
+        return basestr(self)
+
+    def __repr__(self):
+        return baserepr(self)
@@ -0,0 +1,73 @@
+# -*- coding: utf-8 -*-
+""" The check mode of Py-ADeLe.
+
+Validates a number of scenarios without interpreting them: each source is
+parsed once, collecting all its lexical, syntax and semantic errors (up to the
+given limit) instead of stopping at the first one. The reports are printed as
+'source:line: stage: message' and, if requested, written as JSON.
+
+Author:
+    Francesco Racciatti
+
+Copyright 2018 Francesco Racciatti
+
+"""
+
+
+import json
+import logging
+from typing import Dict, List, Tuple
+from concurrent.futures import ProcessPoolExecutor
+
+from options import Argument
+from service import open_source
+from batch import expand_sources
+from grammar import parser
+from diagnostics import ErrorReport, Stage, ERROR_LIMIT_DEFAULT
+
+
+# Creates the logger
+logger = logging.getLogger(__name__)
+
+
+def check_source(source: str, limit: int = ERROR_LIMIT_DEFAULT, mapped: bool = False) -> ErrorReport:
+    """ Checks the given source file, never raises. """
+    try:
+        with open_source(source, mapped) as sourcecode:
+            return parser.check(sourcecode, limit)
+    except (OSError, UnicodeDecodeError) as e:
+        report = ErrorReport(limit)
+        report.add(Stage.SOURCE, "Cannot read the source: {}".format(e), 0)
+        return report
+
+
+def check_sources(argument: Argument) -> List[Tuple[str, ErrorReport]]:
+    """ Checks the sources of the given arguments, returns the report of each source. """
+    limit = argument.max_errors if argument.max_errors is not None else ERROR_LIMIT_DEFAULT
+    sources = expand_sources(argument.sources)
+    logger.info("Checking {} source(s)".format(len(sources)))
+    if argument.jobs is None or argument.jobs == 1:
+        return [(source, check_source(source, limit, argument.mmap)) for source in sources]
+    with ProcessPoolExecutor(max_workers=argument.jobs) as executor:
+        reports = executor.map(check_source, sources, [limit] * len(sources), [argument.mmap] * len(sources))
+        return list(zip(sources, reports))
+
+
+def print_reports(reports: List[Tuple[str, ErrorReport]]) -> None:
+    """ Prints the errors of each source, then the summary. """
+    for source, report in reports:
+        for error in report.errors:
+            print('{}:{}: {}: {}'.format(source, error.lineno, error.stage.value, error.message))
+        if report.truncated:
+            print('{}: stopped after {} errors'.format(source, len(report.errors)))
+    failed = sum(1 for _, report in reports if report.errors)
+    print('{} checked, {} with errors, {} errors'.format(
+        len(reports), failed, sum(len(report.errors) for _, report in reports)))
+
+
+def dump_reports(reports: List[Tuple[str, ErrorReport]], path: str) -> None:
+    """ Writes the reports into the given file, as JSON. """
+    content: Dict[str, Dict] = {source: report.to_dict() for source, report in reports}
+    with open(path, 'w') as filereport:
+        json.dump(content, filereport, indent=2)
+        filereport.write('\n')
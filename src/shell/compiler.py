@@ -0,0 +1,128 @@
+# -*- coding: utf-8 -*-
+""" The library API of Py-ADeLe.
+
+The compiler turns ADeLe sources into their interpretation in process, with
+no temporary files and no subprocess. Each compiler owns its parser and its
+cache of the outputs, and shares with the others only the (read-only) lexing
+and parsing tables, so it can be reused for any number of compilations and
+by many threads at once:
+
+    compiler = Compiler(interpreter='xml')
+    output = compiler.compile_string(sourcecode)
+    scenario = compiler.parse(sourcecode)
+
+Author:
+    Francesco Racciatti
+
+Copyright 2018 Francesco Racciatti
+
+"""
+
+
+import io
+import hashlib
+import threading
+from collections import OrderedDict
+from typing import Any, Union
+
+from service import UnrecognizedInterpreterError, UnstreamableInterpreterError, open_output
+from grammar import parser as shared_parser, Parser, ParseContext
+from lexer import get_scanner
+from model.oom import Scenario
+from model.interpreter import Interpreter
+from model.emitter import get_emitter, can_emit
+from util.utils import baserepr, basestr
+
+
+# The default number of the outputs kept by each compiler
+CACHE_SIZE_DEFAULT = 128
+
+
+class Compiler(object):
+    """ Compiles the ADeLe sources by means of the given interpreter.
+
+    The outputs of the latest compiled sources (up to cache_size, none if 0)
+    are kept in memory, keyed by the hash of the source. If stream, the
+    outputs are written while parsing (single pass), they are the same anyway.
+    If fast, the sources are tokenized by the high-throughput lexer.
+    """
+
+    def __init__(self,
+                 interpreter: str = Interpreter.Type.XML.value,
+                 compact: bool = False,
+                 stream: bool = False,
+                 fast: bool = False,
+                 cache_size: int = CACHE_SIZE_DEFAULT) -> None:
+        if not Interpreter.exist(interpreter):
+            raise UnrecognizedInterpreterError("Cannot recognize the interpreter '{}'".format(interpreter))
+        if stream and not can_emit(interpreter, compact):
+            raise UnstreamableInterpreterError("The interpreter '{}' cannot be streamed".format(interpreter))
+        self.interpreter: str = interpreter.lower()
+        self.compact: bool = compact
+        self.stream: bool = stream
+        self.fast: bool = fast
+        # The parsing engine is copied from the shared one on first use, the tables are shared
+        self.parser: Parser = Parser(build=lambda: shared_parser.engine)
+        self.cache_size: int = cache_size
+        self.cache: 'OrderedDict[str, Union[str, bytes]]' = OrderedDict()
+        self.lock: threading.Lock = threading.Lock()
+
+    def parse(self, sourcecode: Any) -> Scenario:
+        """ Parses the given source code, either text or bytes-like, and returns the attack scenario. """
+        return self.parser.parse(sourcecode, lexer=get_scanner(sourcecode, self.fast))
+
+    def interpret(self, scenario: Scenario) -> Union[str, bytes]:
+        """ Interprets the given attack scenario. """
+        return Interpreter.interpret(scenario, self.interpreter, self.compact)
+
+    def compile_string(self, sourcecode: Any) -> Union[str, bytes]:
+        """ Compiles the given source code, either text or bytes-like, and returns the output
+        (bytes for the binary interpreters).
+        """
+        key = None
+        if self.cache_size > 0:
+            key = hashlib.sha256(sourcecode.encode('utf-8') if isinstance(sourcecode, str) else sourcecode).hexdigest()
+            with self.lock:
+                output = self.cache.get(key)
+                if output is not None:
+                    self.cache.move_to_end(key)
+                    return output
+
+        if self.stream:
+            fileoutput = io.StringIO()
+            self.parser.parse(sourcecode, lexer=get_scanner(sourcecode, self.fast),
+                              context=ParseContext(get_emitter(self.interpreter, fileoutput, self.compact)))
+            output = fileoutput.getvalue()
+        else:
+            output = self.interpret(self.parse(sourcecode))
+
+        if key is not None:
+            with self.lock:
+                self.cache[key] = output
+                # Evicts the least recently used outputs
+                while len(self.cache) > self.cache_size:
+                    self.cache.popitem(last=False)
+        return output
+
+    def compile_file(self, path: str, output: str = None) -> Union[str, bytes, None]:
+        """ Compiles the given source file. Returns the output, or writes it into the given
+        output file (compressed if its extension is '.gz' or '.xz') and returns None.
+        """
+        with open(path, 'r') as filesource:
+            result = self.compile_string(filesource.read())
+        if output is None:
+            return result
+        with open_output(output, Interpreter.is_binary(self.interpreter)) as fileoutput:
+            fileoutput.write(result)
+        return None
+
+    def clear(self) -> None:
+        """ Discards the cached outputs. """
+        with self.lock:
+            self.cache.clear()
+
+    def __str__(self):
+        return basestr(self)
+
+    def __repr__(self):
+        return baserepr(self)
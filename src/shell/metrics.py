@@ -0,0 +1,231 @@
+# -*- coding: utf-8 -*-
+""" The metrics of a compilation of Py-ADeLe.
+
+Collects the wall and CPU time of each phase of the compilation (read, lex,
+parse, interpret, write), the number of tokens and of productions, the size
+of the symbol table of each scope, the size of the output and the peak
+memory, then exports them as JSON or as a Prometheus textfile.
+
+Lexing is interleaved with parsing and writing with interpreting: the time
+spent by the inner phase is measured apart and discounted from the outer one.
+
+Author:
+    Francesco Racciatti
+
+Copyright 2018 Francesco Racciatti
+
+"""
+
+
+import sys
+import json
+import time
+import logging
+from contextlib import contextmanager
+from typing import Any, Callable, Dict, Iterator, List, Optional, TextIO
+try:
+    import resource
+except ImportError:
+    # Windows has no resource module, the peak memory is not sampled
+    resource = None
+
+from ply.lex import LexToken
+
+from lexer import get_scanner
+from grammar import Parser, ParseContext
+from tracing import Tracer
+from model.oom import Scenario
+from model.interpreter import Interpreter
+from model.emitter import get_emitter
+from util.utils import baserepr, basestr
+
+
+# Creates the logger
+logger = logging.getLogger(__name__)
+
+
+# The phases of a compilation
+READ = 'read'
+LEX = 'lex'
+PARSE = 'parse'
+INTERPRET = 'interpret'
+WRITE = 'write'
+PHASES = (READ, LEX, PARSE, INTERPRET, WRITE)
+
+# The extension selecting the Prometheus textfile format
+PROMETHEUS_EXTENSION = '.prom'
+
+# The prefix of the Prometheus metrics
+PROMETHEUS_PREFIX = 'pyadele'
+
+
+class ProductionCounter(Tracer):
+    """ Counts the productions reduced by the parser, without recording them. """
+
+    lines: bool = False
+
+    def __init__(self) -> None:
+        Tracer.__init__(self)
+        self.count: int = 0
+
+    def trace(self, production: str, lineno: int, elapsed: float) -> None:
+        self.count += 1
+
+
+class MeteredWriter(object):
+    """ Wraps a file object, measuring the time spent writing. """
+
+    def __init__(self, fp: TextIO, metrics: 'Metrics') -> None:
+        self.fp: TextIO = fp
+        self.metrics: Metrics = metrics
+
+    def write(self, chunk: Any) -> int:
+        with self.metrics.phase(WRITE):
+            return self.fp.write(chunk)
+
+
+class Metrics(object):
+    """ Models the metrics of a single compilation. """
+
+    def __init__(self) -> None:
+        # Maps each phase onto its wall and CPU time, in seconds
+        self.wall: Dict[str, float] = {phase: 0.0 for phase in PHASES}
+        self.cpu: Dict[str, float] = {phase: 0.0 for phase in PHASES}
+        self.tokens: int = 0
+        self.productions: int = 0
+        # Maps each scope onto the number of its symbols
+        self.symbols: Dict[str, int] = {}
+        self.literals: int = 0
+        self.output_bytes: int = 0
+        self.peak_memory: int = 0
+        self.cached: bool = False
+
+    @contextmanager
+    def phase(self, name: str) -> Iterator[None]:
+        """ Accounts the time spent within the block to the given phase. """
+        wall = time.perf_counter()
+        cpu = time.process_time()
+        try:
+            yield
+        finally:
+            self.cpu[name] += time.process_time() - cpu
+            self.wall[name] += time.perf_counter() - wall
+
+    @contextmanager
+    def outer_phase(self, name: str, *inners: str) -> Iterator[None]:
+        """ Accounts the time spent within the block to the given phase, but the time of the inner phases. """
+        wall = {inner: self.wall[inner] for inner in inners}
+        cpu = {inner: self.cpu[inner] for inner in inners}
+        with self.phase(name):
+            yield
+        for inner in inners:
+            self.wall[name] -= self.wall[inner] - wall[inner]
+            self.cpu[name] -= self.cpu[inner] - cpu[inner]
+
+    def meter_tokens(self, lexer: Any) -> Callable[[], Optional[LexToken]]:
+        """ Gets the token function of the given lexer, counting and timing the tokens. """
+        token = lexer.token
+
+        def tokenfunc() -> Optional[LexToken]:
+            with self.phase(LEX):
+                tok = token()
+            if tok is not None:
+                self.tokens += 1
+            return tok
+
+        return tokenfunc
+
+    def parse(self, parser: Parser, sourcecode: Any, tracer: Tracer = None, context: ParseContext = None) -> Scenario:
+        """ Parses the given source code, measuring the lexing and the parsing
+        (and the writing, if the context emits the output while parsing).
+        """
+        lexer = get_scanner(sourcecode)
+        counter = tracer if tracer is not None else ProductionCounter()
+        if context is None:
+            context = ParseContext()
+        with self.outer_phase(PARSE, LEX, WRITE):
+            scenario = parser.parse(sourcecode, lexer=lexer, tracer=counter, context=context,
+                                    tokenfunc=self.meter_tokens(lexer))
+        self.productions = counter.count if tracer is None else len(tracer.records)
+        self.symbols = dict(context.symbol_table.declared)
+        self.literals = context.symbol_table.literals
+        return scenario
+
+    def interpret(self, scenario: Scenario, interpreter: str, fp: TextIO, compact: bool = False) -> None:
+        """ Interprets the given scenario into the given file object, measuring the interpretation and the writing. """
+        with self.outer_phase(INTERPRET, WRITE):
+            Interpreter.interpret_to(scenario, interpreter, MeteredWriter(fp, self), compact)
+
+    def emit(self,
+             parser: Parser,
+             sourcecode: Any,
+             interpreter: str,
+             fp: TextIO,
+             tracer: Tracer = None,
+             compact: bool = False) -> None:
+        """ Parses the given source code and writes its interpretation into the given file object
+        while parsing, measuring the lexing, the parsing (the emission included) and the writing.
+        """
+        emitter = get_emitter(interpreter, MeteredWriter(fp, self), compact)
+        self.parse(parser, sourcecode, tracer, ParseContext(emitter))
+
+    def sample_memory(self) -> None:
+        """ Samples the peak memory (resident set size) of the process, in bytes, if supported. """
+        if resource is None:
+            return
+        peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+        # On Linux the peak is expressed in KiB, on macOS in bytes
+        self.peak_memory = peak if sys.platform == 'darwin' else peak * 1024
+
+    def to_dict(self) -> Dict[str, Any]:
+        """ Gets the metrics as a dictionary. """
+        return {
+            'phases': {phase: {'wall': self.wall[phase], 'cpu': self.cpu[phase]} for phase in PHASES},
+            'tokens': self.tokens,
+            'productions': self.productions,
+            'symbols': self.symbols,
+            'literals': self.literals,
+            'output_bytes': self.output_bytes,
+            'peak_memory': self.peak_memory,
+            'cached': self.cached,
+        }
+
+    def to_prometheus(self) -> str:
+        """ Gets the metrics in the Prometheus text exposition format. """
+        lines: List[str] = []
+
+        def metric(name: str, help: str, samples: List[Any]) -> None:
+            name = '{}_{}'.format(PROMETHEUS_PREFIX, name)
+            lines.append('# HELP {} {}'.format(name, help))
+            lines.append('# TYPE {} gauge'.format(name))
+            for labels, value in samples:
+                lines.append('{}{} {}'.format(name, labels, value))
+
+        metric('phase_wall_seconds', 'The wall time of each phase.',
+               [('{{phase="{}"}}'.format(phase), self.wall[phase]) for phase in PHASES])
+        metric('phase_cpu_seconds', 'The CPU time of each phase.',
+               [('{{phase="{}"}}'.format(phase), self.cpu[phase]) for phase in PHASES])
+        metric('tokens', 'The number of tokens.', [('', self.tokens)])
+        metric('productions', 'The number of reduced productions.', [('', self.productions)])
+        metric('symbols', 'The number of symbols of each scope.',
+               [('{{scope="{}"}}'.format(scope), count) for scope, count in sorted(self.symbols.items())])
+        metric('literals', 'The number of interned literals.', [('', self.literals)])
+        metric('output_bytes', 'The size of the output.', [('', self.output_bytes)])
+        metric('peak_memory_bytes', 'The peak resident set size.', [('', self.peak_memory)])
+        metric('cached', 'Whether the output comes from the build cache.', [('', int(self.cached))])
+        return '\n'.join(lines) + '\n'
+
+    def dump(self, path: str) -> None:
+        """ Writes the metrics into the given file, as Prometheus textfile if the extension is '.prom', as JSON otherwise. """
+        with open(path, 'w') as filemetrics:
+            if path.endswith(PROMETHEUS_EXTENSION):
+                filemetrics.write(self.to_prometheus())
+            else:
+                json.dump(self.to_dict(), filemetrics, indent=4)
+                filemetrics.write('\n')
+
+    def __str__(self):
+        return basestr(self)
+
+    def __repr__(self):
+        return baserepr(self)
@@ -22,6 +22,10 @@ from util.utils import baserepr, basestr
 logger = logging.getLogger(__name__)
 
 
+# The command selecting the compile daemon, instead of the options
+SERVE_COMMAND = 'serve'
+
+
 @unique
 class Option(Enum):
     """ The command line options. """
@@ -29,16 +33,30 @@ class Option(Enum):
     INTERPRETER = 'i'
     OUTPUT = 'o'
     FORCE = 'f'
+    JOBS = 'j'
+    NO_CACHE = 'n'
+    CACHE_DIR = 'c'
+    MMAP = 'm'
+    TRACE = 't'
+    METRICS = 'e'
+    CPROFILE = 'p'
+    COMPACT = 'k'
+    STREAM = 'r'
+    WATCH = 'w'
+    CHECK = 'v'
+    MAX_ERRORS = 'x'
+    EMIT_AST = 'a'
+    FROM_AST = 'l'
 
     @DynamicClassAttribute
     def short(self) -> str:
         """ The short code. """
-        return '-{}'.format(self.name.lower())
+        return '-{}'.format(self.name.lower().replace('_', '-'))
 
     @DynamicClassAttribute
     def long(self) -> str:
         """ The long code. """
-        return '--{}'.format(self.name.lower())
+        return '--{}'.format(self.name.lower().replace('_', '-'))
 
     @DynamicClassAttribute
     def metavar(self) -> str:
@@ -63,11 +81,44 @@ class Argument(object):
                  source: str = None,
                  interpreter: str = None,
                  output: str = None,
-                 force: str = None) -> None:
+                 force: str = None,
+                 jobs: int = None,
+                 sources: List[str] = None,
+                 no_cache: bool = False,
+                 cache_dir: str = None,
+                 mmap: bool = False,
+                 trace: str = None,
+                 metrics: str = None,
+                 cprofile: str = None,
+                 compact: bool = False,
+                 stream: bool = False,
+                 watch: bool = False,
+                 check: bool = False,
+                 max_errors: int = None,
+                 emit_ast: bool = False,
+                 from_ast: bool = False,
+                 interpreters: List[str] = None) -> None:
         self.source: str = source
         self.interpreter: str = interpreter
         self.output: str = output
         self.force: str = force
+        self.jobs: int = jobs
+        self.sources: List[str] = sources if sources is not None else [source]
+        self.no_cache: bool = no_cache
+        self.cache_dir: str = cache_dir
+        self.mmap: bool = mmap
+        self.trace: str = trace
+        self.metrics: str = metrics
+        self.cprofile: str = cprofile
+        self.compact: bool = compact
+        self.stream: bool = stream
+        self.watch: bool = watch
+        self.check: bool = check
+        self.max_errors: int = max_errors
+        self.emit_ast: bool = emit_ast
+        self.from_ast: bool = from_ast
+        # The interpreters, the first one is the interpreter
+        self.interpreters: List[str] = interpreters if interpreters is not None else [interpreter]
 
     def __str__(self):
         return basestr(self)
@@ -79,59 +130,240 @@ class Argument(object):
 def get_command_line_arguments(args: List[str]) -> Argument:
     """ Parses and returns the command line arguments. """
 
-    epilog = 'Usage: python pyadele.py {} {} {} {} [{} {}] [{}]'.format(
+    epilog = 'Usage: python pyadele.py {} {} {} {} [{} {}] [{}] [{} {}] [{}] [{} {}] [{}] [{} {}] [{} {}] [{} {}] [{}] [{}] [{}] [{}] [{} {}] [{}] [{}]'.format(
         Option.SOURCE.short,
-        'paht/to/source',
+        'path/to/source [...]',
         Option.INTERPRETER.short,
         'interpreter',
         Option.OUTPUT.short,
         'path/to/output',
-        Option.FORCE.short)
+        Option.FORCE.short,
+        Option.JOBS.short,
+        'jobs',
+        Option.NO_CACHE.long,
+        Option.CACHE_DIR.long,
+        'path/to/cache',
+        Option.MMAP.long,
+        Option.TRACE.long,
+        'path/to/trace',
+        Option.METRICS.long,
+        'path/to/metrics',
+        Option.CPROFILE.long,
+        'path/to/profile',
+        Option.COMPACT.long,
+        Option.STREAM.long,
+        Option.WATCH.long,
+        Option.CHECK.long,
+        Option.MAX_ERRORS.long,
+        'errors',
+        Option.EMIT_AST.long,
+        Option.FROM_AST.long)
     argparser = ArgumentParser(epilog=epilog)
     argparser.add_argument(Option.SOURCE.short,
                            Option.SOURCE.long,
                            metavar=Option.SOURCE.metavar,
-                           default='',
-                           help="The path to the source file to be processed. It is Mandatory.")
+                           nargs='+',
+                           default=[],
+                           help="The path to the source file to be processed. It is Mandatory. "
+                                "Multiple files, glob patterns or directories enable the batch mode.")
     argparser.add_argument(Option.INTERPRETER.short,
                            Option.INTERPRETER.long,
                            metavar=Option.INTERPRETER.metavar,
                            default='',
-                           help="The interpreter of the parsing engine. It is Mandatory.")
+                           help="The interpreter of the parsing engine. It is Mandatory, but in check mode "
+                                "and when emitting the syntax tree. Several interpreters, separated by commas, "
+                                "get an output file each from a single parse (named after the output file, "
+                                "by interpreter).")
     argparser.add_argument(Option.OUTPUT.short,
                            Option.OUTPUT.long,
                            metavar=Option.OUTPUT.metavar,
                            default='',
-                           help="[Optional] The path to the output file.")
+                           help="[Optional] The path to the output file (the output directory in batch mode). "
+                                "The output is compressed if the path ends with '.gz' or '.xz'.")
     argparser.add_argument(Option.FORCE.short,
                            Option.FORCE.long,
                            action='store_true',
                            default=False,
                            dest=Option.FORCE.option,
                            help="[Optional] Forces the overwrite of the output file.")
+    argparser.add_argument(Option.JOBS.short,
+                           Option.JOBS.long,
+                           metavar=Option.JOBS.metavar,
+                           type=int,
+                           default=None,
+                           help="[Optional] The number of worker processes in batch mode "
+                                "(default: the number of CPUs).")
+    argparser.add_argument(Option.NO_CACHE.long,
+                           action='store_true',
+                           default=False,
+                           dest=Option.NO_CACHE.option,
+                           help="[Optional] Disables the build cache, always compiles the sources.")
+    argparser.add_argument(Option.CACHE_DIR.long,
+                           metavar=Option.CACHE_DIR.metavar,
+                           default=None,
+                           dest=Option.CACHE_DIR.option,
+                           help="[Optional] The path to the cache directory.")
+    argparser.add_argument(Option.MMAP.long,
+                           action='store_true',
+                           default=False,
+                           dest=Option.MMAP.option,
+                           help="[Optional] Memory-maps the source files instead of reading them, "
+                                "for very large sources (multi-byte characters are supported "
+                                "within strings and comments only).")
+    argparser.add_argument(Option.TRACE.long,
+                           metavar=Option.TRACE.metavar,
+                           default=None,
+                           dest=Option.TRACE.option,
+                           help="[Optional] Traces the productions reduced by the parser (line, "
+                                "production, elapsed seconds) into the given file. Bypasses the build cache.")
+    argparser.add_argument(Option.METRICS.long,
+                           metavar=Option.METRICS.metavar,
+                           default=None,
+                           dest=Option.METRICS.option,
+                           help="[Optional] Writes the metrics of the compilation (time per phase, counters, "
+                                "peak memory) into the given file, as Prometheus textfile if it ends with "
+                                "'.prom', as JSON otherwise.")
+    argparser.add_argument(Option.CPROFILE.long,
+                           metavar=Option.CPROFILE.metavar,
+                           default=None,
+                           dest=Option.CPROFILE.option,
+                           help="[Optional] Profiles the run and dumps the statistics into the given file "
+                                "(see the pstats module).")
+    argparser.add_argument(Option.COMPACT.long,
+                           action='store_true',
+                           default=False,
+                           dest=Option.COMPACT.option,
+                           help="[Optional] Uses the compact XML dialect (attributes for the scalars, "
+                                "no indentation, short tag names).")
+    argparser.add_argument(Option.STREAM.long,
+                           action='store_true',
+                           default=False,
+                           dest=Option.STREAM.option,
+                           help="[Optional] Writes the output while parsing (single pass), for huge sources: "
+                                "the memory does not grow with the source. Supported by 'json', 'ndjson' and "
+                                "by 'xml' in the compact dialect.")
+    argparser.add_argument(Option.WATCH.long,
+                           action='store_true',
+                           default=False,
+                           dest=Option.WATCH.option,
+                           help="[Optional] Watches the sources (files, glob patterns, directories) and "
+                                "recompiles them as their content changes, until interrupted. The outputs "
+                                "are placed as in batch mode and always overwritten.")
+    argparser.add_argument(Option.CHECK.long,
+                           action='store_true',
+                           default=False,
+                           dest=Option.CHECK.option,
+                           help="[Optional] Checks the sources without interpreting them: reports all the "
+                                "lexical, syntax and semantic errors of each source in a single pass. The "
+                                "output file, if any, gets the report as JSON.")
+    argparser.add_argument(Option.MAX_ERRORS.long,
+                           metavar=Option.MAX_ERRORS.metavar,
+                           type=int,
+                           default=None,
+                           dest=Option.MAX_ERRORS.option,
+                           help="[Optional] The maximum number of errors reported per source in check mode "
+                                "(default: 100).")
+    argparser.add_argument(Option.EMIT_AST.long,
+                           action='store_true',
+                           default=False,
+                           dest=Option.EMIT_AST.option,
+                           help="[Optional] Writes the syntax tree of the source (the scenario, the symbols and "
+                                "the literals) into the output file ('.adelet'), to be interpreted later "
+                                "without parsing the source again.")
+    argparser.add_argument(Option.FROM_AST.long,
+                           action='store_true',
+                           default=False,
+                           dest=Option.FROM_AST.option,
+                           help="[Optional] The source file is a syntax tree file ('.adelet'), it is "
+                                "interpreted without parsing. Bypasses the build cache.")
 
     # Parses the arguments
     arguments = argparser.parse_args(args).__dict__
 
     # The (path to the) source file is mandatory
-    source = arguments[Option.SOURCE.option]
-    if not source:
+    sources = arguments[Option.SOURCE.option]
+    if not sources:
         msg = "The (path to the) source file is missing"
         logger.critical(msg)
         argparser.error(msg)
 
-    # The interpreter is mandatory
+    # The check mode is not mandatory
+    check = arguments[Option.CHECK.option]
+
+    # The syntax tree options are not mandatory, but exclusive and for a single source
+    emit_ast = arguments[Option.EMIT_AST.option]
+    from_ast = arguments[Option.FROM_AST.option]
+    if emit_ast and from_ast:
+        msg = "The syntax tree cannot be both emitted and loaded"
+        logger.critical(msg)
+        argparser.error(msg)
+    if (emit_ast or from_ast) and (len(sources) > 1 or arguments[Option.JOBS.option] is not None or check or
+                                   arguments[Option.WATCH.option]):
+        msg = "The syntax tree is supported for a single source only, neither in check nor in watch mode"
+        logger.critical(msg)
+        argparser.error(msg)
+
+    # The interpreter is mandatory, but in check mode and when emitting the syntax tree
     interpreter = arguments[Option.INTERPRETER.option]
-    if not interpreter:
+    if not interpreter and not check and not emit_ast:
         msg = "The interpreter is missing ()"
         logger.critical(msg)
         argparser.error(msg)
 
+    # Several interpreters are separated by commas, for a single source
+    interpreters = list(dict.fromkeys(i.strip() for i in interpreter.split(',') if i.strip()))
+    if len(interpreters) > 1 and (len(sources) > 1 or arguments[Option.JOBS.option] is not None or check or
+                                  emit_ast or arguments[Option.WATCH.option]):
+        msg = "Several interpreters are supported for a single source only, neither in check nor in watch mode"
+        logger.critical(msg)
+        argparser.error(msg)
+    if interpreters:
+        interpreter = interpreters[0]
+
     # The (path to the) output file is not mandatory
     output = arguments[Option.OUTPUT.option]
 
     # The force overwrite flag is not mandatory
     force = arguments[Option.FORCE.option]
 
-    return Argument(source, interpreter, output, force)
+    # The number of jobs is not mandatory, but must be positive
+    jobs = arguments[Option.JOBS.option]
+    if jobs is not None and jobs < 1:
+        msg = "The number of jobs must be positive"
+        logger.critical(msg)
+        argparser.error(msg)
+
+    # The build cache options are not mandatory
+    no_cache = arguments[Option.NO_CACHE.option]
+    cache_dir = arguments[Option.CACHE_DIR.option]
+
+    # The memory-mapped input is not mandatory
+    mmap = arguments[Option.MMAP.option]
+
+    # The trace file is not mandatory
+    trace = arguments[Option.TRACE.option]
+
+    # The metrics and the profile files are not mandatory
+    metrics = arguments[Option.METRICS.option]
+    cprofile = arguments[Option.CPROFILE.option]
+
+    # The compact dialect is not mandatory
+    compact = arguments[Option.COMPACT.option]
+
+    # The single-pass mode is not mandatory
+    stream = arguments[Option.STREAM.option]
+
+    # The watch mode is not mandatory
+    watch = arguments[Option.WATCH.option]
+
+    # The maximum number of errors is not mandatory, but must be positive
+    max_errors = arguments[Option.MAX_ERRORS.option]
+    if max_errors is not None and max_errors < 1:
+        msg = "The maximum number of errors must be positive"
+        logger.critical(msg)
+        argparser.error(msg)
+
+    return Argument(sources[0], interpreter, output, force, jobs, sources, no_cache, cache_dir, mmap, trace,
+                    metrics, cprofile, compact, stream, watch, check, max_errors, emit_ast, from_ast,
+                    interpreters)
 
@@ -0,0 +1,479 @@
+# -*- coding: utf-8 -*-
+""" The compile daemon of Py-ADeLe.
+
+Serves the compilations over HTTP, either on localhost or on a Unix socket,
+so that the callers do not pay the start of the interpreter, the loading of
+the parser tables and the configuration of the logging for each scenario.
+The compilations run on a pool of worker processes, each of them loading the
+parser tables once, and share the build cache.
+
+The endpoints:
+
+    POST /compile   compiles a scenario, the request is a JSON object:
+                        source          the source code, or
+                        path            the path to the source file
+                        interpreter     the interpreter (mandatory)
+                        compact         [optional] the compact dialect
+                        stream          [optional] the single-pass mode
+                        output          [optional] the path to the output file
+                        force           [optional] overwrites the output file
+                    the response is the output, or a JSON object stating the
+                    output file if any (the header X-Pyadele-Cached tells the
+                    build cache hits)
+    GET /health     the liveness of the daemon, degraded (503) while the pool
+                    of the workers is recreated, e.g. after a worker died
+    GET /stats      the counters and the latencies of the compilations
+
+The paths to the source and output files are served only under the root
+directory given to the daemon (none by default), and the existing output
+files are overwritten only if forced, as in the command line. The compile
+requests must be JSON, addressed to the host the daemon listens on, and come
+from no web page (i.e. have no Origin header), so that the browsers cannot
+forge them.
+
+Author:
+    Francesco Racciatti
+
+Copyright 2018 Francesco Racciatti
+
+"""
+
+
+import os
+import json
+import time
+import signal
+import logging
+import tempfile
+import threading
+import socketserver
+from collections import deque
+from argparse import ArgumentParser
+from http.server import BaseHTTPRequestHandler, HTTPServer
+from concurrent.futures import Future, ProcessPoolExecutor, wait
+from concurrent.futures.process import BrokenProcessPool
+from typing import Any, Callable, Deque, Dict, List, Optional, Tuple
+
+from options import SERVE_COMMAND
+from cache import BuildCache
+from service import compile_file
+from model.interpreter import Interpreter
+from util.version import VERSION
+from util.utils import baserepr, basestr
+
+
+# Creates the logger
+logger = logging.getLogger(__name__)
+
+
+# The default address of the daemon
+HOST_DEFAULT = '127.0.0.1'
+PORT_DEFAULT = 8517
+
+# The maximum size of a request, in bytes
+REQUEST_SIZE_MAX = 64 * 2 ** 20
+
+# The number of the latest compilations the latencies are computed on
+LATENCY_WINDOW = 1024
+
+# The percentiles of the latencies
+PERCENTILES = (50, 90, 99)
+
+# The content types of the outputs, by interpreter
+CONTENT_TYPES = {
+    'xml': 'application/xml',
+    'json': 'application/json',
+    'ndjson': 'application/x-ndjson',
+    'adeleb': 'application/octet-stream',
+}
+
+
+class BadRequestError(Exception):
+    """ Exception raised when the request is malformed. """
+    pass
+
+
+class OutputExistsError(BadRequestError):
+    """ Exception raised when the output file of the request exists and the overwrite is not forced. """
+    pass
+
+
+class Stats(object):
+    """ Collects the counters and the latencies of the compilations, thread-safe. """
+
+    def __init__(self, workers: int) -> None:
+        self.lock: threading.Lock = threading.Lock()
+        self.started: float = time.time()
+        self.workers: int = workers
+        self.requests: int = 0
+        self.compiled: int = 0
+        self.cached: int = 0
+        self.failed: int = 0
+        # The times the pool of the workers was recreated
+        self.restarts: int = 0
+        # The latencies of the latest compilations, in seconds
+        self.latencies: Deque[float] = deque(maxlen=LATENCY_WINDOW)
+
+    def record(self, elapsed: float, cached: bool = False, failed: bool = False) -> None:
+        """ Records a compilation. """
+        with self.lock:
+            self.requests += 1
+            if failed:
+                self.failed += 1
+            elif cached:
+                self.cached += 1
+            else:
+                self.compiled += 1
+            self.latencies.append(elapsed)
+
+    def to_dict(self) -> Dict[str, Any]:
+        """ Gets the statistics as a dictionary, the latencies in milliseconds. """
+        with self.lock:
+            latencies = sorted(self.latencies)
+            stats: Dict[str, Any] = {
+                'version': VERSION,
+                'uptime': time.time() - self.started,
+                'workers': self.workers,
+                'requests': self.requests,
+                'compiled': self.compiled,
+                'cached': self.cached,
+                'failed': self.failed,
+                'restarts': self.restarts,
+            }
+        latency: Dict[str, Any] = {'window': len(latencies)}
+        if latencies:
+            latency['mean'] = sum(latencies) / len(latencies) * 1000
+            latency['max'] = latencies[-1] * 1000
+            for percentile in PERCENTILES:
+                index = min(len(latencies) - 1, len(latencies) * percentile // 100)
+                latency['p{}'.format(percentile)] = latencies[index] * 1000
+        stats['latency'] = latency
+        return stats
+
+    def __str__(self):
+        return basestr(self)
+
+    def __repr__(self):
+        return baserepr(self)
+
+
+def confine(path: str, root: str) -> str:
+    """ Resolves the given path, relative to the given root directory, and checks that it lies under the root. """
+    root = os.path.realpath(root)
+    resolved = os.path.realpath(os.path.join(root, path))
+    if os.path.commonpath([root, resolved]) != root:
+        raise BadRequestError("The path '{}' is outside the root directory".format(path))
+    return resolved
+
+
+def parse_request(body: bytes, root: str = None) -> Dict[str, Any]:
+    """ Parses and validates the given body of a compile request, the paths to the source
+    and output files are resolved under the given root directory, refused if None.
+    """
+    try:
+        request = json.loads(body.decode('utf-8'))
+    except ValueError as e:
+        raise BadRequestError("The request is not a JSON object: {}".format(e))
+    if not isinstance(request, dict):
+        raise BadRequestError("The request is not a JSON object")
+    if ('source' in request) == ('path' in request):
+        raise BadRequestError("Either the source or the path is mandatory")
+    if 'source' in request and not isinstance(request['source'], str):
+        raise BadRequestError("The source is not a string")
+    for field in ('path', 'output'):
+        if request.get(field) is None:
+            continue
+        if root is None:
+            raise BadRequestError("The {} is not allowed, the daemon serves no root directory".format(field))
+        if not isinstance(request[field], str):
+            raise BadRequestError("The {} is not a string".format(field))
+        request[field] = confine(request[field], root)
+    if 'path' in request and not os.path.isfile(request['path']):
+        raise BadRequestError("The path '{}' does not refer a file".format(request['path']))
+    if request.get('output') is not None and os.path.exists(request['output']):
+        if not os.path.isfile(request['output']):
+            raise BadRequestError("The (output) path '{}' does not refer a file".format(request['output']))
+        if not request.get('force'):
+            raise OutputExistsError("The output file '{}' already exists".format(request['output']))
+    interpreter = request.get('interpreter')
+    if not isinstance(interpreter, str) or not Interpreter.exist(interpreter):
+        raise BadRequestError("Cannot recognize the interpreter '{}'".format(interpreter))
+    return request
+
+
+def compile_request(request: Dict[str, Any], cache: BuildCache = None) -> Tuple[Optional[bytes], bool]:
+    """ Compiles the given request (in a worker process), by using the given build cache (if any).
+    Returns the output, None if written into the requested output file, and True if the output
+    comes from the cache.
+    """
+    interpreter = request['interpreter'].lower()
+    with tempfile.TemporaryDirectory() as directory:
+        source = request.get('path')
+        if source is None:
+            source = os.path.join(directory, 'source.adele')
+            with open(source, 'w') as filesource:
+                filesource.write(request['source'])
+        output = request.get('output') or os.path.join(directory, 'output.' + interpreter)
+        cached = compile_file(source, output, interpreter, cache, compact=bool(request.get('compact')),
+                              stream=bool(request.get('stream')))
+        if request.get('output'):
+            return None, cached
+        with open(output, 'rb') as fileoutput:
+            return fileoutput.read(), cached
+
+
+def warm_worker() -> None:
+    """ Prepares a worker process, by loading the parser tables ahead of the first request. """
+    from grammar import parser
+    parser.engine
+
+
+class WorkerPool(object):
+    """ The pool of the worker processes, recreated when broken (e.g. a worker killed by the OOM killer).
+
+    The pool is degraded from the breakage until the workers of the new pool are warm.
+    """
+
+    def __init__(self, workers: int, stats: Stats) -> None:
+        self.workers: int = workers
+        self.stats: Stats = stats
+        self.lock: threading.Lock = threading.Lock()
+        self.degraded: bool = False
+        self.executor: ProcessPoolExecutor = self.start()[0]
+
+    def start(self) -> Tuple[ProcessPoolExecutor, List[Future]]:
+        """ Starts a pool, returns it with the tasks warming its workers. """
+        executor = ProcessPoolExecutor(max_workers=self.workers)
+        # The tasks spread over the workers, as they are started
+        return executor, [executor.submit(warm_worker) for _ in range(self.workers)]
+
+    def run(self, function: Callable[..., Any], *args: Any) -> Any:
+        """ Runs the given function on a worker and returns its result. Recreates the pool
+        and raises BrokenProcessPool if the pool is broken.
+        """
+        executor = self.executor
+        try:
+            return executor.submit(function, *args).result()
+        except BrokenProcessPool:
+            self.restart(executor)
+            raise
+
+    def restart(self, broken: ProcessPoolExecutor) -> None:
+        """ Replaces the given broken pool, unless replaced already. """
+        with self.lock:
+            if self.executor is not broken:
+                return
+            logger.warning("A worker died, recreating the pool of the workers")
+            self.degraded = True
+            # The broken pool terminated its workers already, shutting it down may block on
+            # the queues the dead worker left locked
+            self.executor, warming = self.start()
+            with self.stats.lock:
+                self.stats.restarts += 1
+        threading.Thread(target=self.recover, args=(warming,), daemon=True).start()
+
+    def recover(self, warming: List[Future]) -> None:
+        """ Waits for the workers of the new pool to be warm. """
+        wait(warming)
+        self.degraded = False
+
+    def shutdown(self) -> None:
+        """ Stops the workers. """
+        self.executor.shutdown()
+
+
+class RequestHandler(BaseHTTPRequestHandler):
+    """ Handles the requests to the daemon. """
+
+    server_version = 'pyadele/' + VERSION
+    protocol_version = 'HTTP/1.1'
+
+    def do_GET(self) -> None:
+        if self.path == '/health':
+            degraded = self.server.pool.degraded
+            self.send_json(503 if degraded else 200, {'status': 'degraded' if degraded else 'ok', 'pid': os.getpid(),
+                                                      'version': VERSION})
+        elif self.path == '/stats':
+            self.send_json(200, self.server.stats.to_dict())
+        else:
+            self.send_json(404, {'error': "Unknown endpoint '{}'".format(self.path)})
+
+    def do_POST(self) -> None:
+        if self.path != '/compile':
+            self.send_json(404, {'error': "Unknown endpoint '{}'".format(self.path)})
+            return
+        # The body of the rejected requests is not read, the connection cannot be reused
+        error = self.check_headers()
+        if error is not None:
+            self.close_connection = True
+            self.send_json(error[0], {'error': error[1]})
+            return
+        try:
+            length = int(self.headers.get('Content-Length') or 0)
+        except ValueError:
+            length = -1
+        if length < 0:
+            self.close_connection = True
+            self.send_json(400, {'error': "Invalid Content-Length '{}'".format(self.headers.get('Content-Length'))})
+            return
+        if length > REQUEST_SIZE_MAX:
+            self.close_connection = True
+            self.send_json(413, {'error': "The request exceeds {} bytes".format(REQUEST_SIZE_MAX)})
+            return
+        begin = time.perf_counter()
+        try:
+            request = parse_request(self.rfile.read(length), self.server.root)
+        except OutputExistsError as e:
+            self.send_json(409, {'error': str(e)})
+            return
+        except BadRequestError as e:
+            self.send_json(400, {'error': str(e)})
+            return
+        try:
+            output, cached = self.server.pool.run(compile_request, request, self.server.cache)
+        except BrokenProcessPool:
+            self.server.stats.record(time.perf_counter() - begin, failed=True)
+            self.send_json(503, {'error': "A worker died, the pool of the workers is being recreated"})
+            return
+        except Exception as e:
+            self.server.stats.record(time.perf_counter() - begin, failed=True)
+            logger.debug("Cannot compile the request", exc_info=True)
+            self.send_json(422, {'error': '{}: {}'.format(type(e).__name__, e)})
+            return
+        elapsed = time.perf_counter() - begin
+        self.server.stats.record(elapsed, cached=cached)
+        headers = {'X-Pyadele-Cached': str(cached).lower(), 'X-Pyadele-Elapsed': '{:.6f}'.format(elapsed)}
+        if output is None:
+            self.send_json(200, {'output': request['output'], 'cached': cached}, headers)
+        else:
+            self.send_body(200, output, CONTENT_TYPES[request['interpreter'].lower()], headers)
+
+    def check_headers(self) -> Optional[Tuple[int, str]]:
+        """ Checks the headers of a compile request, returns the status and the error if rejected. """
+        if (self.headers.get('Host') or '').lower() not in self.server.hosts:
+            return 403, "Unexpected host '{}'".format(self.headers.get('Host'))
+        if self.headers.get('Origin') is not None:
+            return 403, "Cross-origin requests are not allowed"
+        if self.headers.get_content_type() != 'application/json':
+            return 415, "The request must be 'application/json'"
+        return None
+
+    def send_json(self, status: int, content: Dict[str, Any], headers: Dict[str, str] = None) -> None:
+        """ Sends the given JSON content. """
+        self.send_body(status, (json.dumps(content) + '\n').encode('utf-8'), 'application/json', headers)
+
+    def send_body(self, status: int, body: bytes, content_type: str, headers: Dict[str, str] = None) -> None:
+        """ Sends the given body. """
+        self.send_response(status)
+        self.send_header('Content-Type', content_type)
+        self.send_header('Content-Length', str(len(body)))
+        for name, value in (headers or {}).items():
+            self.send_header(name, value)
+        self.end_headers()
+        self.wfile.write(body)
+
+    def address_string(self) -> str:
+        # The clients of the Unix sockets have no address
+        return self.client_address[0] if isinstance(self.client_address, tuple) else 'unix'
+
+    def log_message(self, format: str, *args: Any) -> None:
+        logger.debug('{} - {}'.format(self.address_string(), format % args))
+
+
+class UnixHTTPServer(socketserver.ThreadingMixIn, socketserver.UnixStreamServer):
+    """ The HTTP server listening on a Unix socket. """
+    daemon_threads = True
+
+
+class ThreadedHTTPServer(socketserver.ThreadingMixIn, HTTPServer):
+    """ The HTTP server listening on a TCP port (as http.server.ThreadingHTTPServer, Python 3.7). """
+    daemon_threads = True
+
+
+class Daemon(object):
+    """ The compile daemon, listening either on a Unix socket or on the given host and port. """
+
+    def __init__(self,
+                 host: str = HOST_DEFAULT,
+                 port: int = PORT_DEFAULT,
+                 socket_path: str = None,
+                 jobs: int = None,
+                 cache_dir: str = None,
+                 no_cache: bool = False,
+                 root: str = None) -> None:
+        if socket_path is not None:
+            if os.path.exists(socket_path):
+                os.remove(socket_path)
+            self.server: Any = UnixHTTPServer(socket_path, RequestHandler)
+            # The clients of the Unix sockets name no host
+            self.server.hosts = {'localhost'}
+        else:
+            self.server = ThreadedHTTPServer((host, port), RequestHandler)
+            port = self.server.server_address[1]
+            self.server.hosts = {'{}:{}'.format(name, port) for name in (host.lower(), 'localhost', '127.0.0.1')}
+        self.socket_path: str = socket_path
+        # The source and output files are served under the root directory only
+        self.server.root = root
+        workers = jobs or os.cpu_count()
+        self.server.stats = Stats(workers)
+        self.server.pool = WorkerPool(workers, self.server.stats)
+        # The workers share the build cache
+        self.server.cache = None if no_cache else BuildCache(cache_dir)
+
+    @property
+    def address(self) -> Any:
+        """ The address the daemon listens on. """
+        return self.socket_path if self.socket_path is not None else self.server.server_address
+
+    def serve(self) -> None:
+        """ Serves the requests until shut down. """
+        try:
+            self.server.serve_forever()
+        finally:
+            self.close()
+
+    def shutdown(self) -> None:
+        """ Stops serving the requests (from another thread). """
+        self.server.shutdown()
+
+    def close(self) -> None:
+        """ Releases the socket and the workers. """
+        self.server.server_close()
+        self.server.pool.shutdown()
+        if self.socket_path is not None and os.path.exists(self.socket_path):
+            os.remove(self.socket_path)
+
+
+def get_serve_arguments(args: List[str]) -> Any:
+    """ Parses and returns the command line arguments of the daemon. """
+    argparser = ArgumentParser(prog='pyadele.py {}'.format(SERVE_COMMAND),
+                               description="Serves the compilations over HTTP, on localhost or on a Unix socket.")
+    argparser.add_argument('--host', default=HOST_DEFAULT, help="The host to listen on (default: %(default)s).")
+    argparser.add_argument('--port', type=int, default=PORT_DEFAULT, help="The port to listen on (default: %(default)s).")
+    argparser.add_argument('--socket', default=None, help="The path to the Unix socket to listen on, instead of the port.")
+    argparser.add_argument('-j', '--jobs', type=int, default=None,
+                           help="The number of worker processes (default: the number of CPUs).")
+    argparser.add_argument('--no-cache', action='store_true', default=False, help="Disables the build cache.")
+    argparser.add_argument('--cache-dir', default=None, help="The path to the cache directory.")
+    argparser.add_argument('--root', default=None,
+                           help="The directory the source and output files of the requests must lie under "
+                                "(default: none, the requests carry the sources and get the outputs).")
+    arguments = argparser.parse_args(args)
+    if arguments.jobs is not None and arguments.jobs < 1:
+        argparser.error("The number of jobs must be positive")
+    return arguments
+
+
+def serve(args: List[str]) -> None:
+    """ Runs the daemon with the given command line arguments, until terminated. """
+    arguments = get_serve_arguments(args)
+    daemon = Daemon(arguments.host, arguments.port, arguments.socket, arguments.jobs, arguments.cache_dir,
+                    arguments.no_cache, arguments.root)
+    # Shuts down gracefully on termination, serving the pending requests
+    signal.signal(signal.SIGTERM, lambda signum, frame: threading.Thread(target=daemon.shutdown).start())
+    logger.info("Serving on {} with {} worker(s)".format(daemon.address, daemon.server.stats.workers))
+    try:
+        daemon.serve()
+    except KeyboardInterrupt:
+        pass
+    logger.info("Stopped serving")
@@ -9,19 +9,40 @@ Copyright 2018 Francesco Racciatti
 """
 
 
+import io
 import os
 import sys
+import gzip
+import lzma
 import logging
-from typing import Tuple
+from contextlib import contextmanager, ExitStack
+from typing import Tuple, Iterator, Any, List
+from concurrent.futures import ThreadPoolExecutor
 
 from options import Argument
-from model.interpreter import Interpreter
+from cache import BuildCache
+from grammar import parser, ParseContext
+from mapped import open_mapped
+from tracing import Tracer
+from metrics import READ, INTERPRET, Metrics
+from lexer import fingerprint
+from model.oom import Scenario
+from model.interpreter import Interpreter, write_chunks
+from model.emitter import TeeEmitter, get_emitter, can_emit
+from model.syntaxtree import SyntaxTree, TREE_EXTENSION, generate_tree
 
 
 # Creates the logger
 logger = logging.getLogger(__name__)
 
 
+# The streaming compressors of the outputs, by extension (gzip does not store the time, for reproducible outputs)
+COMPRESSORS = {
+    '.gz': lambda path: gzip.GzipFile(path, 'wb', mtime=0),
+    '.xz': lambda path: lzma.LZMAFile(path, 'wb'),
+}
+
+
 class SourceFileNotFoundError(Exception):
     """ Exception raised when cannot find the source file. """
     pass
@@ -37,6 +58,11 @@ class UnrecognizedInterpreterError(Exception):
     pass
 
 
+class UnstreamableInterpreterError(Exception):
+    """ Exception raised when the interpreter cannot be streamed. """
+    pass
+
+
 class Choose(object):
     """ Wraps the choose (yes/no). """
     YES: str = 'yes'
@@ -53,20 +79,52 @@ def validate_argument(argument: Argument) -> Tuple[str, str]:
     if not os.path.isfile(argument.source):
         raise NotAFileError("The (source) path '{}' does not refer a file".format(argument.source))
 
-    # Checks if the parser supports the current interpreter
-    if not Interpreter.exist(argument.interpreter):
+    # Checks if the parser supports the current interpreter (the syntax trees need none)
+    if not argument.emit_ast and not Interpreter.exist(argument.interpreter):
         raise UnrecognizedInterpreterError("Cannot recognize the interpreter '{}'".format(argument.interpreter))
 
     # Checks if the output file already exists and if it can be overwritten
     if argument.output is None or not argument.output:
-        argument.output = '{}.{}'.format(
+        argument.output = '{}{}'.format(
             os.path.splitext(argument.source)[0],
-            argument.interpreter.lower())
+            TREE_EXTENSION if argument.emit_ast else '.' + argument.interpreter.lower())
         logger.info("The (path to the) output file is missing, using default: '{}'".format(argument.output))
-    if os.path.exists(argument.output):
-        if os.path.isfile(argument.output):
-            if argument.force is False:
-                logger.info("The output file '{}' already exists, overwrite?".format(argument.output))
+    validate_output(argument.output, argument.force)
+
+    return [argument.source, argument.output, argument.interpreter]
+
+
+def validate_targets(argument: Argument) -> Tuple[str, List[Tuple[str, str]]]:
+    """ Validates the given arguments having several interpreters, returns the path to
+    the source file and the targets, i.e. each interpreter with its output file.
+    """
+    # Checks if the source file exists
+    if not os.path.exists(argument.source):
+        raise SourceFileNotFoundError("Source file '{}' not found".format(argument.source))
+    if not os.path.isfile(argument.source):
+        raise NotAFileError("The (source) path '{}' does not refer a file".format(argument.source))
+
+    # Checks if the parser supports the interpreters
+    for interpreter in argument.interpreters:
+        if not Interpreter.exist(interpreter):
+            raise UnrecognizedInterpreterError("Cannot recognize the interpreter '{}'".format(interpreter))
+
+    # Checks if the output files already exist and if they can be overwritten
+    targets = plan_targets(argument.source, argument.interpreters, argument.output)
+    for _, output in targets:
+        validate_output(output, argument.force)
+
+    return argument.source, targets
+
+
+def validate_output(output: str, force: bool) -> None:
+    """ Checks if the given output file can be written, asks to overwrite it if it exists
+    and the overwrite is not forced.
+    """
+    if os.path.exists(output):
+        if os.path.isfile(output):
+            if force is False:
+                logger.info("The output file '{}' already exists, overwrite?".format(output))
                 overwrite = str()
                 input_msg = '[{}/{}]'.format(Choose.YES, Choose.NO)
                 while overwrite.lower() not in (Choose.YES.lower(), Choose.NO.lower()):
@@ -75,11 +133,324 @@ def validate_argument(argument: Argument) -> Tuple[str, str]:
                 if overwrite.lower() == Choose.NO.lower():
                     logger.info("Cannot overwrite the output file, will not proceed.")
                     sys.exit(0)
-                logger.info("The file '{}' will be overwritten".format(argument.output))
+                logger.info("The file '{}' will be overwritten".format(output))
             else:
-                logger.info("The file '{}' will be overwritten (force overwrite)".format(argument.output))
+                logger.info("The file '{}' will be overwritten (force overwrite)".format(output))
         else:
-            raise NotAFileError("The (output) path '{}' does not refer a file".format(argument.output))
+            raise NotAFileError("The (output) path '{}' does not refer a file".format(output))
 
-    return [argument.source, argument.output, argument.interpreter]
 
+def plan_targets(source: str, interpreters: List[str], output: str = None) -> List[Tuple[str, str]]:
+    """ Pairs each interpreter with its output file, named after the given output file
+    (if any, its compression is kept) or after the source file, by the interpreter.
+    """
+    compression = ''
+    if output:
+        base, extension = os.path.splitext(output)
+        if extension.lower() in COMPRESSORS:
+            compression = extension
+            base = os.path.splitext(base)[0]
+    else:
+        base = os.path.splitext(source)[0]
+    return [(interpreter, '{}.{}{}'.format(base, interpreter.lower(), compression)) for interpreter in interpreters]
+
+
+def output_options(output: str, compact: bool = False) -> Tuple[str, ...]:
+    """ Gets the options shaping the given output, besides the interpreter. """
+    compression = os.path.splitext(output)[1].lower()
+    return ('compact' if compact else '', compression if compression in COMPRESSORS else '')
+
+
+@contextmanager
+def open_output(output: str, binary: bool = False) -> Iterator[Any]:
+    """ Opens the given output file for writing, through a streaming compressor
+    if its extension is '.gz' or '.xz'.
+    """
+    compressor = COMPRESSORS.get(os.path.splitext(output)[1].lower())
+    if compressor is None:
+        with open(output, 'wb' if binary else 'w') as fileoutput:
+            yield fileoutput
+    elif binary:
+        with compressor(output) as fileoutput:
+            yield fileoutput
+    else:
+        with io.TextIOWrapper(compressor(output), encoding='utf-8') as fileoutput:
+            yield fileoutput
+
+
+@contextmanager
+def open_source(source: str, mapped: bool = False) -> Iterator[Any]:
+    """ Opens the given source file, either read as text or memory-mapped. """
+    if mapped:
+        with open_mapped(source) as sourcecode:
+            yield sourcecode
+    else:
+        with open(source, 'r') as filesource:
+            yield filesource.read()
+
+
+@contextmanager
+def unmeasured(phase: str) -> Iterator[None]:
+    """ Measures nothing, in place of the phases of the missing metrics (contextlib.nullcontext needs Python 3.7). """
+    yield
+
+
+def compile_file(source: str,
+                 output: str,
+                 interpreter: str,
+                 cache: BuildCache = None,
+                 mapped: bool = False,
+                 tracer: Tracer = None,
+                 metrics: Metrics = None,
+                 compact: bool = False,
+                 stream: bool = False,
+                 from_ast: bool = False) -> bool:
+    """ Compiles the given source file into the given output file, by using
+    the given build cache (if any). Returns True if the output comes from the cache.
+    The reductions of the parser are reported to the given tracer (if any), the
+    phases of the compilation are measured into the given metrics (if any).
+    The output is compressed if its extension is '.gz' or '.xz'. If stream, the
+    output is written while parsing (single pass), it is the same anyway.
+    If from_ast, the source file is a syntax tree file, interpreted as is.
+    """
+    if from_ast:
+        interpret_ast(source, output, interpreter, metrics, compact)
+        return False
+    if stream and not can_emit(interpreter, compact):
+        raise UnstreamableInterpreterError("The interpreter '{}' cannot be streamed{}".format(
+            interpreter, ", but in the compact dialect" if interpreter.lower() == Interpreter.Type.XML.value else ""))
+    measure = metrics.phase if metrics is not None else unmeasured
+    with ExitStack() as stack:
+        with measure(READ):
+            sourcecode = stack.enter_context(open_source(source, mapped))
+
+        # Short-circuits to the cached output, if any
+        if cache is not None:
+            key = cache.key(sourcecode, interpreter, *output_options(output, compact))
+            if cache.fetch(key, output):
+                if metrics is not None:
+                    metrics.cached = True
+                    metrics.output_bytes = os.path.getsize(output)
+                return True
+
+        # Parses the source file and writes the output file at once
+        if stream:
+            logger.info("Parsing and interpreting ...")
+            emit_file(sourcecode, output, interpreter, tracer, metrics, compact)
+            logger.info("Done")
+            if metrics is not None:
+                metrics.output_bytes = os.path.getsize(output)
+            if cache is not None:
+                cache.store(key, output)
+            return False
+
+        # Parses the source file and builds the attack scenario
+        logger.info("Parsing ...")
+        if metrics is None:
+            scenario = parser.parse(sourcecode, tracer=tracer)
+        else:
+            scenario = metrics.parse(parser, sourcecode, tracer)
+        logger.info("Done")
+
+    # Interprets the attack scenario and writes the output file incrementally
+    logger.info("Interpreting ...")
+    interpret_file(scenario, output, interpreter, metrics, compact)
+    logger.info("Done")
+    if metrics is not None:
+        metrics.output_bytes = os.path.getsize(output)
+
+    if cache is not None:
+        cache.store(key, output)
+    return False
+
+
+def interpret_file(scenario: Scenario,
+                   output: str,
+                   interpreter: str,
+                   metrics: Metrics = None,
+                   compact: bool = False) -> None:
+    """ Interprets the given scenario and writes it into the given output file
+    incrementally. The output file is removed if the interpretation fails.
+    """
+    try:
+        with open_output(output, Interpreter.is_binary(interpreter)) as fileoutput:
+            if metrics is None:
+                Interpreter.interpret_to(scenario, interpreter, fileoutput, compact)
+            else:
+                metrics.interpret(scenario, interpreter, fileoutput, compact)
+    except BaseException:
+        if os.path.exists(output):
+            os.remove(output)
+        raise
+
+
+def emit_file(sourcecode: Any,
+              output: str,
+              interpreter: str,
+              tracer: Tracer = None,
+              metrics: Metrics = None,
+              compact: bool = False) -> None:
+    """ Parses the given source code and writes the interpretation into the given output
+    file while parsing, through the emitter of the given interpreter. The output file is
+    removed if the parse fails.
+    """
+    try:
+        with open_output(output) as fileoutput:
+            if metrics is None:
+                parser.parse(sourcecode, tracer=tracer, context=ParseContext(get_emitter(interpreter, fileoutput, compact)))
+            else:
+                metrics.emit(parser, sourcecode, interpreter, fileoutput, tracer, compact)
+    except BaseException:
+        if os.path.exists(output):
+            os.remove(output)
+        raise
+
+
+def compile_targets(source: str,
+                    targets: List[Tuple[str, str]],
+                    cache: BuildCache = None,
+                    mapped: bool = False,
+                    tracer: Tracer = None,
+                    metrics: Metrics = None,
+                    compact: bool = False,
+                    stream: bool = False,
+                    from_ast: bool = False) -> List[bool]:
+    """ Compiles the given source file into an output file per target (an interpreter and
+    its output file) from a single parse, see compile_file. The interpreters run concurrently,
+    on a thread pool sharing the attack scenario, or, if stream, side by side while parsing.
+    Returns, for each target, True if the output comes from the cache.
+    """
+    # The syntax trees are never parsed, hence never streamed
+    stream = stream and not from_ast
+    for interpreter, _ in targets:
+        if stream and not can_emit(interpreter, compact):
+            raise UnstreamableInterpreterError("The interpreter '{}' cannot be streamed".format(interpreter))
+    measure = metrics.phase if metrics is not None else unmeasured
+    cached = [False] * len(targets)
+    keys: List[str] = [None] * len(targets)
+    with ExitStack() as stack:
+        with measure(READ):
+            if from_ast:
+                tree = stack.enter_context(open_ast(source))
+            else:
+                sourcecode = stack.enter_context(open_source(source, mapped))
+
+        # Short-circuits to the cached outputs, if any (the source is fingerprinted once)
+        if cache is not None and not from_ast:
+            source_fingerprint = fingerprint(sourcecode)
+            for index, (interpreter, output) in enumerate(targets):
+                keys[index] = cache.key(sourcecode, interpreter, *output_options(output, compact),
+                                        source_fingerprint=source_fingerprint)
+                cached[index] = cache.fetch(keys[index], output)
+        pending = [target for target, hit in zip(targets, cached) if not hit]
+        if not pending:
+            return cached
+
+        if stream:
+            logger.info("Parsing and interpreting into {} targets ...".format(len(pending)))
+            emit_targets(sourcecode, pending, tracer, metrics, compact)
+        else:
+            if from_ast:
+                logger.info("Loading the syntax tree ...")
+                scenario = tree.scenario
+            else:
+                logger.info("Parsing ...")
+                if metrics is None:
+                    scenario = parser.parse(sourcecode, tracer=tracer)
+                else:
+                    scenario = metrics.parse(parser, sourcecode, tracer)
+            logger.info("Done")
+            logger.info("Interpreting into {} targets ...".format(len(pending)))
+            with measure(INTERPRET):
+                interpret_targets(scenario, pending, compact)
+        logger.info("Done")
+
+    if metrics is not None:
+        metrics.output_bytes = sum(os.path.getsize(output) for _, output in targets)
+    if cache is not None and not from_ast:
+        for key, (_, output), hit in zip(keys, targets, cached):
+            if not hit:
+                cache.store(key, output)
+    return cached
+
+
+def interpret_targets(scenario: Scenario, targets: List[Tuple[str, str]], compact: bool = False) -> None:
+    """ Interprets the given scenario into an output file per target, concurrently (the
+    interpreters only read the scenario). The output files of the failed targets are
+    removed, the first failure is raised once all the targets are done.
+    """
+    def interpret(target: Tuple[str, str]) -> None:
+        interpreter, output = target
+        try:
+            with open_output(output, Interpreter.is_binary(interpreter)) as fileoutput:
+                Interpreter.interpret_to(scenario, interpreter, fileoutput, compact)
+        except BaseException:
+            if os.path.exists(output):
+                os.remove(output)
+            raise
+
+    with ThreadPoolExecutor(max_workers=len(targets)) as executor:
+        futures = [executor.submit(interpret, target) for target in targets]
+    for future in futures:
+        future.result()
+
+
+def emit_targets(sourcecode: Any,
+                 targets: List[Tuple[str, str]],
+                 tracer: Tracer = None,
+                 metrics: Metrics = None,
+                 compact: bool = False) -> None:
+    """ Parses the given source code and writes an output file per target while parsing,
+    through the emitters of the interpreters. The output files are removed if the parse fails.
+    """
+    try:
+        with ExitStack() as stack:
+            emitter = TeeEmitter([get_emitter(interpreter, stack.enter_context(open_output(output)), compact)
+                                  for interpreter, output in targets])
+            context = ParseContext(emitter)
+            if metrics is None:
+                parser.parse(sourcecode, tracer=tracer, context=context)
+            else:
+                metrics.parse(parser, sourcecode, tracer, context)
+    except BaseException:
+        for _, output in targets:
+            if os.path.exists(output):
+                os.remove(output)
+        raise
+
+
+@contextmanager
+def open_ast(path: str) -> Iterator[SyntaxTree]:
+    """ Opens the given syntax tree file, memory-mapped: its sections are decoded on first access. """
+    with open_mapped(path) as data:
+        yield SyntaxTree(data)
+
+
+def emit_ast(source: str, output: str, mapped: bool = False) -> None:
+    """ Parses the given source file and writes its syntax tree (the scenario, the
+    symbols and the literals) into the given output file.
+    """
+    logger.info("Parsing ...")
+    context = ParseContext()
+    with open_source(source, mapped) as sourcecode:
+        scenario = parser.parse(sourcecode, context=context)
+    logger.info("Done")
+    symbol_table = context.symbol_table
+    with open(output, 'wb') as fileoutput:
+        write_chunks(generate_tree(scenario, symbol_table.symbols(), symbol_table.literal_pool.indexes), fileoutput)
+
+
+def interpret_ast(source: str, output: str, interpreter: str, metrics: Metrics = None, compact: bool = False) -> None:
+    """ Interprets the scenario of the given syntax tree file into the given output file. """
+    measure = metrics.phase if metrics is not None else unmeasured
+    logger.info("Loading the syntax tree ...")
+    with measure(READ):
+        with open_ast(source) as tree:
+            scenario = tree.scenario
+    logger.info("Done")
+
+    logger.info("Interpreting ...")
+    interpret_file(scenario, output, interpreter, metrics, compact)
+    logger.info("Done")
+    if metrics is not None:
+        metrics.output_bytes = os.path.getsize(output)
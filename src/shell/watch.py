@@ -0,0 +1,195 @@
+# -*- coding: utf-8 -*-
+""" The watch mode of Py-ADeLe.
+
+Monitors the given sources (files, glob patterns, directory trees) by polling
+their modification times and sizes, waits for the bursts of changes to settle,
+then recompiles the sources whose content actually changed. The compilations
+run in process, so that the parser and the digests of the sources stay in
+memory between the rebuilds; the outputs are placed as in batch mode and are
+always overwritten. The sources failing to compile lose their (stale) output,
+and are not retried until their content changes.
+
+Author:
+    Francesco Racciatti
+
+Copyright 2018 Francesco Racciatti
+
+"""
+
+
+import os
+import time
+import hashlib
+import logging
+from typing import Callable, Dict, List, Optional, Tuple
+
+from options import Argument
+from service import UnrecognizedInterpreterError
+from cache import BuildCache
+from batch import Status, Result, expand_sources, plan_outputs, compile_source
+from model.interpreter import Interpreter
+from util.utils import baserepr, basestr
+
+
+# Creates the logger
+logger = logging.getLogger(__name__)
+
+
+# The interval between two scans of the sources, in seconds
+POLL_INTERVAL = 0.5
+
+# The time the sources must stay unchanged before a rebuild, in seconds
+DEBOUNCE = 0.2
+
+# The size of the blocks the sources are hashed by
+HASH_BLOCK_SIZE = 1024 * 1024
+
+
+class Rebuild(object):
+    """ Wraps the outcome of a rebuild. """
+
+    def __init__(self, results: List[Result], unchanged: int, removed: int, elapsed: float) -> None:
+        # The outcomes of the recompiled sources
+        self.results: List[Result] = results
+        self.unchanged: int = unchanged
+        self.removed: int = removed
+        self.elapsed: float = elapsed
+
+    def __str__(self):
+        return basestr(self)
+
+    def __repr__(self):
+        return baserepr(self)
+
+
+def digest_file(path: str) -> str:
+    """ Gets the hash of the content of the given file. """
+    digest = hashlib.sha256()
+    with open(path, 'rb') as filesource:
+        for block in iter(lambda: filesource.read(HASH_BLOCK_SIZE), b''):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+class Watcher(object):
+    """ Rebuilds the sources of the given arguments as they change. """
+
+    def __init__(self,
+                 argument: Argument,
+                 interval: float = POLL_INTERVAL,
+                 debounce: float = DEBOUNCE,
+                 clock: Callable[[], float] = time.monotonic,
+                 sleep: Callable[[float], None] = time.sleep) -> None:
+        if not Interpreter.exist(argument.interpreter):
+            raise UnrecognizedInterpreterError("Cannot recognize the interpreter '{}'".format(argument.interpreter))
+        self.argument: Argument = argument
+        self.interval: float = interval
+        self.debounce: float = debounce
+        self.clock: Callable[[], float] = clock
+        self.sleep: Callable[[float], None] = sleep
+        self.cache: BuildCache = None if argument.no_cache else BuildCache(argument.cache_dir)
+        # The modification time and the size of each source, as of the last rebuild
+        self.stamps: Dict[str, Tuple[int, int]] = {}
+        # The hash of the content of each source, as of its last compilation
+        self.digests: Dict[str, str] = {}
+        # The hash of the content of each source failing to compile, it is not retried until changed
+        self.failures: Dict[str, str] = {}
+
+    def scan(self) -> Dict[str, Tuple[int, int]]:
+        """ Gets the modification time and the size of each source. """
+        stamps: Dict[str, Tuple[int, int]] = {}
+        for source in expand_sources(self.argument.sources):
+            try:
+                stat = os.stat(source)
+            except OSError:
+                continue
+            stamps[source] = (stat.st_mtime_ns, stat.st_size)
+        return stamps
+
+    def rebuild(self) -> Rebuild:
+        """ Recompiles the sources whose content changed since their last compilation. """
+        begin = time.perf_counter()
+        stamps = self.scan()
+        results: List[Result] = []
+        unchanged = 0
+        plan = plan_outputs(list(stamps), self.argument.interpreter, self.argument.output, self.argument.sources)
+        for source, output in plan:
+            # The sources merely touched are hashed, but not recompiled
+            if stamps[source] == self.stamps.get(source) and (source in self.failures or os.path.exists(output)):
+                unchanged += 1
+                continue
+            try:
+                digest = digest_file(source)
+            except OSError:
+                continue
+            if digest == self.digests.get(source) and (self.failures.get(source) == digest or os.path.exists(output)):
+                unchanged += 1
+                continue
+            result = compile_source(source, output, self.argument.interpreter, self.cache, self.argument.mmap,
+                                    self.argument.compact, self.argument.stream)
+            if result.status == Status.FAILED:
+                # The output of the former content is stale
+                if os.path.isfile(output):
+                    os.remove(output)
+                    result.error += ' (removed the stale output)'
+                self.failures[source] = digest
+            else:
+                self.failures.pop(source, None)
+            results.append(result)
+            self.digests[source] = digest
+        removed = [source for source in self.stamps if source not in stamps]
+        for source in removed:
+            self.digests.pop(source, None)
+            self.failures.pop(source, None)
+        self.stamps = stamps
+        return Rebuild(results, unchanged, len(removed), time.perf_counter() - begin)
+
+    def wait_changes(self) -> None:
+        """ Waits for the sources to change, then for the changes to settle. """
+        while True:
+            self.sleep(self.interval)
+            stamps = self.scan()
+            if stamps != self.stamps:
+                break
+        # Debounces the bursts of changes (e.g. the editors saving many files)
+        settled = self.clock()
+        while self.clock() - settled < self.debounce:
+            self.sleep(self.debounce)
+            current = self.scan()
+            if current != stamps:
+                stamps = current
+                settled = self.clock()
+
+    def watch(self, rebuilds: Optional[int] = None) -> None:
+        """ Rebuilds the sources and reports the rebuilds, forever or for the given number of rebuilds. """
+        count = 0
+        while rebuilds is None or count < rebuilds:
+            if count:
+                self.wait_changes()
+            report(self.rebuild())
+            count += 1
+
+
+def report(rebuild: Rebuild) -> None:
+    """ Prints the recompiled sources and the latency of the given rebuild. """
+    for result in rebuild.results:
+        line = '[{:^4}] {} -> {} ({:.1f} ms)'.format(
+            result.status.value, result.source, result.output, result.elapsed * 1000)
+        if result.error:
+            line += ': {}'.format(result.error)
+        print(line)
+    failed = sum(1 for result in rebuild.results if result.status == Status.FAILED)
+    print('Rebuilt in {:.1f} ms: {} recompiled, {} failed, {} unchanged, {} removed'.format(
+        rebuild.elapsed * 1000, len(rebuild.results) - failed, failed, rebuild.unchanged, rebuild.removed),
+        flush=True)
+
+
+def watch(argument: Argument) -> None:
+    """ Watches the sources of the given arguments until interrupted. """
+    watcher = Watcher(argument)
+    logger.info("Watching {} (Ctrl+C to stop)".format(', '.join(argument.sources)))
+    try:
+        watcher.watch()
+    except KeyboardInterrupt:
+        pass
+    logger.info("Stopped watching")
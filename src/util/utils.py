@@ -9,16 +9,24 @@ Copyright 2018 Francesco Racciatti
 """
 
 
-from typing import Any
+from typing import Any, Tuple
+
+
+def get_fields(cls: Any) -> Tuple[str, ...]:
+    """ Gets the fields of the given class, from its schema (if any) or its attributes. """
+    fields = getattr(cls.__class__, 'FIELDS', None)
+    if fields is None:
+        return tuple(cls.__dict__.keys())
+    return fields
 
 
 def baserepr(cls: Any) -> str:
     """ Provides the string representation of the given class. """
     s = '<{}:{{'.format(cls.__class__.__name__)
-    for idx, key in enumerate(cls.__dict__.keys()):
+    for idx, key in enumerate(get_fields(cls)):
         if idx != 0:
             s += ', '
-        s += '{}: {}'.format(key, cls.__dict__[key])
+        s += '{}: {}'.format(key, getattr(cls, key))
     s += '}>'
     return s
 
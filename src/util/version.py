@@ -0,0 +1,13 @@
+# -*- coding: utf-8 -*-
+""" The version of Py-ADeLe.
+
+Author:
+    Francesco Racciatti
+
+Copyright 2018 Francesco Racciatti
+
+"""
+
+
+# The version of Py-ADeLe, bump it whenever the output of the compiler changes
+VERSION: str = '0.1.0'
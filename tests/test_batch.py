@@ -0,0 +1,103 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+""" The unit test for the batch compilation of Py-ADeLe.
+
+Author:
+    Francesco Racciatti
+
+Copyright 2018 Francesco Racciatti
+
+"""
+
+
+import sys
+sys.path.append('../')
+sys.path.append('../src/')
+sys.path.append('../src/model/')
+sys.path.append('../src/parser/')
+sys.path.append('../src/shell/')
+sys.path.append('../src/util/')
+
+import os
+import shutil
+import tempfile
+import unittest
+
+from src.shell.options import Argument, get_command_line_arguments
+from src.shell.batch import Status, is_batch, expand_sources, plan_outputs, compile_batch
+
+
+# The sources contained in the test directory
+SOURCES = [
+    'source/empty.adele',
+    'source/test-complete.adele',
+    'source/test-guard-variable-declaration-same-line.adele',
+    'source/test-guard-variable-declaration-same-scope.adele',
+]
+
+
+class TestBatch(unittest.TestCase):
+    """ Full test set for the batch compilation of PyADeLe. """
+
+    def setUp(self):
+        unittest.TestCase.setUp(self)
+        self.directory = tempfile.mkdtemp()
+
+    def test_batch_when_single_source_then_not_batch(self):
+        """ Tests that a single source file does not trigger the batch mode. """
+        argument = get_command_line_arguments(['-s', 'source/empty.adele', '-i', 'xml'])
+        self.assertFalse(is_batch(argument))
+
+    def test_batch_when_many_sources_or_directory_or_jobs_then_batch(self):
+        """ Tests the triggers of the batch mode. """
+        self.assertTrue(is_batch(get_command_line_arguments(['-s', 'source/empty.adele', 'source/test-complete.adele', '-i', 'xml'])))
+        self.assertTrue(is_batch(get_command_line_arguments(['-s', 'source', '-i', 'xml'])))
+        self.assertTrue(is_batch(get_command_line_arguments(['-s', 'source/*.adele', '-i', 'xml'])))
+        self.assertTrue(is_batch(get_command_line_arguments(['-s', 'source/empty.adele', '-i', 'xml', '-j', '2'])))
+
+    def test_batch_when_directory_or_glob_then_expand_sources(self):
+        """ Tests the expansion of directories and glob patterns. """
+        self.assertEqual(expand_sources(['source']), SOURCES)
+        self.assertEqual(expand_sources(['source/*.adele', 'source/empty.adele']), SOURCES)
+
+    def test_batch_when_output_directory_then_preserve_relative_paths(self):
+        """ Tests the placement of the outputs. """
+        plan = plan_outputs(['source/empty.adele'], 'XML')
+        self.assertEqual(plan, [('source/empty.adele', 'source/empty.xml')])
+        plan = plan_outputs(['source/empty.adele', 'source/nested/empty.adele'], 'xml', 'out')
+        self.assertEqual([output for _, output in plan], ['out/empty.xml', 'out/nested/empty.xml'])
+
+    def test_batch_when_output_directory_then_rooted_at_the_inputs(self):
+        """ Tests that the outputs are placed relative to the given inputs, not to the sources found. """
+        sources = ['source/nested/a.adele', 'source/nested/deeper/b.adele']
+        for paths in (['source'], ['source/'], ['source/**/*.adele']):
+            with self.subTest(paths=paths):
+                plan = plan_outputs(sources, 'xml', 'out', paths)
+                self.assertEqual([output for _, output in plan], ['out/nested/a.xml', 'out/nested/deeper/b.xml'])
+        plan = plan_outputs(sources, 'xml', 'out', ['source/nested/a.adele', 'source/nested/deeper/b.adele'])
+        self.assertEqual([output for _, output in plan], ['out/a.xml', 'out/deeper/b.xml'])
+
+    def test_batch_when_failures_then_compile_the_others(self):
+        """ Tests that the failures do not abort the batch. """
+        argument = Argument(None, 'xml', self.directory, False, 2, ['source'], True)
+        results = compile_batch(argument)
+        self.assertEqual([r.source for r in results], SOURCES)
+        self.assertEqual([r.status for r in results],
+                         [Status.COMPILED, Status.COMPILED, Status.FAILED, Status.FAILED])
+        self.assertTrue(os.path.isfile(os.path.join(self.directory, 'test-complete.xml')))
+
+    def test_batch_when_output_exists_without_force_then_skip(self):
+        """ Tests the non interactive overwrite policy. """
+        argument = Argument(None, 'xml', self.directory, False, 1, ['source/empty.adele'], True)
+        self.assertEqual(compile_batch(argument)[0].status, Status.COMPILED)
+        self.assertEqual(compile_batch(argument)[0].status, Status.SKIPPED)
+        argument.force = True
+        self.assertEqual(compile_batch(argument)[0].status, Status.COMPILED)
+
+    def tearDown(self):
+        shutil.rmtree(self.directory, ignore_errors=True)
+        unittest.TestCase.tearDown(self)
+
+
+if __name__ == '__main__':
+    unittest.main()
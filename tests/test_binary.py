@@ -0,0 +1,105 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+""" The unit test for the binary format of Py-ADeLe.
+
+Author:
+    Francesco Racciatti
+
+Copyright 2018 Francesco Racciatti
+
+"""
+
+
+import sys
+sys.path.append('../')
+sys.path.append('../src/')
+sys.path.append('../src/model/')
+sys.path.append('../src/parser/')
+sys.path.append('../src/shell/')
+sys.path.append('../src/util/')
+
+import os
+import shutil
+import tempfile
+import unittest
+
+from src.parser.grammar import parser
+from src.model.interpreter import Interpreter
+from src.model.binary import BinaryFormatError, loads, load
+from src.model.oom import Literal, Variable, Configuration, Scenario
+from src.shell.service import compile_file
+
+
+class TestBinary(unittest.TestCase):
+    """ Full test set for the binary format of PyADeLe. """
+
+    def setUp(self):
+        unittest.TestCase.setUp(self)
+        with open('source/test-complete.adele', 'r') as filesource:
+            self.scenario = parser.parse(filesource.read())
+
+    def test_loads_when_interpreted_then_same_model(self):
+        """ Tests the round trip of the complete scenario. """
+        data = Interpreter.interpret(self.scenario, 'adeleb')
+        self.assertIsInstance(data, bytes)
+        self.assertEqual(str(loads(data)), str(self.scenario))
+
+    def test_loads_when_values_then_same_values(self):
+        """ Tests the round trip of the scalar and the container values. """
+        values = [None, True, False, 0, 1, -1, 2 ** 70, -2 ** 70, 0.5, -1e300, '', 'è', ['a', ('b', 1)], {'k': [2.5]}]
+        scenario = Scenario(Configuration([Variable('v', 'integer', value, 0) for value in values]))
+        reloaded = loads(Interpreter.interpret(scenario, 'adeleb'))
+        self.assertEqual([v.reference for v in reloaded.configuration.actions],
+                         [list(v) if isinstance(v, tuple) else v for v in values[:-2]] + [['a', ['b', 1]], {'k': [2.5]}])
+
+    def test_loads_when_dict_then_keys_and_items_in_order(self):
+        """ Tests that the keys and the items of the dictionaries are not swapped, nor reordered. """
+        value = {'a': 1, 2: 'b', 'c': {'d': None}, 3.5: [True]}
+        scenario = Scenario(Configuration([Variable('v', 'integer', value, 0)]))
+        reference = loads(Interpreter.interpret(scenario, 'adeleb')).configuration.actions[0].reference
+        self.assertEqual(reference, value)
+        self.assertEqual(list(reference.items()), list(value.items()))
+
+    def test_loads_when_repeated_literal_then_shared_string(self):
+        """ Tests that the identifier of a literal is encoded once, and shared after the reload. """
+        scenario = parser.parse('scenario { configuration { setUnitTime("s"); setTimeStart(2); setUnitTime("s"); } }')
+        data = Interpreter.interpret(scenario, 'adeleb')
+        self.assertEqual(data.count(b'_string_s'), 1)
+        actions = loads(data).configuration.actions
+        self.assertEqual(actions[0].reference, '_string_s')
+        self.assertIs(actions[0].reference, actions[2].reference)
+
+    def test_loads_when_literal_then_immutable(self):
+        """ Tests that a literal keeps its fields, and its immutability, after the reload. """
+        literal = Literal('string', 's', 0)
+        scenario = Scenario(Configuration([Variable('v', 'string', literal, 0)]))
+        reloaded = loads(Interpreter.interpret(scenario, 'adeleb')).configuration.actions[0].reference
+        self.assertEqual((reloaded.identifier, reloaded.value, reloaded.index), (literal.identifier, 's', 0))
+        with self.assertRaises(AttributeError):
+            reloaded.value = 't'
+
+    def test_loads_when_corrupted_then_raise_exception(self):
+        """ Tests the guards against foreign and truncated data. """
+        data = Interpreter.interpret(self.scenario, 'adeleb')
+        with self.assertRaises(BinaryFormatError):
+            loads(b'<?xml' + data)
+        with self.assertRaises(BinaryFormatError):
+            loads(data[:-3])
+
+    def test_compile_file_when_binary_then_load(self):
+        """ Tests the compilation into an .adeleb file. """
+        directory = tempfile.mkdtemp()
+        try:
+            output = os.path.join(directory, 'output.adeleb')
+            compile_file('source/test-complete.adele', output, 'adeleb')
+            with open(output, 'rb') as fileoutput:
+                self.assertEqual(str(load(fileoutput)), str(self.scenario))
+        finally:
+            shutil.rmtree(directory, ignore_errors=True)
+
+    def tearDown(self):
+        unittest.TestCase.tearDown(self)
+
+
+if __name__ == '__main__':
+    unittest.main()
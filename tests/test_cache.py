@@ -0,0 +1,98 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+""" The unit test for the build cache of Py-ADeLe.
+
+Author:
+    Francesco Racciatti
+
+Copyright 2018 Francesco Racciatti
+
+"""
+
+
+import sys
+sys.path.append('../')
+sys.path.append('../src/')
+sys.path.append('../src/model/')
+sys.path.append('../src/parser/')
+sys.path.append('../src/shell/')
+sys.path.append('../src/util/')
+
+import os
+import time
+import shutil
+import tempfile
+import unittest
+
+from src.shell.cache import BuildCache
+from src.shell.options import Argument
+from src.shell.batch import Status, compile_batch
+
+
+# A minimal scenario
+SOURCE = 'scenario { configuration { setUnitTime("s"); } }'
+
+
+class TestCache(unittest.TestCase):
+    """ Full test set for the build cache of PyADeLe. """
+
+    def setUp(self):
+        unittest.TestCase.setUp(self)
+        self.directory = tempfile.mkdtemp()
+        self.cache = BuildCache(self.directory)
+
+    def test_key_when_whitespaces_or_comments_change_then_same_key(self):
+        """ Tests that the key does not depend on whitespaces and comments. """
+        edited = '# A comment\nscenario\n{\n\tconfiguration { setUnitTime( "s" ) ; }  # Another one\n}\n'
+        self.assertEqual(self.cache.key(SOURCE, 'xml'), self.cache.key(edited, 'xml'))
+
+    def test_key_when_tokens_or_interpreter_change_then_other_key(self):
+        """ Tests that the key depends on the tokens and on the interpreter. """
+        edited = SOURCE.replace('"s"', '"ms"')
+        self.assertNotEqual(self.cache.key(SOURCE, 'xml'), self.cache.key(edited, 'xml'))
+        self.assertNotEqual(self.cache.key(SOURCE, 'xml'), self.cache.key(SOURCE, 'json'))
+
+    def test_fetch_when_stored_then_copy_output(self):
+        """ Tests the round trip of an output through the cache. """
+        output = os.path.join(self.directory, 'output.xml')
+        key = self.cache.key(SOURCE, 'xml')
+        self.assertFalse(self.cache.fetch(key, output))
+        with open(output, 'w') as fileoutput:
+            fileoutput.write('<Scenario/>')
+        self.cache.store(key, output)
+        os.remove(output)
+        self.assertTrue(self.cache.fetch(key, output))
+        with open(output, 'r') as fileoutput:
+            self.assertEqual(fileoutput.read(), '<Scenario/>')
+
+    def test_store_when_full_then_evict_least_recently_used(self):
+        """ Tests the LRU eviction. """
+        self.cache.size = 25
+        output = os.path.join(self.directory, 'output.xml')
+        with open(output, 'w') as fileoutput:
+            fileoutput.write('x' * 10)
+        now = time.time()
+        for age, key in enumerate(('first', 'second')):
+            self.cache.store(key, output)
+            os.utime(os.path.join(self.cache.directory, key), (now - 10 + age, now - 10 + age))
+        # Uses the first entry, so that the second one is the least recently used
+        self.assertTrue(self.cache.fetch('first', output))
+        self.cache.store('third', output)
+        self.assertEqual(sorted(os.listdir(self.cache.directory)), ['first', 'third'])
+
+    def test_batch_when_unchanged_then_cached(self):
+        """ Tests that the batch compilation short-circuits to the cached outputs. """
+        output = os.path.join(self.directory, 'output')
+        argument = Argument(None, 'xml', output, True, 1, ['source/test-complete.adele'], False, self.directory)
+        self.assertEqual(compile_batch(argument)[0].status, Status.COMPILED)
+        self.assertEqual(compile_batch(argument)[0].status, Status.CACHED)
+        argument.no_cache = True
+        self.assertEqual(compile_batch(argument)[0].status, Status.COMPILED)
+
+    def tearDown(self):
+        shutil.rmtree(self.directory, ignore_errors=True)
+        unittest.TestCase.tearDown(self)
+
+
+if __name__ == '__main__':
+    unittest.main()
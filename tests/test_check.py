@@ -0,0 +1,132 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+""" The unit test for the error reporting of Py-ADeLe.
+
+Author:
+    Francesco Racciatti
+
+Copyright 2018 Francesco Racciatti
+
+"""
+
+
+import sys
+sys.path.append('../')
+sys.path.append('../src/')
+sys.path.append('../src/model/')
+sys.path.append('../src/parser/')
+sys.path.append('../src/shell/')
+sys.path.append('../src/util/')
+
+import os
+import json
+import shutil
+import tempfile
+import unittest
+
+from src.parser.grammar import parser
+from src.parser.lexer import get_scanner
+from src.shell.options import Argument
+from src.shell.check import check_sources, dump_reports
+
+
+# A source having an error of each stage, a line each
+WRONG_SOURCE = '''scenario {
+    configuration {
+        setUnitTime("s");
+        setTimeStart(-1);
+        setUnitTime(3);
+        setUnitLength("m") $
+    }
+    attack {
+        integer a, a;
+        float b c;
+        message m;
+    }
+}
+'''
+
+# The errors of the wrong source: the stage and the line
+WRONG_SOURCE_ERRORS = [
+    ('semantic', 4),
+    ('syntax', 5),
+    ('lexical', 6),
+    ('syntax', 7),
+    ('semantic', 9),
+    ('syntax', 10),
+]
+
+
+class TestCheck(unittest.TestCase):
+    """ Full test set for the error reporting of PyADeLe. """
+
+    def setUp(self):
+        unittest.TestCase.setUp(self)
+        self.directory = tempfile.mkdtemp()
+
+    def errors(self, report):
+        """ Gets the stage and the line of the errors of the given report. """
+        return [(error.stage.value, error.lineno) for error in report.errors]
+
+    def test_check_when_wrong_source_then_all_errors(self):
+        """ Tests that the errors of all the stages are collected in a single pass, by any lexer. """
+        self.assertEqual(self.errors(parser.check(WRONG_SOURCE)), WRONG_SOURCE_ERRORS)
+        self.assertEqual(self.errors(parser.check(WRONG_SOURCE.encode('utf-8'))), WRONG_SOURCE_ERRORS)
+        self.assertEqual(self.errors(parser.check(WRONG_SOURCE, lexer=get_scanner(WRONG_SOURCE, fast=True))),
+                         WRONG_SOURCE_ERRORS)
+
+    def test_check_when_right_source_then_no_errors(self):
+        """ Tests that the right sources get an empty report. """
+        with open('source/test-complete.adele', 'r') as filesource:
+            report = parser.check(filesource.read())
+        self.assertEqual(report.errors, [])
+        self.assertFalse(report.truncated)
+
+    def test_check_when_source_ends_early_then_error(self):
+        """ Tests that the truncated sources are reported, without raising. """
+        report = parser.check('scenario {\n configuration {\n setUnitTime("s");\n')
+        self.assertEqual(self.errors(report), [('syntax', 4)])
+        with self.assertRaises(RuntimeError):
+            parser.parse('scenario { configuration {')
+
+    def test_check_when_too_many_errors_then_truncated(self):
+        """ Tests that the parse stops at the maximum number of errors. """
+        report = parser.check('scenario { configuration { ' + 'setUnitTime(1); ' * 50 + '} }', limit=5)
+        self.assertEqual(len(report.errors), 5)
+        self.assertTrue(report.truncated)
+
+    def test_check_when_wrong_source_then_parse_still_raises(self):
+        """ Tests that the first error still stops the parses without report. """
+        with self.assertRaisesRegex(Exception, 'Time cannot be negative, line 4'):
+            parser.parse(WRONG_SOURCE)
+
+    def test_check_when_sources_then_reports(self):
+        """ Tests the check of a number of sources, the reports as JSON. """
+        wrong = os.path.join(self.directory, 'wrong.adele')
+        with open(wrong, 'w') as filesource:
+            filesource.write(WRONG_SOURCE)
+        missing = os.path.join(self.directory, 'missing.adele')
+        for jobs in (1, 2):
+            with self.subTest(jobs=jobs):
+                argument = Argument(sources=[wrong, 'source/test-complete.adele', missing], jobs=jobs, max_errors=3)
+                reports = check_sources(argument)
+                self.assertEqual([source for source, _ in reports], argument.sources)
+                self.assertEqual(self.errors(reports[0][1]), WRONG_SOURCE_ERRORS[:3])
+                self.assertTrue(reports[0][1].truncated)
+                self.assertEqual(reports[1][1].errors, [])
+                self.assertEqual(self.errors(reports[2][1]), [('source', 0)])
+        output = os.path.join(self.directory, 'report.json')
+        dump_reports(reports, output)
+        with open(output, 'r') as filereport:
+            content = json.load(filereport)
+        self.assertEqual(content[wrong]['errors'][0], {'stage': 'semantic', 'line': 4,
+                                                       'message': 'Time cannot be negative, line 4'})
+        self.assertTrue(content[wrong]['truncated'])
+
+    def tearDown(self):
+        shutil.rmtree(self.directory, ignore_errors=True)
+        unittest.TestCase.tearDown(self)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -40,6 +40,76 @@ class TestCommandLineParser(unittest.TestCase):
         self.assertEqual(argument.output, cmd[5])
         self.assertTrue(argument.force)
 
+    def test_command_line_parser_when_cache_arguments_then_parse_arguments(self):
+        """ Tests the parsing of the build cache arguments. """
+        cmd = ['-s', 'source/empty.adele', '-i', 'xml', '--no-cache', '--cache-dir', 'cache']
+        argument = get_command_line_arguments(cmd)
+        self.assertTrue(argument.no_cache)
+        self.assertEqual(argument.cache_dir, cmd[6])
+        argument = get_command_line_arguments(cmd[:4])
+        self.assertFalse(argument.no_cache)
+        self.assertIsNone(argument.cache_dir)
+
+    def test_command_line_parser_when_diagnostic_arguments_then_parse_arguments(self):
+        """ Tests the parsing of the trace, metrics and profile arguments. """
+        cmd = ['-s', 'source/empty.adele', '-i', 'xml', '--trace', 'trace', '--metrics', 'metrics.prom',
+               '--cprofile', 'profile']
+        argument = get_command_line_arguments(cmd)
+        self.assertEqual(argument.trace, cmd[5])
+        self.assertEqual(argument.metrics, cmd[7])
+        self.assertEqual(argument.cprofile, cmd[9])
+        argument = get_command_line_arguments(cmd[:4])
+        self.assertIsNone(argument.trace)
+        self.assertIsNone(argument.metrics)
+        self.assertIsNone(argument.cprofile)
+
+    def test_command_line_parser_when_stream_argument_then_parse_arguments(self):
+        """ Tests the parsing of the single-pass mode argument. """
+        cmd = ['-s', 'source/empty.adele', '-i', 'json']
+        self.assertFalse(get_command_line_arguments(cmd).stream)
+        self.assertTrue(get_command_line_arguments(cmd + ['--stream']).stream)
+
+    def test_command_line_parser_when_check_arguments_then_parse_arguments(self):
+        """ Tests the parsing of the check mode arguments, the interpreter is not mandatory. """
+        argument = get_command_line_arguments(['-s', 'source/empty.adele', '--check', '--max-errors', '5'])
+        self.assertTrue(argument.check)
+        self.assertEqual(argument.max_errors, 5)
+        argument = get_command_line_arguments(['-s', 'source/empty.adele', '-i', 'xml'])
+        self.assertFalse(argument.check)
+        self.assertIsNone(argument.max_errors)
+        with self.assertRaises(SystemExit) as e:
+            get_command_line_arguments(['-s', 'source/empty.adele', '--check', '--max-errors', '0'])
+        self.assertEqual(e.exception.code, 2)
+
+    def test_command_line_parser_when_ast_arguments_then_parse_arguments(self):
+        """ Tests the parsing of the syntax tree arguments, the interpreter is not mandatory to emit it. """
+        argument = get_command_line_arguments(['-s', 'source/empty.adele', '--emit-ast'])
+        self.assertTrue(argument.emit_ast)
+        self.assertFalse(argument.from_ast)
+        argument = get_command_line_arguments(['-s', 'source/empty.adelet', '-i', 'xml', '--from-ast'])
+        self.assertTrue(argument.from_ast)
+        for cmd in (['--emit-ast', '--from-ast'], ['--from-ast', '-j', '2'], ['--emit-ast', '--check']):
+            with self.subTest(cmd=cmd):
+                with self.assertRaises(SystemExit) as e:
+                    get_command_line_arguments(['-s', 'source/empty.adele', '-i', 'xml'] + cmd)
+                self.assertEqual(e.exception.code, 2)
+
+    def test_command_line_parser_when_several_interpreters_then_parse_arguments(self):
+        """ Tests the parsing of several interpreters, for a single source only. """
+        argument = get_command_line_arguments(['-s', 'source/empty.adele', '-i', 'xml, json,xml'])
+        self.assertEqual(argument.interpreter, 'xml')
+        self.assertEqual(argument.interpreters, ['xml', 'json'])
+        argument = get_command_line_arguments(['-s', 'source/empty.adele', '-i', 'ndjson'])
+        self.assertEqual(argument.interpreters, ['ndjson'])
+        for cmd in (['-j', '2'], ['--check'], ['--watch']):
+            with self.subTest(cmd=cmd):
+                with self.assertRaises(SystemExit) as e:
+                    get_command_line_arguments(['-s', 'source/empty.adele', '-i', 'xml,json'] + cmd)
+                self.assertEqual(e.exception.code, 2)
+        with self.assertRaises(SystemExit) as e:
+            get_command_line_arguments(['-s', 'source/empty.adele', 'source/test-complete.adele', '-i', 'xml,json'])
+        self.assertEqual(e.exception.code, 2)
+
     def test_command_line_parser_when_unrecognizable_arguments_then_raise_exception(self):
         """ Tests the guard for unrecognizable arguments. """
         cmd = ['-s', 'source/empty.adele', '-i', 'xml', '-o', 'output', '-u']
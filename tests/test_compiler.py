@@ -0,0 +1,123 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+""" The unit test for the library API of Py-ADeLe.
+
+Author:
+    Francesco Racciatti
+
+Copyright 2018 Francesco Racciatti
+
+"""
+
+
+import sys
+sys.path.append('../')
+sys.path.append('../src/')
+sys.path.append('../src/model/')
+sys.path.append('../src/parser/')
+sys.path.append('../src/shell/')
+sys.path.append('../src/util/')
+
+import os
+import gzip
+import shutil
+import tempfile
+import unittest
+from concurrent.futures import ThreadPoolExecutor
+
+from src.parser.grammar import parser
+from src.model.interpreter import Interpreter
+from src.shell.compiler import Compiler, Scenario, UnrecognizedInterpreterError, UnstreamableInterpreterError
+
+
+class TestCompiler(unittest.TestCase):
+    """ Full test set for the library API of PyADeLe. """
+
+    def setUp(self):
+        unittest.TestCase.setUp(self)
+        with open('source/test-complete.adele', 'r') as filesource:
+            self.sourcecode = filesource.read()
+        self.directory = tempfile.mkdtemp()
+
+    def test_compiler_when_compile_string_then_same_as_interpreter(self):
+        """ Tests that the outputs match the ones of the interpreters, with any option. """
+        scenario = parser.parse(self.sourcecode)
+        for interpreter in (e.value for e in Interpreter.Type):
+            for compact in (False, True):
+                expected = Interpreter.interpret(scenario, interpreter, compact)
+                for fast in (False, True):
+                    with self.subTest(interpreter=interpreter, compact=compact, fast=fast):
+                        compiler = Compiler(interpreter, compact=compact, fast=fast)
+                        self.assertEqual(compiler.compile_string(self.sourcecode), expected)
+                        self.assertEqual(compiler.compile_string(self.sourcecode.encode('utf-8')), expected)
+        for interpreter, compact in (('json', False), ('ndjson', False), ('xml', True)):
+            with self.subTest(interpreter=interpreter, stream=True):
+                compiler = Compiler(interpreter, compact=compact, stream=True, cache_size=0)
+                self.assertEqual(compiler.compile_string(self.sourcecode),
+                                 Interpreter.interpret(scenario, interpreter, compact))
+
+    def test_compiler_when_parse_then_scenario(self):
+        """ Tests that the compiler returns the attack scenario. """
+        scenario = Compiler().parse(self.sourcecode)
+        self.assertIsInstance(scenario, Scenario)
+        self.assertEqual(Compiler('json').interpret(scenario), Interpreter.interpret(scenario, 'json'))
+
+    def test_compiler_when_cached_then_bounded_lru(self):
+        """ Tests that the outputs are cached, up to the cache size. """
+        compiler = Compiler('json', cache_size=2)
+        sources = ['scenario { configuration { setTimeStart(%d); } }' % i for i in range(3)]
+        first = compiler.compile_string(sources[0])
+        self.assertIs(compiler.compile_string(sources[0]), first)
+        compiler.compile_string(sources[1])
+        compiler.compile_string(sources[0])
+        compiler.compile_string(sources[2])
+        # The least recently used output is evicted
+        self.assertEqual(len(compiler.cache), 2)
+        self.assertIs(compiler.compile_string(sources[0]), first)
+        compiler.clear()
+        self.assertEqual(len(compiler.cache), 0)
+        self.assertEqual(len(Compiler('json', cache_size=0).cache), 0)
+
+    def test_compiler_when_compile_file_then_output(self):
+        """ Tests the compilation of the files, into the output files if any. """
+        compiler = Compiler('xml')
+        expected = compiler.compile_string(self.sourcecode)
+        self.assertEqual(compiler.compile_file('source/test-complete.adele'), expected)
+        output = os.path.join(self.directory, 'output.xml.gz')
+        self.assertIsNone(compiler.compile_file('source/test-complete.adele', output))
+        with gzip.open(output, 'rt') as fileoutput:
+            self.assertEqual(fileoutput.read(), expected)
+        output = os.path.join(self.directory, 'output.adeleb')
+        Compiler('adeleb').compile_file('source/test-complete.adele', output)
+        with open(output, 'rb') as fileoutput:
+            self.assertEqual(fileoutput.read(), Compiler('adeleb').compile_string(self.sourcecode))
+
+    def test_compiler_when_threads_then_same_outputs(self):
+        """ Tests that a compiler can be shared among many threads. """
+        compiler = Compiler('json', cache_size=0)
+        sources = ['scenario { configuration { setTimeStart(%d); } }' % i for i in range(32)]
+        with ThreadPoolExecutor(max_workers=8) as executor:
+            outputs = list(executor.map(compiler.compile_string, sources))
+        self.assertEqual(outputs, [Compiler('json').compile_string(sourcecode) for sourcecode in sources])
+
+    def test_compiler_when_wrong_source_then_error(self):
+        """ Tests that the syntax errors are raised and do not spoil the next compilations. """
+        compiler = Compiler('json')
+        with self.assertRaises(RuntimeError):
+            compiler.compile_string('scenario { configuration { setTimeStart(; } }')
+        self.assertEqual(compiler.compile_string(self.sourcecode), Compiler('json').compile_string(self.sourcecode))
+
+    def test_compiler_when_wrong_interpreter_then_error(self):
+        """ Tests that the unknown and the unstreamable interpreters are refused. """
+        with self.assertRaises(UnrecognizedInterpreterError):
+            Compiler('yaml')
+        with self.assertRaises(UnstreamableInterpreterError):
+            Compiler('adeleb', stream=True)
+
+    def tearDown(self):
+        shutil.rmtree(self.directory, ignore_errors=True)
+        unittest.TestCase.tearDown(self)
+
+
+if __name__ == '__main__':
+    unittest.main()
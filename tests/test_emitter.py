@@ -0,0 +1,189 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+""" The unit test for the emitters of Py-ADeLe.
+
+Author:
+    Francesco Racciatti
+
+Copyright 2018 Francesco Racciatti
+
+"""
+
+
+import sys
+sys.path.append('../')
+sys.path.append('../src/')
+sys.path.append('../src/model/')
+sys.path.append('../src/parser/')
+sys.path.append('../src/shell/')
+sys.path.append('../src/util/')
+
+import io
+import os
+import shutil
+import tempfile
+import unittest
+import tracemalloc
+
+from src.parser.grammar import parser, ParseContext
+from src.model.interpreter import Interpreter
+from src.model.emitter import Emitter, get_emitter
+from src.shell.service import compile_file, UnstreamableInterpreterError
+from src.shell.cache import BuildCache
+
+
+# The interpreters that can be streamed, with their dialect
+STREAMED = (('json', False), ('ndjson', False), ('xml', True))
+
+
+class Recorder(Emitter):
+    """ Records the events of the parser. """
+
+    def __init__(self) -> None:
+        Emitter.__init__(self)
+        self.events = []
+
+    def start_block(self, block, scope):
+        Emitter.start_block(self, block, scope)
+        self.events.append(('start', block, scope.identifier))
+
+    def declaration(self, symbol):
+        self.events.append(('declaration', symbol.identifier))
+
+    def action(self, action):
+        self.events.append(('action', action.__class__.__name__))
+
+    def end_block(self):
+        self.events.append(('end', self.blocks[-1]))
+        Emitter.end_block(self)
+
+
+class Discard(object):
+    """ A file object discarding the writes. """
+
+    def write(self, data):
+        return len(data)
+
+
+class TestEmitter(unittest.TestCase):
+    """ Full test set for the emitters of PyADeLe. """
+
+    def setUp(self):
+        unittest.TestCase.setUp(self)
+        with open('source/test-complete.adele', 'r') as filesource:
+            self.sourcecode = filesource.read()
+
+    def emit(self, sourcecode, interpreter, compact):
+        """ Parses the given source code in single pass, returns the output. """
+        output = io.StringIO()
+        parser.parse(sourcecode, context=ParseContext(get_emitter(interpreter, output, compact)))
+        return output.getvalue()
+
+    def test_emitter_when_streamed_then_same_as_interpreter(self):
+        """ Tests that the single-pass output matches the one of the interpreter. """
+        sources = (self.sourcecode,
+                   'scenario { configuration { setUnitTime("s"); } }',
+                   'scenario { attack { integer a; } configuration { setUnitTime("s"); setTimeStart(1); } }',
+                   'scenario { attack { message m; } }',
+                   'scenario { }',
+                   '',
+                   '# Comments only\n')
+        with open('source/empty.adele', 'r') as filesource:
+            sources += (filesource.read(),)
+        for sourcecode in sources:
+            scenario = parser.parse(sourcecode)
+            for interpreter, compact in STREAMED:
+                with self.subTest(sourcecode=sourcecode, interpreter=interpreter):
+                    self.assertEqual(self.emit(sourcecode, interpreter, compact),
+                                     Interpreter.interpret(scenario, interpreter, compact))
+
+    def test_emitter_when_parsing_then_events_in_source_order(self):
+        """ Tests the events pushed by the parser. """
+        recorder = Recorder()
+        parser.parse('scenario { configuration { setUnitTime("s"); setTimeStart(1); } attack { integer a, b; } }',
+                     context=ParseContext(recorder))
+        self.assertEqual(recorder.events, [
+            ('start', 'scenario', 0),
+            ('start', 'configuration', 1),
+            ('action', 'SetUnitTime'),
+            ('action', 'SetTimeStart'),
+            ('end', 'configuration'),
+            ('start', 'attack', 2),
+            ('declaration', 'a'),
+            ('declaration', 'b'),
+            ('end', 'attack'),
+            ('end', 'scenario')])
+
+    def test_emitter_when_streamed_then_memory_does_not_grow(self):
+        """ Tests that the memory of the single-pass mode does not grow with the scenario. """
+        peaks = []
+        for actions in (1000, 8000):
+            sourcecode = 'scenario { configuration { ' + 'setUnitTime("s"); setTimeStart(1.5); ' * actions + '} }'
+            tracemalloc.start()
+            parser.parse(sourcecode, context=ParseContext(get_emitter('json', Discard())))
+            peaks.append(tracemalloc.get_traced_memory()[1])
+            tracemalloc.stop()
+        self.assertLess(peaks[1], peaks[0] * 1.5)
+
+    def test_emitter_when_streamed_distinct_entities_then_nothing_retained(self):
+        """ Tests that the single-pass mode retains neither the literals nor the symbols of the closed scopes. """
+        peaks, retained = [], []
+        for count in (1000, 8000):
+            sourcecode = 'scenario { configuration { ' + \
+                         ''.join('setTimeStart({}.5); '.format(i) for i in range(count)) + '} ' + \
+                         'attack { ' + ''.join('integer v{}; '.format(i) for i in range(count)) + '} }'
+            context = ParseContext(get_emitter('json', Discard()))
+            tracemalloc.start()
+            parser.parse(sourcecode, context=context)
+            retained.append(tracemalloc.get_traced_memory()[0])
+            tracemalloc.stop()
+            self.assertFalse(context.symbol_table.global_symbol_table)
+            self.assertFalse(context.symbol_table.visible)
+            self.assertEqual(context.symbol_table.declared, {2: count})
+            self.assertEqual(context.symbol_table.literals, count)
+            # The peak is bounded by the identifiers of the open scopes, i.e. the redeclaration checks
+            sourcecode = sourcecode.split('attack')[0] + '}'
+            tracemalloc.start()
+            parser.parse(sourcecode, context=ParseContext(get_emitter('json', Discard())))
+            peaks.append(tracemalloc.get_traced_memory()[1])
+            tracemalloc.stop()
+        self.assertLess(retained[1], retained[0] * 1.5)
+        self.assertLess(peaks[1], peaks[0] * 1.5)
+
+    def test_emitter_when_not_streamable_then_raise_exception(self):
+        """ Tests the guard against the interpreters that cannot be streamed. """
+        directory = tempfile.mkdtemp()
+        try:
+            for interpreter, compact in (('xml', False), ('adeleb', False)):
+                with self.assertRaises(UnstreamableInterpreterError):
+                    compile_file('source/test-complete.adele', os.path.join(directory, 'output'), interpreter,
+                                 compact=compact, stream=True)
+        finally:
+            shutil.rmtree(directory, ignore_errors=True)
+
+    def test_compile_file_when_stream_then_same_output_and_cache(self):
+        """ Tests the single-pass compilation of a file, its cache and its failures. """
+        directory = tempfile.mkdtemp()
+        try:
+            cache = BuildCache(directory)
+            output = os.path.join(directory, 'output.json')
+            self.assertFalse(compile_file('source/test-complete.adele', output, 'json', cache, stream=True))
+            with open(output, 'r') as fileoutput:
+                self.assertEqual(fileoutput.read(), Interpreter.interpret(parser.parse(self.sourcecode), 'json'))
+            self.assertTrue(compile_file('source/test-complete.adele', output, 'json', cache))
+            # The partial output of a failing parse is removed
+            source = os.path.join(directory, 'wrong.adele')
+            with open(source, 'w') as filesource:
+                filesource.write('scenario { configuration { setUnitTime("s"); setUnitTime(1); } }')
+            with self.assertRaises(RuntimeError):
+                compile_file(source, output, 'json', stream=True)
+            self.assertFalse(os.path.exists(output))
+        finally:
+            shutil.rmtree(directory, ignore_errors=True)
+
+    def tearDown(self):
+        unittest.TestCase.tearDown(self)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,153 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+""" The unit test for the interpreters of Py-ADeLe.
+
+Author:
+    Francesco Racciatti
+
+Copyright 2018 Francesco Racciatti
+
+"""
+
+
+import sys
+sys.path.append('../')
+sys.path.append('../src/')
+sys.path.append('../src/model/')
+sys.path.append('../src/parser/')
+sys.path.append('../src/shell/')
+sys.path.append('../src/util/')
+
+import io
+import os
+import gzip
+import lzma
+import json
+import shutil
+import tempfile
+import unittest
+from xml.etree import ElementTree
+
+from src.parser.grammar import parser
+from src.model.interpreter import Interpreter, UnknownInterpreterError, write_chunks, interpret_json
+from src.model.oom import Literal, Variable
+from src.shell.service import compile_file
+from src.shell.cache import BuildCache
+
+
+class TestInterpreter(unittest.TestCase):
+    """ Full test set for the interpreters of PyADeLe. """
+
+    def setUp(self):
+        unittest.TestCase.setUp(self)
+        with open('source/test-complete.adele', 'r') as filesource:
+            self.scenario = parser.parse(filesource.read())
+
+    def test_interpret_to_when_xml_then_same_as_interpret(self):
+        """ Tests that the streamed interpretation matches the in-memory one. """
+        stream = io.StringIO()
+        Interpreter.interpret_to(self.scenario, 'xml', stream)
+        self.assertEqual(stream.getvalue(), Interpreter.interpret(self.scenario, 'xml'))
+        self.assertTrue(stream.getvalue().startswith('<?xml version="1.0"?>\n<Scenario'))
+
+    def test_interpret_when_json_then_mirror_model(self):
+        """ Tests that the JSON interpretation mirrors the model, field by field. """
+        document = json.loads(Interpreter.interpret(self.scenario, 'json'))
+        self.assertEqual(document['class'], 'Scenario')
+        actions = document['configuration']['actions']
+        self.assertEqual(len(actions), len(self.scenario.configuration.actions))
+        for action, expected in zip(actions, self.scenario.configuration.actions):
+            self.assertEqual(action, {'class': expected.__class__.__name__, 'reference': expected.reference})
+        self.assertIsNone(document['attack'])
+        self.assertEqual(document['scopes'][1], {'class': 'Scope', 'identifier': 1, 'parent': 0, 'depth': 1})
+
+    def test_interpret_when_json_then_encode_values(self):
+        """ Tests the encoding of the scalar values. """
+        for value in (True, False, None, 0, -7, 2.5, 'quoted "text"\n\u00e8'):
+            self.assertEqual(json.loads(interpret_json(Variable('v', 'integer', value, 0)))['reference'], value)
+        self.assertEqual(json.loads(interpret_json(Literal('float', 1e300, 3)))['value'], 1e300)
+
+    def test_interpret_when_ndjson_then_one_record_per_action(self):
+        """ Tests that the newline-delimited JSON interpretation has one record per top-level item. """
+        lines = Interpreter.interpret(self.scenario, 'ndjson').splitlines()
+        records = [json.loads(line) for line in lines]
+        actions = [r for r in records if r['section'] == 'configuration']
+        self.assertEqual(actions, [dict(a, section='configuration')
+                                   for a in json.loads(Interpreter.interpret(self.scenario, 'json'))['configuration']['actions']])
+        self.assertEqual(len(records) - len(actions), len(self.scenario.scopes))
+
+    def test_interpret_when_empty_source_then_empty_document(self):
+        """ Tests the JSON interpretations of the empty source, i.e. of no scenario. """
+        with open('source/empty.adele', 'r') as filesource:
+            scenario = parser.parse(filesource.read())
+        self.assertIsNone(scenario)
+        self.assertEqual(Interpreter.interpret(scenario, 'json'), 'null\n')
+        self.assertIsNone(json.loads(Interpreter.interpret(scenario, 'json')))
+        self.assertEqual(Interpreter.interpret(scenario, 'ndjson'), '')
+
+    def test_interpret_when_empty_source_then_no_compact_xml(self):
+        """ Tests the compact XML interpretation of the empty source, as the XML one. """
+        with open('source/empty.adele', 'r') as filesource:
+            scenario = parser.parse(filesource.read())
+        self.assertEqual(Interpreter.interpret(scenario, 'xml', True), '')
+        self.assertEqual(Interpreter.interpret(scenario, 'xml', True), Interpreter.interpret(scenario, 'xml'))
+
+    def test_interpret_when_compact_xml_then_attributes_and_short_tags(self):
+        """ Tests the compact XML dialect against the model. """
+        compact = Interpreter.interpret(self.scenario, 'xml', compact=True)
+        self.assertLess(len(compact) * 5, len(Interpreter.interpret(self.scenario, 'xml')))
+        root = ElementTree.fromstring(compact)
+        self.assertEqual(root.tag, 'S')
+        actions = root.find('configuration/C/actions')
+        self.assertEqual([a.get('reference') for a in actions],
+                         [a.reference for a in self.scenario.configuration.actions])
+        self.assertEqual(root.find('scopes')[1].attrib, {'identifier': '1', 'parent': '0', 'depth': '1'})
+        self.assertEqual(root.find('scopes')[0].attrib, {'identifier': '0', 'depth': '0'})
+
+    def test_interpret_when_compact_xml_then_escape_values(self):
+        """ Tests the escaping of the values in the compact XML dialect. """
+        variable = Variable('<v>', 'integer', ['a&b', '"c"'], 0)
+        root = ElementTree.fromstring(Interpreter.interpret(variable, 'xml', compact=True))
+        self.assertEqual(root.get('identifier'), '<v>')
+        self.assertEqual([item.text for item in root.find('reference')], ['a&b', '"c"'])
+
+    def test_compile_file_when_compressed_output_then_stream_compressed(self):
+        """ Tests the transparent compression of the outputs, and their cache keys. """
+        directory = tempfile.mkdtemp()
+        try:
+            cache = BuildCache(directory)
+            for extension, module in (('.gz', gzip), ('.xz', lzma)):
+                for interpreter, compact, mode in (('xml', True, 'rt'), ('adeleb', False, 'rb')):
+                    output = os.path.join(directory, 'output.' + interpreter + extension)
+                    self.assertFalse(compile_file('source/test-complete.adele', output, interpreter, cache, compact=compact))
+                    with module.open(output, mode) as fileoutput:
+                        self.assertEqual(fileoutput.read(), Interpreter.interpret(self.scenario, interpreter, compact))
+                    self.assertTrue(compile_file('source/test-complete.adele', output, interpreter, cache, compact=compact))
+            output = os.path.join(directory, 'output.xml')
+            self.assertFalse(compile_file('source/test-complete.adele', output, 'xml', cache))
+            with open(output, 'r') as fileoutput:
+                self.assertEqual(fileoutput.read(), Interpreter.interpret(self.scenario, 'xml'))
+        finally:
+            shutil.rmtree(directory, ignore_errors=True)
+
+    def test_interpret_when_unknown_interpreter_then_raise_exception(self):
+        """ Tests the guard against unknown interpreters. """
+        with self.assertRaises(UnknownInterpreterError):
+            Interpreter.interpret(self.scenario, 'unexisting-interpreter')
+
+    def test_write_chunks_then_coalesce_chunks(self):
+        """ Tests that the chunks are coalesced into bounded writes. """
+        writes = []
+        class Sink(object):
+            def write(self, data):
+                writes.append(data)
+        write_chunks(('x' * 10 for _ in range(100)), Sink(), 256)
+        self.assertEqual(''.join(writes), 'x' * 1000)
+        self.assertEqual([len(w) for w in writes], [260, 260, 260, 220])
+
+    def tearDown(self):
+        unittest.TestCase.tearDown(self)
+
+
+if __name__ == '__main__':
+    unittest.main()
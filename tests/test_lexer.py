@@ -18,9 +18,11 @@ sys.path.append('../src/parser/')
 sys.path.append('../src/shell/')
 sys.path.append('../src/util/')
 
+import os
 import unittest
 
-from src.parser.lexer import Keyword, Punctuation, Literal
+from src.parser.lexer import Keyword, Punctuation, Literal, get_scanner
+from src.parser.mapped import open_mapped
 
 
 class TestLexer(unittest.TestCase):
@@ -47,6 +49,80 @@ class TestLexer(unittest.TestCase):
         if any(intersection):
             self.fail("Duplicated keywords(s): " + str(intersection))
 
+    def test_mapped_lexer_when_mapped_source_then_same_tokens(self):
+        """ Tests that the memory-mapped source is tokenized like the text one. """
+        path = 'source/test-complete.adele'
+        with open(path, 'r') as filesource:
+            sourcecode = filesource.read()
+        scanner = get_scanner(sourcecode)
+        scanner.input(sourcecode)
+        expected = [(t.type, t.value, t.lineno) for t in scanner]
+        with open_mapped(path) as mapped:
+            scanner = get_scanner(mapped)
+            scanner.input(mapped)
+            self.assertEqual([(t.type, t.value, t.lineno) for t in scanner], expected)
+
+    def test_mapped_lexer_when_illegal_character_then_raise_exception(self):
+        """ Tests the error reporting of the memory-mapped lexer. """
+        scanner = get_scanner(b'scenario\n{ $ }')
+        scanner.input(b'scenario\n{ $ }')
+        with self.assertRaises(RuntimeError) as e:
+            list(scanner)
+        self.assertIn("'$' - line 2", str(e.exception))
+
+    def assert_same_tokens(self, sourcecode):
+        """ Asserts that the high-throughput lexer and the PLY's one produce the same tokens or error. """
+        streams = []
+        for fast in (False, True):
+            scanner = get_scanner(sourcecode, fast)
+            scanner.input(sourcecode)
+            try:
+                streams.append([(t.type, t.value, t.lineno, t.lexpos) for t in scanner])
+            except RuntimeError as e:
+                streams.append(str(e))
+        self.assertEqual(streams[1], streams[0])
+
+    def test_fast_lexer_when_sources_then_same_tokens_as_ply(self):
+        """ Tests the high-throughput lexer against the PLY's one on the test sources. """
+        for name in sorted(os.listdir('source')):
+            with open(os.path.join('source', name), 'r') as filesource:
+                with self.subTest(source=name):
+                    self.assert_same_tokens(filesource.read())
+
+    def test_fast_lexer_when_edge_cases_then_same_tokens_as_ply(self):
+        """ Tests the high-throughput lexer against the PLY's one on the tricky lexemes. """
+        sources = ("x-1 -1.5 1.5.2 a_1 1a 'c' ' ' \"s \\\" t\" == = += ! != && || ^",
+                   "scenario # comment $\n\n\t{ \n} #",
+                   "elementMisplace elementMisplaced SELF self h min ms",
+                   "x = 1; $",
+                   "\n\n@",
+                   "")
+        for sourcecode in sources:
+            with self.subTest(sourcecode=sourcecode):
+                self.assert_same_tokens(sourcecode)
+
+    def test_fast_lexer_when_illegal_character_then_raise_exception(self):
+        """ Tests the error reporting of the high-throughput lexer, on text and bytes. """
+        for sourcecode in ('scenario\n{ $ }', b'scenario\n{ $ }'):
+            scanner = get_scanner(sourcecode, fast=True)
+            scanner.input(sourcecode)
+            with self.assertRaises(RuntimeError) as e:
+                list(scanner)
+            self.assertIn("'$' - line 2", str(e.exception))
+
+    def test_fast_lexer_when_mapped_source_then_same_tokens(self):
+        """ Tests that the high-throughput lexer tokenizes the memory-mapped source like the text one. """
+        path = 'source/test-complete.adele'
+        with open(path, 'r') as filesource:
+            sourcecode = filesource.read()
+        scanner = get_scanner(sourcecode)
+        scanner.input(sourcecode)
+        expected = [(t.type, t.value, t.lineno) for t in scanner]
+        with open_mapped(path) as mapped:
+            scanner = get_scanner(mapped, fast=True)
+            scanner.input(mapped)
+            self.assertEqual([(t.type, t.value, t.lineno) for t in scanner], expected)
+
     def tearDown(self):
         unittest.TestCase.tearDown(self)
 
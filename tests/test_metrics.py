@@ -0,0 +1,82 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+""" The unit test for the metrics of Py-ADeLe.
+
+Author:
+    Francesco Racciatti
+
+Copyright 2018 Francesco Racciatti
+
+"""
+
+
+import sys
+sys.path.append('../')
+sys.path.append('../src/')
+sys.path.append('../src/model/')
+sys.path.append('../src/parser/')
+sys.path.append('../src/shell/')
+sys.path.append('../src/util/')
+
+import os
+import json
+import shutil
+import tempfile
+import unittest
+
+from src.shell.metrics import PHASES, Metrics
+from src.shell.service import compile_file
+
+
+class TestMetrics(unittest.TestCase):
+    """ Full test set for the metrics of PyADeLe. """
+
+    def setUp(self):
+        unittest.TestCase.setUp(self)
+        self.directory = tempfile.mkdtemp()
+        self.output = os.path.join(self.directory, 'output.xml')
+
+    def test_compile_file_when_metrics_then_measures_phases(self):
+        """ Tests that the metrics cover every phase and the counters of the complete scenario. """
+        metrics = Metrics()
+        compile_file('source/test-complete.adele', self.output, 'xml', metrics=metrics)
+        for phase in ('lex', 'parse', 'interpret'):
+            self.assertGreater(metrics.wall[phase], 0.0)
+        self.assertGreater(metrics.tokens, 0)
+        self.assertGreater(metrics.productions, metrics.tokens // 2)
+        self.assertTrue(metrics.symbols)
+        self.assertEqual(metrics.output_bytes, os.path.getsize(self.output))
+        self.assertFalse(metrics.cached)
+
+    def test_compile_file_when_metrics_then_same_output(self):
+        """ Tests that measuring the compilation does not change its output. """
+        reference = os.path.join(self.directory, 'reference.xml')
+        compile_file('source/test-complete.adele', reference, 'xml')
+        compile_file('source/test-complete.adele', self.output, 'xml', metrics=Metrics())
+        with open(reference, 'r') as filereference, open(self.output, 'r') as fileoutput:
+            self.assertEqual(filereference.read(), fileoutput.read())
+
+    def test_dump_when_extension_then_format(self):
+        """ Tests the JSON and the Prometheus textfile formats. """
+        metrics = Metrics()
+        compile_file('source/test-complete.adele', self.output, 'xml', metrics=metrics)
+        path = os.path.join(self.directory, 'metrics.json')
+        metrics.dump(path)
+        with open(path, 'r') as filemetrics:
+            dumped = json.load(filemetrics)
+        self.assertEqual(set(dumped['phases']), set(PHASES))
+        self.assertEqual(dumped['tokens'], metrics.tokens)
+        path = os.path.join(self.directory, 'metrics.prom')
+        metrics.dump(path)
+        with open(path, 'r') as filemetrics:
+            lines = [line for line in filemetrics.read().splitlines() if not line.startswith('#')]
+        self.assertIn('pyadele_tokens {}'.format(metrics.tokens), lines)
+        self.assertIn('pyadele_phase_wall_seconds{{phase="lex"}} {}'.format(metrics.wall['lex']), lines)
+
+    def tearDown(self):
+        unittest.TestCase.tearDown(self)
+        shutil.rmtree(self.directory, ignore_errors=True)
+
+
+if __name__ == '__main__':
+    unittest.main()
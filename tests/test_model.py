@@ -0,0 +1,62 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+""" The unit test for the Object-Oriented Model of Py-ADeLe.
+
+Author:
+    Francesco Racciatti
+
+Copyright 2018 Francesco Racciatti
+
+"""
+
+
+import sys
+sys.path.append('../')
+sys.path.append('../src/')
+sys.path.append('../src/model/')
+sys.path.append('../src/parser/')
+sys.path.append('../src/shell/')
+sys.path.append('../src/util/')
+
+import copy
+import pickle
+import unittest
+
+from src.model.oom import *
+
+
+class TestModel(unittest.TestCase):
+    """ Full test set for the Object-Oriented Model of PyADeLe. """
+
+    def setUp(self):
+        unittest.TestCase.setUp(self)
+
+    def test_model_when_instantiated_then_slotted(self):
+        """ Tests that the nodes of the model do not carry a dictionary. """
+        nodes = (Literal('string', 's', 0), Variable('v', 'integer', None, 0), Message('m', 0),
+                 Configuration([]), SetUnitTime('_s'), SetUnitLength('_m'), SetUnitAngle('_rad'),
+                 SetTimeStart('_0'), Attack(), Scenario())
+        for node in nodes:
+            self.assertFalse(hasattr(node, '__dict__'), node.__class__.__name__)
+            for field in node.FIELDS:
+                self.assertTrue(hasattr(node, field))
+
+    def test_model_when_printed_then_use_schema(self):
+        """ Tests that the string representation follows the schema. """
+        self.assertEqual(str(Scenario(Configuration([SetUnitTime('_s')]))),
+                         '<Scenario:{configuration: <Configuration:{actions: [<SetUnitTime:{reference: _s}>]}>, attack: None, scopes: []}>')
+
+    def test_literal_when_copied_then_same_fields(self):
+        """ Tests that the (frozen) literals survive copies and pickling. """
+        literal = Literal('integer', 1, 7)
+        for clone in (copy.copy(literal), copy.deepcopy(literal), pickle.loads(pickle.dumps(literal))):
+            self.assertEqual(str(clone), str(literal))
+        with self.assertRaises(AttributeError):
+            literal.index = 8
+
+    def tearDown(self):
+        unittest.TestCase.tearDown(self)
+
+
+if __name__ == '__main__':
+    unittest.main()
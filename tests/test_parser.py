@@ -19,8 +19,11 @@ sys.path.append('../src/shell/')
 sys.path.append('../src/util/')
 
 import unittest
+import tracemalloc
+from concurrent.futures import ThreadPoolExecutor
 
 from src.parser.grammar import *
+from src.parser.tracing import Tracer
 
 class TestParser(unittest.TestCase):
     """ Full test set for the parsing engine of PyADeLe. """
@@ -53,6 +56,167 @@ class TestParser(unittest.TestCase):
         parser.parse(sourcecode)
         # TODO checks the xml against the xml scheme
 
+    def test_complete_scenario_memory_mapped(self):
+        """ Tests the working complete scenario, memory-mapped."""
+        with open('source/test-complete.adele', 'r') as filesource:
+            sourcecode = filesource.read()
+        expected = str(parser.parse(sourcecode))
+        self.assertEqual(str(parser.parse_file('source/test-complete.adele')), expected)
+        self.assertIsNone(parser.parse_file('source/empty.adele'))
+
+    def test_complete_scenario_fast_lexer(self):
+        """ Tests the working complete scenario, on the high-throughput lexer."""
+        with open('source/test-complete.adele', 'r') as filesource:
+            sourcecode = filesource.read()
+        expected = str(parser.parse(sourcecode))
+        self.assertEqual(str(parser.parse(sourcecode, lexer=get_scanner(sourcecode, fast=True))), expected)
+        with self.assertRaises(RuntimeError) as e:
+            parser.parse('scenario {\n configuration { ; } }', lexer=get_scanner('', fast=True))
+        self.assertIn("- line 2", str(e.exception))
+
+    def test_literal_pool_when_same_constant_then_same_literal(self):
+        """ Tests that the literals are interned by type and value. """
+        pool = LiteralPool()
+        first = pool.intern(Keyword.INTEGER, 1)
+        self.assertIs(pool.intern(Keyword.INTEGER, 1), first)
+        other = pool.intern(Keyword.STRING, '1')
+        self.assertIsNot(other, first)
+        self.assertEqual((first.index, other.index), (0, 1))
+        self.assertIs(pool.retrieve(1), other)
+        self.assertEqual(len(pool), 2)
+
+    def test_literal_when_different_types_then_different_references(self):
+        """ Tests that the actions reference the literals by type and value. """
+        pool = LiteralPool()
+        self.assertEqual(pool.intern(Keyword.INTEGER, 1).identifier, '_integer_1')
+        self.assertEqual(pool.intern(Keyword.STRING, '1').identifier, '_string_1')
+        scenario = parser.parse('scenario { configuration { setUnitTime("1"); setTimeStart(1); setTimeStart(1.0); } }')
+        self.assertEqual([action.reference for action in scenario.configuration.actions],
+                         ['_string_1', '_integer_1', '_float_1.0'])
+
+    def test_literal_pool_when_literal_then_immutable(self):
+        """ Tests that the shared literals cannot be modified. """
+        literal = LiteralPool().intern(Keyword.FLOAT, 1.0)
+        with self.assertRaises(AttributeError):
+            literal.value = 2.0
+
+    def test_redefinition_when_same_statement_or_scope_then_raise_exception(self):
+        """ Tests the guard on the redeclarations, within a statement and within a scope. """
+        for sourcecode in ('scenario { attack { boolean b, c, b; } }',
+                           'scenario { attack { boolean b; message c; integer b; } }'):
+            with self.assertRaises(RuntimeAssertError):
+                parser.parse(sourcecode)
+
+    def test_symbol_index_when_scope_closed_then_symbols_released(self):
+        """ Tests that the symbols of a closed scope are no more visible. """
+        context = ParseContext()
+        parser.parse('scenario { attack { boolean b, c; message m; } }', context=context)
+        self.assertEqual(len(context.symbol_table.global_symbol_table[1].symbol_table), 3)
+        self.assertFalse(context.symbol_table.visible)
+        symbol_table = GlobalSymbolTable()
+        symbol_table.store_message(0, 'm')
+        symbol_table.store_message(1, 'n')
+        self.assertTrue(symbol_table.is_visible('n'))
+        self.assertEqual(symbol_table.lookup('m').identifier, 'm')
+        symbol_table.release(1)
+        self.assertFalse(symbol_table.is_visible('n'))
+        self.assertIsNone(symbol_table.lookup('n'))
+        self.assertTrue(symbol_table.is_visible('m'))
+
+    def test_scope_handler_when_many_scopes_then_distinct_identifiers(self):
+        """ Tests that the scopes form a tree of distinct identifiers, whatever their number. """
+        scope_handler = ScopeHandler()
+        scope_handler.open_scope()
+        for _ in range(12):
+            scope_handler.open_scope()
+            scope_handler.open_scope()
+            scope_handler.close_scope()
+            scope_handler.close_scope()
+        self.assertEqual([scope.identifier for scope in scope_handler.scopes], list(range(25)))
+        self.assertEqual(scope_handler.get_current_scope_identifier(), 0)
+        self.assertEqual(scope_handler.get_scope(24).parent, 23)
+        self.assertEqual(scope_handler.get_scope(23).parent, 0)
+        self.assertEqual(scope_handler.get_scope(24).depth, 2)
+        scope_handler.close_scope()
+        self.assertIsNone(scope_handler.get_current_scope_identifier())
+
+    def test_scopes_when_parsed_then_exported(self):
+        """ Tests that the scenario exports the tree of the scopes. """
+        scenario = parser.parse('scenario { configuration { setTimeStart(1); } attack { boolean b; } }')
+        self.assertEqual([(s.identifier, s.parent, s.depth) for s in scenario.scopes],
+                         [(0, None, 0), (1, 0, 1), (2, 0, 1)])
+
+    def test_configuration_when_parsed_then_actions_in_source_order(self):
+        """ Tests that the configuration keeps its actions in source order, whatever the order of the blocks. """
+        for sourcecode in ('scenario { configuration { setUnitTime("s"); setTimeStart(1); } attack { boolean b; } }',
+                           'scenario { attack { boolean b; } configuration { setUnitTime("s"); setTimeStart(1); } }'):
+            with self.subTest(sourcecode=sourcecode):
+                scenario = parser.parse(sourcecode)
+                self.assertEqual([action.__class__.__name__ for action in scenario.configuration.actions],
+                                 ['SetUnitTime', 'SetTimeStart'])
+
+    def test_consecutive_parses_are_isolated(self):
+        """ Tests that the identifiers declared by a parse are not seen by the next ones. """
+        with open('source/test-complete.adele', 'r') as filesource:
+            sourcecode = filesource.read()
+        first = parser.parse(sourcecode)
+        second = parser.parse(sourcecode)
+        self.assertEqual(str(first), str(second))
+
+    def test_concurrent_parses_are_isolated(self):
+        """ Tests that many parses can run concurrently in threads. """
+        with open('source/test-complete.adele', 'r') as filesource:
+            sourcecode = filesource.read()
+        expected = str(parser.parse(sourcecode))
+        with ThreadPoolExecutor(max_workers=8) as executor:
+            scenarios = list(executor.map(parser.parse, [sourcecode] * 64))
+        for scenario in scenarios:
+            self.assertEqual(str(scenario), expected)
+
+    def test_consecutive_parses_do_not_leak(self):
+        """ Tests that the memory stays flat over 10k consecutive parses. """
+        sourcecode = 'scenario { configuration { setTimeStart(1); } attack { boolean b; message m; } }'
+        for _ in range(1000):
+            parser.parse(sourcecode)
+        tracemalloc.start()
+        try:
+            baseline = tracemalloc.get_traced_memory()[0]
+            for _ in range(10000):
+                parser.parse(sourcecode)
+            growth = tracemalloc.get_traced_memory()[0] - baseline
+        finally:
+            tracemalloc.stop()
+        self.assertLess(growth, 64 * 1024)
+
+    def test_tracer_when_active_then_records_reductions(self):
+        """ Tests that an active tracer records the reductions, without changing the scenario. """
+        with open('source/test-complete.adele', 'r') as filesource:
+            sourcecode = filesource.read()
+        tracer = Tracer()
+        traced = parser.parse(sourcecode, tracer=tracer)
+        self.assertEqual(str(traced), str(parser.parse(sourcecode)))
+        self.assertTrue(tracer.records)
+        productions = [production for production, _, _ in tracer.records]
+        self.assertEqual(productions[-1], 'entry_point -> scenario_compound_statement')
+        self.assertTrue(all(lineno > 0 and elapsed >= 0 for _, lineno, elapsed in tracer.records))
+        self.assertEqual(sum(count for count, _ in tracer.summary().values()), len(tracer.records))
+
+    def test_tracer_when_active_then_lines_of_the_productions(self):
+        """ Tests that the tracer records the line of each production, not the one of the lookahead. """
+        tracer = Tracer()
+        parser.parse('scenario\n{\n  configuration\n  {\n    setTimeStart(1);\n  }\n}\n', tracer=tracer)
+        lines = [(production.split()[0], lineno) for production, lineno, _ in tracer.records]
+        self.assertEqual([lineno for symbol, lineno in lines if symbol == 'curvy_left'], [2, 4])
+        self.assertIn(('action_set_time_start', 5), lines)
+        self.assertEqual(lines[-1], ('entry_point', 1))
+
+    def test_tracer_when_inactive_then_bare_actions(self):
+        """ Tests that a traced parse does not leak the tracing into the next parses. """
+        parser.parse('scenario { configuration { setTimeStart(1); } attack { boolean b; } }', tracer=Tracer())
+        for production in parser.engine.productions:
+            if production.callable is not None:
+                self.assertTrue(production.callable.__name__.startswith('p_'))
+
     def tearDown(self):
         unittest.TestCase.tearDown(self)
 
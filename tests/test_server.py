@@ -0,0 +1,249 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+""" The unit test for the compile daemon of Py-ADeLe.
+
+Author:
+    Francesco Racciatti
+
+Copyright 2018 Francesco Racciatti
+
+"""
+
+
+import sys
+sys.path.append('../')
+sys.path.append('../src/')
+sys.path.append('../src/model/')
+sys.path.append('../src/parser/')
+sys.path.append('../src/shell/')
+sys.path.append('../src/util/')
+
+import os
+import json
+import time
+import signal
+import socket
+import shutil
+import tempfile
+import unittest
+import threading
+import http.client
+from concurrent.futures import ThreadPoolExecutor
+
+from src.parser.grammar import parser
+from src.model.interpreter import Interpreter
+from src.shell.server import Daemon, REQUEST_SIZE_MAX, get_serve_arguments
+
+
+class UnixHTTPConnection(http.client.HTTPConnection):
+    """ The HTTP connection over a Unix socket. """
+
+    def __init__(self, path):
+        http.client.HTTPConnection.__init__(self, 'localhost')
+        self.path = path
+
+    def connect(self):
+        self.sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        self.sock.connect(self.path)
+
+
+class TestServer(unittest.TestCase):
+    """ Full test set for the compile daemon of PyADeLe. """
+
+    def setUp(self):
+        unittest.TestCase.setUp(self)
+        self.directory = tempfile.mkdtemp()
+        with open('source/test-complete.adele', 'r') as filesource:
+            self.sourcecode = filesource.read()
+
+    def start(self, **kwargs):
+        """ Starts a daemon in background, returns a function opening the connections to it. """
+        daemon = Daemon(jobs=2, cache_dir=self.directory, **kwargs)
+        self.daemon = daemon
+        thread = threading.Thread(target=daemon.serve)
+        thread.start()
+
+        def stop():
+            daemon.shutdown()
+            thread.join()
+
+        self.addCleanup(stop)
+        if daemon.socket_path is not None:
+            return lambda: UnixHTTPConnection(daemon.socket_path)
+        return lambda: http.client.HTTPConnection(*daemon.address)
+
+    def request(self, connect, method, path, content=None, headers=None):
+        """ Sends a request, returns the status, the headers and the body of the response. """
+        connection = connect()
+        try:
+            body = json.dumps(content).encode('utf-8') if content is not None else None
+            connection.request(method, path, body, dict({'Content-Type': 'application/json'}, **(headers or {})))
+            response = connection.getresponse()
+            return response.status, dict(response.getheaders()), response.read()
+        finally:
+            connection.close()
+
+    def test_server_when_compile_then_same_output_and_stats(self):
+        """ Tests the compilation of sources and paths, the build cache and the statistics. """
+        connect = self.start(port=0, host='127.0.0.1', root=self.directory)
+        status, _, body = self.request(connect, 'GET', '/health')
+        self.assertEqual(status, 200)
+        self.assertEqual(json.loads(body)['status'], 'ok')
+
+        scenario = parser.parse(self.sourcecode)
+        for interpreter, compact in (('xml', False), ('json', False), ('xml', True), ('adeleb', False)):
+            status, headers, body = self.request(connect, 'POST', '/compile', {
+                'source': self.sourcecode, 'interpreter': interpreter, 'compact': compact})
+            self.assertEqual(status, 200, body)
+            expected = Interpreter.interpret(scenario, interpreter, compact)
+            self.assertEqual(body, expected if isinstance(expected, bytes) else expected.encode('utf-8'))
+            self.assertEqual(headers['X-Pyadele-Cached'], 'false')
+
+        # The same scenario by path hits the build cache
+        source = os.path.join(self.directory, 'test-complete.adele')
+        shutil.copy('source/test-complete.adele', source)
+        output = os.path.join(os.path.realpath(self.directory), 'output.json')
+        status, headers, body = self.request(connect, 'POST', '/compile', {
+            'path': 'test-complete.adele', 'interpreter': 'json', 'output': output})
+        self.assertEqual(status, 200, body)
+        self.assertEqual(json.loads(body), {'output': output, 'cached': True})
+        with open(output, 'r') as fileoutput:
+            self.assertEqual(fileoutput.read(), Interpreter.interpret(scenario, 'json'))
+
+        status, _, body = self.request(connect, 'GET', '/stats')
+        stats = json.loads(body)
+        self.assertEqual((stats['requests'], stats['compiled'], stats['cached'], stats['failed']), (5, 4, 1, 0))
+        self.assertEqual(stats['latency']['window'], 5)
+        self.assertLessEqual(stats['latency']['p50'], stats['latency']['max'])
+
+    def test_server_when_concurrent_requests_then_served(self):
+        """ Tests the concurrent compilations over a Unix socket. """
+        connect = self.start(socket_path=os.path.join(self.directory, 'pyadele.sock'))
+        scenario = parser.parse(self.sourcecode)
+        sources = ['{}\n# {}\n'.format(self.sourcecode, i) for i in range(8)]
+        with ThreadPoolExecutor(max_workers=4) as executor:
+            responses = list(executor.map(lambda source: self.request(connect, 'POST', '/compile', {
+                'source': source, 'interpreter': 'ndjson'}), sources))
+        for status, _, body in responses:
+            self.assertEqual(status, 200)
+            self.assertEqual(body.decode('utf-8'), Interpreter.interpret(scenario, 'ndjson'))
+
+    def test_server_when_bad_requests_then_report_errors(self):
+        """ Tests the errors of the daemon. """
+        connect = self.start(port=0, host='127.0.0.1', no_cache=True)
+        self.assertEqual(self.request(connect, 'GET', '/unknown')[0], 404)
+        self.assertEqual(self.request(connect, 'POST', '/compile', {'interpreter': 'xml'})[0], 400)
+        self.assertEqual(self.request(connect, 'POST', '/compile', {'source': '', 'interpreter': 'yaml'})[0], 400)
+        status, _, body = self.request(connect, 'POST', '/compile', {'source': 'scenario { $ }', 'interpreter': 'xml'})
+        self.assertEqual(status, 422)
+        self.assertIn("Illegal character '$'", json.loads(body)['error'])
+        status, _, body = self.request(connect, 'GET', '/stats')
+        self.assertEqual(json.loads(body)['failed'], 1)
+
+    def test_server_when_paths_then_confined_to_root(self):
+        """ Tests that the source and output files lie under the root directory, and the overwrite policy. """
+        root = os.path.join(self.directory, 'root')
+        os.mkdir(root)
+        shutil.copy('source/test-complete.adele', root)
+        outside = os.path.join(self.directory, 'outside.xml')
+        connect = self.start(port=0, host='127.0.0.1', no_cache=True, root=root)
+        for content in ({'path': os.path.abspath('source/test-complete.adele')},
+                        {'path': '../root/../../test-complete.adele'},
+                        {'path': 'test-complete.adele', 'output': outside},
+                        {'path': 'test-complete.adele', 'output': '../outside.xml'},
+                        {'source': '', 'output': 5}):
+            with self.subTest(content=content):
+                status, _, _ = self.request(connect, 'POST', '/compile', dict(content, interpreter='xml'))
+                self.assertEqual(status, 400)
+        self.assertFalse(os.path.exists(outside))
+
+        # The existing output files are overwritten only if forced
+        output = os.path.join(root, 'output.xml')
+        with open(output, 'w') as fileoutput:
+            fileoutput.write('keep')
+        content = {'path': 'test-complete.adele', 'interpreter': 'xml', 'output': 'output.xml'}
+        self.assertEqual(self.request(connect, 'POST', '/compile', content)[0], 409)
+        with open(output, 'r') as fileoutput:
+            self.assertEqual(fileoutput.read(), 'keep')
+        self.assertEqual(self.request(connect, 'POST', '/compile', dict(content, force=True))[0], 200)
+        with open(output, 'r') as fileoutput:
+            self.assertEqual(fileoutput.read(), Interpreter.interpret(parser.parse(self.sourcecode), 'xml'))
+
+        # With no root directory, the requests carry the sources only
+        connect = self.start(port=0, host='127.0.0.1', no_cache=True)
+        content = {'path': os.path.join(root, 'test-complete.adele'), 'interpreter': 'xml'}
+        self.assertEqual(self.request(connect, 'POST', '/compile', content)[0], 400)
+
+    def test_server_when_forged_headers_then_rejected(self):
+        """ Tests the rejection of the cross-origin, non-JSON and misaddressed requests. """
+        connect = self.start(port=0, host='127.0.0.1', no_cache=True)
+        content = {'source': '', 'interpreter': 'xml'}
+        self.assertEqual(self.request(connect, 'POST', '/compile', content)[0], 200)
+        for headers, expected in (({'Origin': 'http://example.com'}, 403),
+                                  ({'Host': 'attacker.example:8517'}, 403),
+                                  ({'Content-Type': 'text/plain'}, 415),
+                                  ({'Content-Type': 'application/x-www-form-urlencoded'}, 415)):
+            with self.subTest(headers=headers):
+                self.assertEqual(self.request(connect, 'POST', '/compile', content, headers)[0], expected)
+
+    def test_server_when_wrong_content_length_then_rejected(self):
+        """ Tests the rejection of the malformed, negative and oversized lengths of the requests. """
+        connect = self.start(port=0, host='127.0.0.1', no_cache=True)
+        for length, expected in (('abc', 400), ('-1', 400), (str(REQUEST_SIZE_MAX + 1), 413)):
+            with self.subTest(length=length):
+                connection = connect()
+                try:
+                    connection.putrequest('POST', '/compile')
+                    connection.putheader('Content-Type', 'application/json')
+                    connection.putheader('Content-Length', length)
+                    connection.endheaders()
+                    response = connection.getresponse()
+                    self.assertEqual(response.status, expected)
+                    self.assertIn('error', json.loads(response.read()))
+                finally:
+                    connection.close()
+
+    def test_server_when_worker_died_then_pool_recreated(self):
+        """ Tests that the pool of the workers is recreated once broken, the health being degraded meanwhile. """
+        connect = self.start(port=0, host='127.0.0.1', no_cache=True)
+        pool = self.daemon.server.pool
+        content = {'source': self.sourcecode, 'interpreter': 'xml'}
+        self.assertEqual(self.request(connect, 'POST', '/compile', content)[0], 200)
+        broken = pool.executor
+        # The pool terminates the other workers once one dies
+        process = next(iter(broken._processes.values()))
+        os.kill(process.pid, signal.SIGKILL)
+        process.join()
+
+        status, _, body = self.request(connect, 'POST', '/compile', content)
+        self.assertEqual(status, 503, body)
+        self.assertIsNot(pool.executor, broken)
+        deadline = time.monotonic() + 30
+        while self.request(connect, 'GET', '/health')[0] != 200 and time.monotonic() < deadline:
+            time.sleep(0.05)
+        self.assertFalse(pool.degraded)
+        self.assertEqual(self.request(connect, 'POST', '/compile', content)[0], 200)
+        stats = json.loads(self.request(connect, 'GET', '/stats')[2])
+        self.assertEqual((stats['restarts'], stats['failed']), (1, 1))
+
+        pool.degraded = True
+        status, _, body = self.request(connect, 'GET', '/health')
+        self.assertEqual((status, json.loads(body)['status']), (503, 'degraded'))
+        pool.degraded = False
+
+    def test_serve_arguments_then_parse_arguments(self):
+        """ Tests the command line arguments of the daemon. """
+        arguments = get_serve_arguments(['--socket', 'pyadele.sock', '-j', '3', '--no-cache', '--root', 'scenarios'])
+        self.assertEqual((arguments.socket, arguments.jobs, arguments.no_cache, arguments.root),
+                         ('pyadele.sock', 3, True, 'scenarios'))
+        self.assertIsNone(get_serve_arguments([]).root)
+        with self.assertRaises(SystemExit):
+            get_serve_arguments(['-j', '0'])
+
+    def tearDown(self):
+        shutil.rmtree(self.directory, ignore_errors=True)
+        unittest.TestCase.tearDown(self)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,105 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+""" The unit test for the syntax tree file of Py-ADeLe.
+
+Author:
+    Francesco Racciatti
+
+Copyright 2018 Francesco Racciatti
+
+"""
+
+
+import sys
+sys.path.append('../')
+sys.path.append('../src/')
+sys.path.append('../src/model/')
+sys.path.append('../src/parser/')
+sys.path.append('../src/shell/')
+sys.path.append('../src/util/')
+
+import os
+import shutil
+import tempfile
+import unittest
+
+from src.parser.grammar import parser, ParseContext
+from src.model.interpreter import Interpreter
+from src.model.syntaxtree import SyntaxTree, BinaryFormatError, MAGIC, FORMAT_VERSION, generate_tree
+from src.shell.service import compile_file, emit_ast
+
+
+class TestSyntaxTree(unittest.TestCase):
+    """ Full test set for the syntax tree file of PyADeLe. """
+
+    def setUp(self):
+        unittest.TestCase.setUp(self)
+        self.context = ParseContext()
+        with open('source/test-complete.adele', 'r') as filesource:
+            self.scenario = parser.parse(filesource.read(), context=self.context)
+        symbol_table = self.context.symbol_table
+        self.data = b''.join(generate_tree(self.scenario, symbol_table.symbols(), symbol_table.literal_pool.indexes))
+        self.directory = tempfile.mkdtemp()
+
+    def test_tree_when_loaded_then_same_model(self):
+        """ Tests the round trip of the scenario, the symbols and the literals. """
+        tree = SyntaxTree(self.data)
+        self.assertEqual(str(tree.scenario), str(self.scenario))
+        self.assertEqual(str(tree.symbols), str(self.context.symbol_table.symbols()))
+        self.assertEqual(str(tree.literals), str(self.context.symbol_table.literal_pool.indexes))
+        self.assertEqual(len(tree.symbols), 320)
+        for interpreter in (e.value for e in Interpreter.Type):
+            with self.subTest(interpreter=interpreter):
+                self.assertEqual(Interpreter.interpret(tree.scenario, interpreter),
+                                 Interpreter.interpret(self.scenario, interpreter))
+
+    def test_tree_when_opened_then_sections_decoded_on_access(self):
+        """ Tests that the sections are decoded on first access only. """
+        tree = SyntaxTree(memoryview(self.data))
+        self.assertEqual(tree.sections, {})
+        scenario = tree.scenario
+        self.assertEqual(list(tree.sections), ['scenario'])
+        self.assertIs(tree.scenario, scenario)
+
+    def test_tree_when_empty_scenario_then_none(self):
+        """ Tests the tree of the empty source. """
+        tree = SyntaxTree(b''.join(generate_tree(parser.parse(''))))
+        self.assertIsNone(tree.scenario)
+        self.assertEqual(tree.symbols, [])
+
+    def test_tree_when_wrong_data_then_raise_exception(self):
+        """ Tests the guards for the data not conforming to the tree file. """
+        producer = len(MAGIC) + 1
+        wrong = [
+            b'',
+            b'ADLB\x01',
+            MAGIC + bytes([FORMAT_VERSION + 1]) + self.data[producer:],
+            self.data[:producer] + b'\x059.9.9' + self.data[producer + 1 + self.data[producer]:],
+            self.data[:producer + 3],
+        ]
+        for data in wrong:
+            with self.subTest(data=data[:16]):
+                with self.assertRaises(BinaryFormatError):
+                    SyntaxTree(data)
+        with self.assertRaises(BinaryFormatError):
+            SyntaxTree(self.data[:-1]).literals
+
+    def test_tree_when_compiled_from_ast_then_same_output(self):
+        """ Tests the compilation of the emitted syntax tree file. """
+        tree = os.path.join(self.directory, 'test-complete.adelet')
+        emit_ast('source/test-complete.adele', tree)
+        for interpreter in ('xml', 'json'):
+            expected = os.path.join(self.directory, 'expected.' + interpreter)
+            output = os.path.join(self.directory, 'output.' + interpreter)
+            compile_file('source/test-complete.adele', expected, interpreter)
+            self.assertFalse(compile_file(tree, output, interpreter, from_ast=True))
+            with open(expected, 'r') as fileexpected, open(output, 'r') as fileoutput:
+                self.assertEqual(fileoutput.read(), fileexpected.read())
+
+    def tearDown(self):
+        shutil.rmtree(self.directory, ignore_errors=True)
+        unittest.TestCase.tearDown(self)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,110 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+""" The unit test for the cache of the lexing and parsing tables of Py-ADeLe.
+
+Author:
+    Francesco Racciatti
+
+Copyright 2018 Francesco Racciatti
+
+"""
+
+
+import sys
+sys.path.append('../')
+sys.path.append('../src/')
+sys.path.append('../src/model/')
+sys.path.append('../src/parser/')
+sys.path.append('../src/shell/')
+sys.path.append('../src/util/')
+
+import os
+import shutil
+import tempfile
+import subprocess
+import unittest
+from types import ModuleType
+
+from src.parser import lexer as lexing_module
+from src.parser import grammar as parsing_module
+from src.parser.tables import build_lexer, build_parser, get_cache_directory, get_rules_signature
+
+
+class TestTables(unittest.TestCase):
+    """ Full test set for the cache of the tables of PyADeLe. """
+
+    def setUp(self):
+        unittest.TestCase.setUp(self)
+        self.directory = tempfile.mkdtemp()
+
+    def test_tables_when_cold_start_then_store_tables(self):
+        """ Tests that the tables are stored into the cache directory. """
+        build_lexer(lexing_module, self.directory)
+        build_parser(parsing_module, 'entry_point', self.directory)
+        tables = sorted(os.listdir(get_cache_directory(self.directory)))
+        self.assertEqual(len(tables), 2)
+        self.assertTrue(tables[0].startswith('lextab_'))
+        self.assertTrue(tables[1].startswith('parsetab_'))
+
+    def test_tables_when_warm_start_then_same_tables_as_cold_start(self):
+        """ Tests that the cached tables are the same as the fresh ones. """
+        with open('source/test-complete.adele', 'r') as filesource:
+            sourcecode = filesource.read()
+        cold_lexer = build_lexer(lexing_module, self.directory)
+        cold_parser = build_parser(parsing_module, 'entry_point', self.directory)
+        warm_lexer = build_lexer(lexing_module, self.directory)
+        warm_parser = build_parser(parsing_module, 'entry_point', self.directory)
+        cold_lexer.input(sourcecode)
+        warm_lexer.input(sourcecode)
+        cold = [(t.type, t.value, t.lineno) for t in cold_lexer]
+        warm = [(t.type, t.value, t.lineno) for t in warm_lexer]
+        self.assertEqual(cold, warm)
+        self.assertEqual(cold_parser.action, warm_parser.action)
+        self.assertEqual(cold_parser.goto, warm_parser.goto)
+
+    def test_tables_when_rule_changes_then_signature_changes(self):
+        """ Tests that changing a rule invalidates the tables. """
+        def p_rule(p):
+            '''
+            rule : TOKEN
+            '''
+        module = ModuleType('grammar')
+        module.tokens = ('TOKEN',)
+        module.p_rule = p_rule
+        signature = get_rules_signature(module, 'p_')
+        p_rule.__doc__ = '''
+            rule : TOKEN TOKEN
+            '''
+        self.assertNotEqual(signature, get_rules_signature(module, 'p_'))
+        module.tokens = ('TOKEN', 'OTHER')
+        self.assertNotEqual(signature, get_rules_signature(module, 'p_'))
+
+    def test_tables_when_corrupted_then_rebuild(self):
+        """ Tests that corrupted tables are discarded and rebuilt. """
+        build_parser(parsing_module, 'entry_point', self.directory)
+        directory = get_cache_directory(self.directory)
+        for table in os.listdir(directory):
+            with open(os.path.join(directory, table), 'w') as filetable:
+                filetable.write('corrupted')
+        parser = build_parser(parsing_module, 'entry_point', self.directory)
+        self.assertIsNotNone(parser)
+
+    def test_tables_when_imported_then_not_built(self):
+        """ Tests that importing the parser neither builds the tables nor imports mypy. """
+        statement = ("import sys; sys.path[:0] = ['../src', '../src/model', '../src/parser', '../src/shell', "
+                     "'../src/util']; import grammar; "
+                     "print('engine' in grammar.parser.__dict__, grammar.get_lexers.cache_info().currsize, "
+                     "any(m.startswith('mypy') for m in sys.modules))")
+        environment = dict(os.environ, PYADELE_CACHE_DIR=self.directory)
+        output = subprocess.run([sys.executable, '-c', statement], env=environment, check=True,
+                                stdout=subprocess.PIPE, universal_newlines=True).stdout
+        self.assertEqual(output.split(), ['False', '0', 'False'])
+        self.assertFalse(os.listdir(self.directory))
+
+    def tearDown(self):
+        shutil.rmtree(self.directory, ignore_errors=True)
+        unittest.TestCase.tearDown(self)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,149 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+""" The unit test for the multi-target compilation of Py-ADeLe.
+
+Author:
+    Francesco Racciatti
+
+Copyright 2018 Francesco Racciatti
+
+"""
+
+
+import sys
+sys.path.append('../')
+sys.path.append('../src/')
+sys.path.append('../src/model/')
+sys.path.append('../src/parser/')
+sys.path.append('../src/shell/')
+sys.path.append('../src/util/')
+
+import os
+import shutil
+import tempfile
+import unittest
+from unittest import mock
+
+from src.shell.cache import BuildCache
+from src.shell.options import Argument
+from src.shell.service import compile_file, compile_targets, emit_ast, plan_targets, validate_targets, \
+    UnrecognizedInterpreterError, UnstreamableInterpreterError
+
+
+SOURCE = 'source/test-complete.adele'
+
+
+class TestTargets(unittest.TestCase):
+    """ Full test set for the multi-target compilation of PyADeLe. """
+
+    def setUp(self):
+        unittest.TestCase.setUp(self)
+        self.directory = tempfile.mkdtemp()
+
+    def path(self, name):
+        return os.path.join(self.directory, name)
+
+    def read(self, path):
+        with open(path, 'rb') as fileoutput:
+            return fileoutput.read()
+
+    def assertSameOutputs(self, targets, compact=False):
+        """ Asserts that the output of each target equals the one of its single-target compilation. """
+        for interpreter, output in targets:
+            with self.subTest(interpreter=interpreter):
+                expected = self.path('expected.' + interpreter)
+                compile_file(SOURCE, expected, interpreter, compact=compact)
+                self.assertEqual(self.read(output), self.read(expected))
+
+    def test_plan_targets_when_output_then_named_by_interpreter(self):
+        """ Tests the naming of the output files, keeping their compression. """
+        self.assertEqual(plan_targets('dir/a.adele', ['xml', 'JSON']),
+                         [('xml', 'dir/a.xml'), ('JSON', 'dir/a.json')])
+        self.assertEqual(plan_targets('a.adele', ['xml', 'json'], 'out/b.xml'),
+                         [('xml', 'out/b.xml'), ('json', 'out/b.json')])
+        self.assertEqual(plan_targets('a.adele', ['xml', 'adeleb'], 'out/b.xml.gz'),
+                         [('xml', 'out/b.xml.gz'), ('adeleb', 'out/b.adeleb.gz')])
+        self.assertEqual(plan_targets('a.adele', ['ndjson'], 'b'), [('ndjson', 'b.ndjson')])
+
+    def test_compile_targets_when_interpreters_then_same_outputs(self):
+        """ Tests that a single parse gives the same outputs as a compilation per interpreter. """
+        targets = plan_targets(SOURCE, ['xml', 'json', 'ndjson', 'adeleb'], self.path('output'))
+        self.assertEqual(compile_targets(SOURCE, targets), [False] * 4)
+        self.assertSameOutputs(targets)
+
+    def test_compile_targets_when_stream_then_same_outputs(self):
+        """ Tests the emission of several interpretations while parsing. """
+        targets = plan_targets(SOURCE, ['xml', 'json', 'ndjson'], self.path('output'))
+        compile_targets(SOURCE, targets, compact=True, stream=True)
+        self.assertSameOutputs(targets, compact=True)
+        with self.assertRaises(UnstreamableInterpreterError):
+            compile_targets(SOURCE, plan_targets(SOURCE, ['xml', 'adeleb'], self.path('other')), stream=True)
+        self.assertFalse(os.path.exists(self.path('other.xml')))
+
+    def test_compile_targets_when_from_ast_then_same_outputs(self):
+        """ Tests the compilation of several interpretations of a syntax tree file. """
+        tree = self.path('test-complete.adelet')
+        emit_ast(SOURCE, tree)
+        targets = plan_targets(tree, ['xml', 'json'])
+        compile_targets(tree, targets, from_ast=True, stream=True)
+        self.assertSameOutputs(targets)
+
+    def test_compile_targets_when_cached_then_outputs_restored(self):
+        """ Tests the build cache, by target. """
+        cache = BuildCache(self.path('cache'))
+        targets = plan_targets(SOURCE, ['xml', 'json'], self.path('output'))
+        self.assertEqual(compile_targets(SOURCE, targets, cache), [False, False])
+        os.remove(targets[1][1])
+        self.assertEqual(compile_targets(SOURCE, targets, cache), [True, True])
+        self.assertSameOutputs(targets)
+        # The targets share the cache with the single-target compilation
+        targets = plan_targets(SOURCE, ['xml', 'ndjson'], self.path('output'))
+        self.assertEqual(compile_targets(SOURCE, targets, cache), [True, False])
+        self.assertTrue(compile_file(SOURCE, self.path('single.ndjson'), 'ndjson', cache))
+
+    def test_compile_targets_when_failure_then_outputs_removed(self):
+        """ Tests that no output file is left behind by a failed compilation. """
+        source = self.path('wrong.adele')
+        with open(source, 'w') as filesource:
+            filesource.write('attack {\n    var x = undefined;\n}\n')
+        for stream in (False, True):
+            with self.subTest(stream=stream):
+                targets = plan_targets(source, ['xml', 'json'])
+                with self.assertRaises(Exception):
+                    compile_targets(source, targets, stream=stream)
+                for _, output in targets:
+                    self.assertFalse(os.path.exists(output))
+
+    @mock.patch('src.shell.service.Interpreter.interpret_to')
+    def test_compile_file_when_interpretation_fails_then_output_removed(self, mocked_interpret_to):
+        """ Tests that no truncated output file is left behind by a failed interpretation. """
+        def interpret_to(scenario, interpreter, fp, compact=False):
+            fp.write('<partial')
+            raise RuntimeError("Interpretation failed")
+
+        mocked_interpret_to.side_effect = interpret_to
+        tree = self.path('test-complete.adelet')
+        emit_ast(SOURCE, tree)
+        for source, from_ast in ((SOURCE, False), (tree, True)):
+            with self.subTest(from_ast=from_ast):
+                output = self.path('output.xml')
+                with self.assertRaises(RuntimeError):
+                    compile_file(source, output, 'xml', from_ast=from_ast)
+                self.assertFalse(os.path.exists(output))
+
+    def test_validate_targets_when_wrong_interpreter_then_raise_exception(self):
+        """ Tests the guard for the unrecognizable interpreters. """
+        argument = Argument(SOURCE, 'xml', self.path('output'), True, interpreters=['xml', 'yaml'])
+        with self.assertRaises(UnrecognizedInterpreterError):
+            validate_targets(argument)
+        argument = Argument(SOURCE, 'xml', self.path('output'), True, interpreters=['xml', 'json'])
+        self.assertEqual(validate_targets(argument),
+                         (SOURCE, [('xml', self.path('output.xml')), ('json', self.path('output.json'))]))
+
+    def tearDown(self):
+        shutil.rmtree(self.directory, ignore_errors=True)
+        unittest.TestCase.tearDown(self)
+
+
+if __name__ == '__main__':
+    unittest.main()
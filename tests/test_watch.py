@@ -0,0 +1,153 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+""" The unit test for the watch mode of Py-ADeLe.
+
+Author:
+    Francesco Racciatti
+
+Copyright 2018 Francesco Racciatti
+
+"""
+
+
+import sys
+sys.path.append('../')
+sys.path.append('../src/')
+sys.path.append('../src/model/')
+sys.path.append('../src/parser/')
+sys.path.append('../src/shell/')
+sys.path.append('../src/util/')
+
+import os
+import shutil
+import tempfile
+import unittest
+
+from src.shell.options import Argument, get_command_line_arguments
+from src.shell.watch import Watcher, Status
+
+
+# The source code of a valid scenario
+SOURCECODE = 'scenario { configuration { setUnitTime("s"); } }\n'
+
+
+class TestWatch(unittest.TestCase):
+    """ Full test set for the watch mode of PyADeLe. """
+
+    def setUp(self):
+        unittest.TestCase.setUp(self)
+        self.directory = tempfile.mkdtemp()
+        self.sources = os.path.join(self.directory, 'sources')
+        os.makedirs(os.path.join(self.sources, 'nested'))
+        self.write('a.adele', SOURCECODE)
+        self.write('nested/b.adele', SOURCECODE)
+        self.argument = Argument(None, 'xml', os.path.join(self.directory, 'out'), True, None, [self.sources], True)
+
+    def write(self, name, sourcecode, mtime=None):
+        """ Writes the given source, with the given modification time (in seconds), if any. """
+        path = os.path.join(self.sources, name)
+        with open(path, 'w') as filesource:
+            filesource.write(sourcecode)
+        if mtime is not None:
+            os.utime(path, (mtime, mtime))
+        return path
+
+    def test_watch_argument_then_parse_arguments(self):
+        """ Tests the parsing of the watch argument. """
+        cmd = ['-s', 'source', '-i', 'xml']
+        self.assertFalse(get_command_line_arguments(cmd).watch)
+        self.assertTrue(get_command_line_arguments(cmd + ['--watch']).watch)
+
+    def test_watcher_when_content_changed_then_recompile_it_only(self):
+        """ Tests that only the sources whose content changed are recompiled. """
+        watcher = Watcher(self.argument)
+        rebuild = watcher.rebuild()
+        self.assertEqual([r.status for r in rebuild.results], [Status.COMPILED] * 2)
+        self.assertTrue(os.path.isfile(os.path.join(self.directory, 'out', 'nested', 'b.xml')))
+
+        # Nothing changed, then touched only
+        self.assertEqual((watcher.rebuild().results, watcher.rebuild().unchanged), ([], 2))
+        self.write('a.adele', SOURCECODE, mtime=1)
+        rebuild = watcher.rebuild()
+        self.assertEqual((rebuild.results, rebuild.unchanged), ([], 2))
+
+        # Changed, added, broken and removed sources
+        self.write('a.adele', SOURCECODE + '# changed\n')
+        self.write('nested/c.adele', 'scenario { $ }')
+        os.remove(os.path.join(self.sources, 'nested', 'b.adele'))
+        rebuild = watcher.rebuild()
+        self.assertEqual([(os.path.basename(r.source), r.status) for r in rebuild.results],
+                         [('a.adele', Status.COMPILED), ('c.adele', Status.FAILED)])
+        self.assertEqual((rebuild.unchanged, rebuild.removed), (0, 1))
+
+        # The broken source is retried once fixed
+        self.write('nested/c.adele', SOURCECODE)
+        self.assertEqual([r.status for r in watcher.rebuild().results], [Status.COMPILED])
+
+    def test_watcher_when_sources_added_then_outputs_not_moved(self):
+        """ Tests that the outputs stay rooted at the watched directory, whatever the sources found. """
+        os.remove(os.path.join(self.sources, 'a.adele'))
+        watcher = Watcher(self.argument)
+        self.assertEqual([r.output for r in watcher.rebuild().results],
+                         [os.path.join(self.directory, 'out', 'nested', 'b.xml')])
+        self.write('a.adele', SOURCECODE)
+        self.assertEqual([r.output for r in watcher.rebuild().results],
+                         [os.path.join(self.directory, 'out', 'a.xml')])
+        self.assertTrue(os.path.isfile(os.path.join(self.directory, 'out', 'nested', 'b.xml')))
+
+    def test_watcher_when_source_broken_then_not_retried_until_changed(self):
+        """ Tests that the unchanged broken sources are not recompiled, and lose their stale output. """
+        watcher = Watcher(self.argument)
+        watcher.rebuild()
+        output = os.path.join(self.directory, 'out', 'a.xml')
+        self.assertTrue(os.path.isfile(output))
+
+        self.write('a.adele', 'scenario { $ }')
+        rebuild = watcher.rebuild()
+        self.assertEqual([r.status for r in rebuild.results], [Status.FAILED])
+        self.assertIn('stale output', rebuild.results[0].error)
+        self.assertFalse(os.path.exists(output))
+
+        # Another source changes, the broken one is neither touched nor changed
+        self.write('nested/b.adele', SOURCECODE + '# changed\n')
+        rebuild = watcher.rebuild()
+        self.assertEqual([(os.path.basename(r.source), r.status) for r in rebuild.results],
+                         [('b.adele', Status.COMPILED)])
+        self.assertEqual(rebuild.unchanged, 1)
+        # Touched only
+        self.write('a.adele', 'scenario { $ }', mtime=1)
+        self.assertEqual((watcher.rebuild().results, watcher.rebuild().unchanged), ([], 2))
+
+        self.write('a.adele', SOURCECODE)
+        self.assertEqual([r.status for r in watcher.rebuild().results], [Status.COMPILED])
+        self.assertTrue(os.path.isfile(output))
+
+    def test_watcher_when_burst_of_changes_then_wait_to_settle(self):
+        """ Tests the debouncing of the changes. """
+        now = [0.0]
+        changes = [lambda: None, lambda: self.write('a.adele', '# 1\n' + SOURCECODE, mtime=10),
+                   lambda: self.write('a.adele', '# 2\n' + SOURCECODE, mtime=20), lambda: None]
+
+        def sleep(seconds):
+            now[0] += seconds
+            if changes:
+                changes.pop(0)()
+
+        watcher = Watcher(self.argument, interval=1.0, debounce=0.5, clock=lambda: now[0], sleep=sleep)
+        watcher.rebuild()
+        watcher.wait_changes()
+        # Waits for the second change, then for the debounce time
+        self.assertFalse(changes)
+        self.assertEqual(now[0], 3.0)
+        rebuild = watcher.rebuild()
+        self.assertEqual(len(rebuild.results), 1)
+        with open(os.path.join(self.directory, 'out', 'a.xml')) as fileoutput:
+            self.assertIn('_string_s', fileoutput.read())
+
+    def tearDown(self):
+        shutil.rmtree(self.directory, ignore_errors=True)
+        unittest.TestCase.tearDown(self)
+
+
+if __name__ == '__main__':
+    unittest.main()